@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from service_auth import require_auth
 from src.database.db import engine
 from src.database.models.claim_management import Base
 from src.routes.claim_management import router as claim_router
@@ -6,7 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from src.core.config import settings  # import API version prefix
 
 
-app = FastAPI(title="Claim Management Service")
+app = FastAPI(title="Claim Management Service", dependencies=[Depends(require_auth)])
 
 @app.on_event("startup")
 async def create_tables():
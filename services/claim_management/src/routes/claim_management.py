@@ -10,7 +10,7 @@ from typing import List
 
 from src.database.db import SessionLocal
 from src.schemas.claim_management_schema import ClaimReadSchema, ErrorResponse
-from src.services.policy_service import fetch_policy_details
+from src.services.policy_service import fetch_policy_details, iter_policy_details
 from src.services.config_service import fetch_cps_config, fetch_ndvi, fetch_growing_season
 from src.services.claim_calculator import calculate_crop_claim, calculate_livestock_claim
 from src.database.crud.claim_management_crud import create_claim, get_all_claims, update_claim_status, update_claim_amount, get_claim, authorize_claim
@@ -35,23 +35,15 @@ async def process_all_claims_task(db_session_factory, background_tasks_parent: B
     db: Session = db_session_factory()
     try:
         print("Starting background task: process_all_claims_task")
-        try:
-            print("Fetching policy details in process_all_claims_task")
-            policies = await fetch_policy_details()
-            # print(f"Fetched {len(policies) if policies else 0} policy details:\\n{json.dumps(policies, indent=4)}")
-        except HTTPException as e:
-            print(f"Could not fetch policy details: {e.detail}")
-            return
-        if not policies:
-            print("No policies found to process in background task.")
-            return
-
-        print(f"Found {len(policies)} policies to process.")
-
-        for policy_index, policy in enumerate(policies):
+        print("Streaming policy details in process_all_claims_task")
+        # Rows are handled as they arrive instead of loading the whole book first;
+        # a policy service failure surfaces here as HTTPException.
+        policy_count = 0
+        async for policy in iter_policy_details():
+            policy_count += 1
             claim_id_for_logging = "N/A"
             try:
-                print(f"Processing policy {policy_index + 1}/{len(policies)}: {policy.get('policy_id')}")
+                print(f"Processing policy {policy_count}: {policy.get('policy_id')}")
                 
                 required_keys = ['policy_id', 'customer_id', 'cps_zone', 'period', 'product_type', 'period_sum_insured']
                 if not all(policy.get(k) is not None for k in required_keys):
@@ -133,7 +125,11 @@ async def process_all_claims_task(db_session_factory, background_tasks_parent: B
                     update_claim_status(db, claim_id_for_logging, ClaimStatusEnum.SETTLED.value)
                     print(f"Claim {claim_id_for_logging} settled due to unexpected error.")
         
-        print("Finished background task: process_all_claims_task")
+        if not policy_count:
+            print("No policies found to process in background task.")
+            return
+
+        print(f"Finished background task: process_all_claims_task ({policy_count} policies)")
     
     except Exception as e:
         logger.exception(f"General error in process_all_claims_task: {e}", exc_info=True)
@@ -335,23 +331,13 @@ async def create_crop_claim(
     db: Session = Depends(get_db)
 ):
     print(f"Received request to create crop claims for period: {period}")
-    try:
-        print("Fetching policy details for crop claims.")
-        policy_details = await fetch_policy_details()
-        print(f"Fetched {len(policy_details)} policy details:\\n{json.dumps(policy_details, indent=4)}")
-    except HTTPException as e:
-        print(f"Failed to fetch policy details in create_crop_claim: {e.detail}")
-        raise # Re-raise the exception to be handled by FastAPI
-        
-    crops = [p for p in policy_details if p['product_type'] == 1 and p['period'] == period]
-    if not crops:
-        logger.warning(f"No valid crop policies found for period {period}.")
-        raise HTTPException(400, "No valid crop policies found for the specified period")
-    
-    print(f"Found {len(crops)} crop policies for period {period} to process.")
+    print("Streaming crop policy details for crop claims.")
+    # The policy service filters by product and period; an HTTPException from it propagates to FastAPI
+    policy_count = 0
     processed_claims_count = 0
-    for policy_index, policy in enumerate(crops):
-        print(f"Processing crop policy {policy_index + 1}/{len(crops)}: {policy.get('policy_id')}")
+    async for policy in iter_policy_details(product_type=1, period=period):
+        policy_count += 1
+        print(f"Processing crop policy {policy_count}: {policy.get('policy_id')}")
         db.begin_nested() # Use a nested transaction for individual claim creation
         try:
             claim_data = {
@@ -384,6 +370,10 @@ async def create_crop_claim(
             print(f"Error creating claim for policy {policy.get('policy_id')}: {e}", exc_info=True)
             # Decide if to continue with other policies or raise an error
 
+    if not policy_count:
+        logger.warning(f"No valid crop policies found for period {period}.")
+        raise HTTPException(400, "No valid crop policies found for the specified period")
+
     print(f"Crop claims processing initiated for {processed_claims_count} policies for period {period}.")
     return {"message": "Crop claims processing initiated for the specified period."}
 
@@ -393,23 +383,12 @@ async def create_livestock_claim(
     db: Session = Depends(get_db)
 ):
     print("Received request to create livestock claims.")
-    try:
-        print("Fetching policy details for livestock claims.")
-        policies = await fetch_policy_details()
-        print(f"Fetched {len(policies)} policy details:\\n{json.dumps(policies, indent=4)}")
-    except HTTPException as e:
-        print(f"Failed to fetch policy details in create_livestock_claim: {e.detail}")
-        raise
-
-    livestocks = [p for p in policies if p['product_type'] == 2]
-    if not livestocks:
-        logger.warning("No valid livestock policies found.")
-        raise HTTPException(400, "No valid livestock policies found")
-
-    print(f"Found {len(livestocks)} livestock policies to process.")
+    print("Streaming livestock policy details for livestock claims.")
+    policy_count = 0
     processed_claims_count = 0
-    for policy_index, policy in enumerate(livestocks):
-        print(f"Processing livestock policy {policy_index + 1}/{len(livestocks)}: {policy.get('policy_id')}")
+    async for policy in iter_policy_details(product_type=2):
+        policy_count += 1
+        print(f"Processing livestock policy {policy_count}: {policy.get('policy_id')}")
         db.begin_nested()
         try:
             claim_data = {
@@ -440,6 +419,10 @@ async def create_livestock_claim(
             db.rollback()
             print(f"Error creating claim for policy {policy.get('policy_id')}: {e}", exc_info=True)
 
+    if not policy_count:
+        logger.warning("No valid livestock policies found.")
+        raise HTTPException(400, "No valid livestock policies found")
+
     print(f"Livestock claims processing initiated for {processed_claims_count} policies.")
     return {"message": "Livestock claims processing initiated."}
 
@@ -1,5 +1,6 @@
 import httpx
 from fastapi import HTTPException
+from service_auth import service_headers
 import logging
 from src.core.config import settings
 
@@ -20,7 +21,7 @@ async def fetch_cps_config(cps_zone: int, period: int) -> dict:
     Raises HTTPException on failure.
     """
     url = f"{CONFIG_SERVICE_URL}{settings.API_V1_STR}/cps-zone/{cps_zone}/{period}"
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(timeout=timeout, headers=service_headers()) as client:
         try:
             resp = await client.get(url)
             if resp.status_code != 200:
@@ -36,7 +37,7 @@ async def fetch_ndvi(grid_id: int, period: int) -> float:
     Raises HTTPException on failure or invalid data.
     """
     url = f"{CONFIG_SERVICE_URL}{settings.API_V1_STR}/ndvi/{grid_id}/{period}"
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(timeout=timeout, headers=service_headers()) as client:
         try:
             resp = await client.get(url)
             resp.raise_for_status()
@@ -59,7 +60,7 @@ async def fetch_growing_season(grid_id: int) -> list[int]:
     Raises HTTPException on failure.
     """
     url = f"{CONFIG_SERVICE_URL}{settings.API_V1_STR}/cps-zone/growing_season/{grid_id}"
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(timeout=timeout, headers=service_headers()) as client:
         try:
             resp = await client.get(url)
             resp.raise_for_status()
@@ -1,5 +1,7 @@
+import json
 import httpx
 from fastapi import HTTPException
+from service_auth import service_headers
 import logging
 from src.core.config import settings
 
@@ -16,7 +18,7 @@ async def fetch_policy_details() -> list[dict]:
     Raises HTTPException on errors.
     """
     url = f"{POLICY_SERVICE_URL}/api/policies/details"
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(timeout=timeout, headers=service_headers()) as client:
         try:
             response = await client.get(url)
             response.raise_for_status()
@@ -24,3 +26,24 @@ async def fetch_policy_details() -> list[dict]:
         except httpx.HTTPError as e:
             logger.exception("Error fetching policy details: %s", e)
             raise HTTPException(status_code=503, detail="Policy service is unavailable.")
+
+
+async def iter_policy_details(**filters):
+    """
+    Streams policy details from the policy service one row at a time (NDJSON), so
+    callers never hold the full book in memory. Accepts the same filters as the
+    policy service: period, product_type, status, company_id.
+    Raises HTTPException on errors.
+    """
+    url = f"{POLICY_SERVICE_URL}/api/policies/details/stream"
+    params = {k: v for k, v in filters.items() if v is not None}
+    async with httpx.AsyncClient(timeout=timeout, headers=service_headers()) as client:
+        try:
+            async with client.stream("GET", url, params=params) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line:
+                        yield json.loads(line)
+        except httpx.HTTPError as e:
+            logger.exception("Error streaming policy details: %s", e)
+            raise HTTPException(status_code=503, detail="Policy service is unavailable.")
@@ -39,6 +39,8 @@ class UploadedFile(Base):
     upload_type = Column(String, nullable=True) # More specific: 'trigger', 'exit', 'season', 'ndvi_grid'
     uploaded_at = Column(DateTime, default=func.now()) # Renamed from upload_date
     file_path = Column(String, nullable=False) # Path where the file is stored
+    content_hash = Column(String(64), index=True, nullable=True) # SHA-256 of the uploaded bytes, used to skip re-ingesting identical files
+    job_id = Column(String, nullable=True) # Background job that ingested the file (NDVI uploads only)
 
 
 class GrowingSeasonByGrid(Base):
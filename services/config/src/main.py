@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from service_auth import require_auth
 from fastapi.middleware.cors import CORSMiddleware
 from src.routes import cps_zone, ndvi # We will create these route files next
 from src.database.db import Base, engine
@@ -11,7 +12,8 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title="Configuration Microservice",
     description="Manages CPS Zone and NDVI configurations.",
-    version="0.1.0"
+    version="0.1.0",
+    dependencies=[Depends(require_auth)],
 )
 
 # allow CORS for frontend
@@ -13,6 +13,7 @@ from src.database import models, db
 from src.schemas import cps_zone as cps_zone_schemas
 from src.schemas import file as file_schemas
 from src.schemas import growing_season as growing_season_schemas # New import
+from src.utils.content_hash import hash_stream, find_applied_upload
 
 router = APIRouter()
 
@@ -147,7 +148,8 @@ def process_and_store_cps_data(
                 saved_filename=file_info["saved_filename"],
                 file_type="cps_zone_config", # Consider if "growing_season_config" for type "season"
                 file_path=file_info["file_path"],
-                upload_type=file_info["upload_type"]
+                upload_type=file_info["upload_type"],
+                content_hash=file_info.get("content_hash")
             )
             db_session.add(db_file)
         db_session.commit()
@@ -183,14 +185,28 @@ async def upload_cps_zone_files(
     }
     saved_files_info: List[Dict[str, Optional[str]]] = []
     dataframes: Dict[str, pd.DataFrame] = {}
+    content_hashes: Dict[str, str] = {}
+
+    for key, file_obj in files_to_process.items():
+        if file_obj.filename is None:
+             raise HTTPException(status_code=400, detail=f"File for '{key}' is missing a filename.")
+        current_filename_str = str(file_obj.filename)
+        if not current_filename_str.endswith(('.xls', '.xlsx')):
+            raise HTTPException(status_code=400, detail=f"Invalid file type for {key} file ({current_filename_str}). Only Excel files (.xls, .xlsx) are allowed.")
+        content_hashes[key] = hash_stream(file_obj.file)
+        file_obj.file.seek(0)
+
+    # If the currently applied set has identical content, there is nothing to re-ingest
+    existing_files = [
+        find_applied_upload(db_session, content_hashes[key], file_type="cps_zone_config", upload_type=key)
+        for key in files_to_process
+    ]
+    if all(existing_files):
+        return [file_schemas.FileUploadResponse.from_orm(f) for f in existing_files]
 
     try:
         for key, file_obj in files_to_process.items():
-            if file_obj.filename is None:
-                 raise HTTPException(status_code=400, detail=f"File for '{key}' is missing a filename.")
             current_filename_str = str(file_obj.filename)
-            if not current_filename_str.endswith(('.xls', '.xlsx')):
-                raise HTTPException(status_code=400, detail=f"Invalid file type for {key} file ({current_filename_str}). Only Excel files (.xls, .xlsx) are allowed.")
 
             file_prefix = f"cps_{key}_points_" if key != "season" else "growing_season_grid_" # UPDATED prefix
             timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
@@ -214,7 +230,8 @@ async def upload_cps_zone_files(
                 "original_filename": current_filename_str,
                 "saved_filename": safe_filename,
                 "file_path": file_path,
-                "upload_type": key
+                "upload_type": key,
+                "content_hash": content_hashes[key]
             })
             
             file_obj.file.seek(0) 
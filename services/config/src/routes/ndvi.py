@@ -14,6 +14,7 @@ from sqlalchemy.dialects.postgresql import insert as pg_insert
 from src.database import models, db
 from src.schemas import ndvi as ndvi_schemas
 from src.schemas import file as file_schemas
+from src.utils.content_hash import hash_stream, find_applied_upload
 
 class JobStatus(file_schemas.BaseModel): # Using BaseModel from file_schemas for consistency
     job_id: str
@@ -25,6 +26,7 @@ class JobStatus(file_schemas.BaseModel): # Using BaseModel from file_schemas for
     saved_filename: Optional[str] = None
     file_path: Optional[str] = None # Final path after successful processing
     error_details: Optional[str] = None
+    content_hash: Optional[str] = None # SHA-256 of the uploaded file
 
     class Config:
         from_attributes = True
@@ -40,6 +42,8 @@ os.makedirs(TEMP_NDVI_FILES_DIR, exist_ok=True) # Create temp directory
 
 # In-memory store for job statuses
 job_statuses: Dict[str, JobStatus] = {}
+# Content hash -> job_id for uploads that are still pending/processing
+inflight_jobs_by_hash: Dict[str, str] = {}
 
 def validate_ndvi_data(df: pd.DataFrame):
     if df.empty:
@@ -79,9 +83,9 @@ def validate_ndvi_data(df: pd.DataFrame):
 
 async def background_process_ndvi_file(
     db_session: Session,
-    file_content: bytes,
     original_filename: str,
     temp_file_path: str,  # Path to the temporary file
+    content_hash: str,
     job_id: str
 ):
     job_statuses[job_id].status     = "processing"
@@ -92,9 +96,9 @@ async def background_process_ndvi_file(
     try:
         # 1. Read CSV / Excel
         if original_filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(file_content))
+            df = pd.read_csv(temp_file_path)
         elif original_filename.endswith(('.xls','xlsx')):
-            df = pd.read_excel(io.BytesIO(file_content))
+            df = pd.read_excel(temp_file_path)
         else:
             raise ValueError(f"Unsupported file type: {original_filename}")
 
@@ -185,6 +189,8 @@ async def background_process_ndvi_file(
             file_type      = "ndvi",
             upload_type    = "ndvi_grid",
             file_path      = final_file_path,
+            content_hash   = content_hash,
+            job_id         = job_id,
             # (uploaded_at will default automatically)
         )
         db_session.add(db_file_meta)
@@ -215,13 +221,35 @@ async def background_process_ndvi_file(
 
     finally:
         job_statuses[job_id].updated_at = datetime.datetime.utcnow()
+        inflight_jobs_by_hash.pop(content_hash, None)
         db_session.close()
 
+
+def duplicate_upload_status(existing: models.UploadedFile, original_filename: str) -> JobStatus:
+    """Status for an upload whose content was already ingested, reusing the original job ID."""
+    if existing.job_id and existing.job_id in job_statuses:
+        return job_statuses[existing.job_id]
+
+    job_id = existing.job_id or str(uuid.uuid4())
+    job_statuses[job_id] = JobStatus(
+        job_id=job_id,
+        status="completed",
+        message=f"Identical content was already processed as {existing.saved_filename}; skipped re-ingestion of {original_filename}.",
+        created_at=existing.uploaded_at or datetime.datetime.utcnow(),
+        updated_at=datetime.datetime.utcnow(),
+        original_filename=existing.filename,
+        saved_filename=existing.saved_filename,
+        file_path=existing.file_path,
+        content_hash=existing.content_hash,
+    )
+    return job_statuses[job_id]
+
         
 @router.post("/upload", response_model=JobStatus, status_code=202)
 async def upload_ndvi_file(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    db_session: Session = Depends(db.get_db),
 ):
     if file.filename is None:
         raise HTTPException(status_code=400, detail="Filename cannot be empty.")
@@ -237,15 +265,26 @@ async def upload_ndvi_file(
     temp_saved_filename = f"temp_ndvi_{job_id}{temp_ext}"
     temp_file_path = os.path.join(TEMP_NDVI_FILES_DIR, temp_saved_filename)
 
-    file_content = await file.read()
-    await file.seek(0) 
-
+    # Stream to disk and hash in a single pass
     try:
         with open(temp_file_path, "wb") as buffer:
-            buffer.write(file_content)
+            content_hash = hash_stream(file.file, sink=buffer)
     except Exception as e:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
         raise HTTPException(status_code=500, detail=f"Could not save temporary file: {e}")
 
+    # Identical content is either still being processed or already applied: reuse that job
+    inflight_job_id = inflight_jobs_by_hash.get(content_hash)
+    if inflight_job_id is not None:
+        os.remove(temp_file_path)
+        return job_statuses[inflight_job_id]
+
+    existing = find_applied_upload(db_session, content_hash, file_type="ndvi", upload_type="ndvi_grid")
+    if existing is not None:
+        os.remove(temp_file_path)
+        return duplicate_upload_status(existing, file.filename)
+
     # Initial quick validation (optional, as full validation happens in background)
     # try:
     #     if file.filename.endswith('.csv'):
@@ -264,16 +303,18 @@ async def upload_ndvi_file(
         message="File upload accepted, processing in background.",
         created_at=now,
         original_filename=file.filename,
+        content_hash=content_hash,
         # saved_filename and file_path will be updated by background task
     )
+    inflight_jobs_by_hash[content_hash] = job_id
 
     db_session_bg = next(db.get_db())
     background_tasks.add_task(
         background_process_ndvi_file,
         db_session_bg,
-        file_content, # Pass content directly
         file.filename,
         temp_file_path, # Pass temp file path
+        content_hash,
         job_id
     )
     return job_statuses[job_id]
@@ -8,6 +8,7 @@ class UploadedFileBase(BaseModel):
     file_path: str # Path where the file is saved on the server
     saved_filename: Optional[str] = None # The potentially modified filename on the server
     upload_type: Optional[str] = None # Specific type, e.g., 'trigger', 'exit', 'season', 'ndvi_grid'
+    content_hash: Optional[str] = None # SHA-256 of the file content
 
 class UploadedFileCreate(UploadedFileBase):
     pass
@@ -0,0 +1,51 @@
+import hashlib
+from typing import BinaryIO, Optional
+
+from sqlalchemy.orm import Session
+
+from src.database import models
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+def hash_stream(stream: BinaryIO, sink: Optional[BinaryIO] = None) -> str:
+    """
+    Return the SHA-256 hex digest of everything left in `stream`.
+    If `sink` is given, the bytes are copied into it as they are read so the
+    upload only has to be consumed once.
+    """
+    digest = hashlib.sha256()
+    while True:
+        chunk = stream.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        if sink is not None:
+            sink.write(chunk)
+    return digest.hexdigest()
+
+
+def find_applied_upload(
+    db_session: Session,
+    content_hash: str,
+    file_type: str,
+    upload_type: str,
+) -> Optional[models.UploadedFile]:
+    """
+    Return the most recent upload of this kind if it has the same content.
+    Only the latest upload counts: an older file with the same hash may have
+    been overwritten since, so re-applying it is not a no-op. Uploading A, then
+    B, then A again therefore ingests A a second time, which is intended.
+    """
+    latest = (
+        db_session.query(models.UploadedFile)
+        .filter(
+            models.UploadedFile.file_type == file_type,
+            models.UploadedFile.upload_type == upload_type,
+        )
+        .order_by(models.UploadedFile.uploaded_at.desc(), models.UploadedFile.id.desc())
+        .first()
+    )
+    if latest is not None and latest.content_hash == content_hash:
+        return latest
+    return None
@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Use in-memory SQLite for tests
+env_db = "sqlite:///:memory:"
+os.environ["DATABASE_URL"] = env_db
+
+# The route modules create their upload directories relative to the working directory on import
+os.chdir(tempfile.mkdtemp(prefix="config-tests-"))
+
+# Single Engine shared by all sessions
+engine = create_engine(
+    env_db,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+# Import Base & get_db AFTER setting env
+from src.database.db import Base, get_db
+from src.database import models
+from src.main import app
+from src.routes import ndvi
+
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_test_db():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    yield
+    db = TestingSessionLocal()
+    db.query(models.UploadedFile).delete()
+    db.commit()
+    db.close()
+    ndvi.job_statuses.clear()
+    ndvi.inflight_jobs_by_hash.clear()
+
+
+@pytest.fixture
+def db():
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
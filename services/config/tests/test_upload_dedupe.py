@@ -0,0 +1,117 @@
+import datetime
+import hashlib
+import os
+
+import pytest
+
+from src.database import models
+from src.routes import ndvi
+
+NDVI_A = b"ndvi file A"
+NDVI_B = b"ndvi file B"
+
+
+def sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def record_upload(db, content: bytes, file_type: str, upload_type: str, minutes_ago: int, **extra):
+    uploaded = models.UploadedFile(
+        filename=f"{upload_type}.xlsx",
+        saved_filename=f"{upload_type}_{sha256(content)[:12]}_{minutes_ago}.xlsx",
+        file_type=file_type,
+        upload_type=upload_type,
+        file_path=f"/data/{upload_type}.xlsx",
+        content_hash=sha256(content),
+        uploaded_at=datetime.datetime(2026, 1, 1) - datetime.timedelta(minutes=minutes_ago),
+        **extra,
+    )
+    db.add(uploaded)
+    db.commit()
+    return uploaded
+
+
+@pytest.fixture
+def scheduled(monkeypatch, tmp_path):
+    """Background NDVI jobs that were scheduled; they are recorded instead of run, so they stay in flight."""
+    calls = []
+
+    async def fake_process(db_session, original_filename, temp_file_path, content_hash, job_id):
+        calls.append(job_id)
+        db_session.close()
+
+    monkeypatch.setattr(ndvi, "background_process_ndvi_file", fake_process)
+    monkeypatch.setattr(ndvi, "TEMP_NDVI_FILES_DIR", str(tmp_path))
+    return calls
+
+
+def upload_ndvi(client, content: bytes, filename="ndvi.csv"):
+    return client.post("/api/v1/ndvi/upload", files={"file": (filename, content, "text/csv")})
+
+
+def test_ndvi_upload_matching_latest_is_skipped(client, db, scheduled, tmp_path):
+    record_upload(db, NDVI_A, "ndvi", "ndvi_grid", minutes_ago=5, job_id="job-a")
+
+    resp = upload_ndvi(client, NDVI_A, filename="again.csv")
+    assert resp.status_code == 202, resp.text
+    body = resp.json()
+    assert body["job_id"] == "job-a"
+    assert body["status"] == "completed"
+    assert body["content_hash"] == sha256(NDVI_A)
+    assert scheduled == []
+    assert os.listdir(tmp_path) == []
+
+
+def test_ndvi_identical_upload_in_flight_reuses_job(client, scheduled, tmp_path):
+    first = upload_ndvi(client, NDVI_A).json()
+    assert first["status"] == "pending"
+    assert scheduled == [first["job_id"]]
+
+    second = upload_ndvi(client, NDVI_A).json()
+    assert second["job_id"] == first["job_id"]
+    assert scheduled == [first["job_id"]]
+    # Only the first upload's temp file is kept for its job
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_ndvi_reupload_of_older_content_is_applied_again(client, db, scheduled):
+    # A, then B, then A again: only the latest upload (B) is compared against
+    record_upload(db, NDVI_A, "ndvi", "ndvi_grid", minutes_ago=10, job_id="job-a")
+    record_upload(db, NDVI_B, "ndvi", "ndvi_grid", minutes_ago=5, job_id="job-b")
+
+    body = upload_ndvi(client, NDVI_A).json()
+    assert body["status"] == "pending"
+    assert body["job_id"] not in ("job-a", "job-b")
+    assert scheduled == [body["job_id"]]
+
+
+CPS_FILES = {"trigger": b"trigger points", "exit": b"exit points", "season": b"growing seasons"}
+
+
+def upload_cps_set(client, contents: dict):
+    files = {
+        "trigger_points_file": ("trigger.xlsx", contents["trigger"]),
+        "exit_points_file": ("exit.xlsx", contents["exit"]),
+        "growing_seasons_file": ("season.xlsx", contents["season"]),
+    }
+    return client.post("/api/v1/cps-zone/upload-set", files=files)
+
+
+def test_cps_upload_set_matching_latest_is_skipped(client, db):
+    for key, content in CPS_FILES.items():
+        record_upload(db, content, "cps_zone_config", key, minutes_ago=5)
+
+    resp = upload_cps_set(client, CPS_FILES)
+    assert resp.status_code == 201, resp.text
+    assert sorted(f["upload_type"] for f in resp.json()) == ["exit", "season", "trigger"]
+    assert db.query(models.UploadedFile).count() == 3
+
+
+def test_cps_upload_set_with_one_changed_file_is_ingested(client, db):
+    for key, content in CPS_FILES.items():
+        record_upload(db, content, "cps_zone_config", key, minutes_ago=5)
+
+    # Not skipped, so the (unparseable) files go through ingestion and are rejected
+    resp = upload_cps_set(client, {**CPS_FILES, "season": b"new growing seasons"})
+    assert resp.status_code == 400
+    assert "Error parsing Excel file" in resp.json()["detail"]
@@ -1,8 +1,16 @@
 #!/bin/sh
 # entrypoint.sh
+set -e
 
 # Run initial migrations (if no migration exists, alembic will create one based on your autogenerate settings)
 alembic upgrade head
 
+# The grid index is built from the pickles at image build time (see Dockerfile); refuse to
+# start without it rather than unpickling the legacy files in every worker
+if [ -f src/utils/kdtree.pkl ] && [ ! -f src/utils/grid_index/COMPLETE ]; then
+    echo "Grid index src/utils/grid_index is missing or incomplete; rebuild the image" >&2
+    exit 1
+fi
+
 # Start the FastAPI application
 exec uvicorn src.main:app --host 0.0.0.0 --port 8000 --reload
@@ -5,6 +5,13 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     POLICY_SERVICE_URL: str
     API_V1_STR: str = "/api"
+    # Background delivery of policy creations queued on enrollment approval
+    POLICY_OUTBOX_ENABLED: bool = True
+    POLICY_OUTBOX_BATCH_SIZE: int = 100
+    POLICY_OUTBOX_POLL_SECONDS: float = 2.0
+    POLICY_OUTBOX_MAX_ATTEMPTS: int = 8
+    POLICY_OUTBOX_BASE_BACKOFF_SECONDS: float = 5.0
+    POLICY_OUTBOX_MAX_BACKOFF_SECONDS: float = 600.0
     model_config = ConfigDict(from_attributes=True)
 
 settings = Settings()
@@ -0,0 +1,182 @@
+# src/database/crud/bulk_enrolement_crud.py
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from src.database.models.customer import Customer
+from src.database.models.enrolement import Enrolement, EnrolementStatus
+
+BULK_CHUNK_SIZE = 1000
+RECEIPT_NO_MAX_LENGTH = 10
+
+CUSTOMER_COLUMNS = ["f_name", "m_name", "l_name", "account_no", "account_type"]
+STRING_COLUMNS = CUSTOMER_COLUMNS + ["receipt_no"]
+POSITIVE_INT_COLUMNS = ["user_id", "ic_company_id", "branch_id", "product_id"]
+POSITIVE_NUMBER_COLUMNS = ["premium", "sum_insured"]
+DATE_COLUMNS = ["date_from", "date_to"]
+COORDINATE_COLUMNS = ["lattitude", "longitude"]
+REQUIRED_COLUMNS = STRING_COLUMNS + POSITIVE_INT_COLUMNS + POSITIVE_NUMBER_COLUMNS + DATE_COLUMNS + COORDINATE_COLUMNS
+
+
+class BulkEnrolementService:
+    """
+    Imports farmers from a CSV/Excel sheet in chunks. Each chunk is validated with
+    column-wise checks, deduplicated on receipt_no with one IN query, geocoded with a
+    single KDTree query and written with one multi-row INSERT per table.
+    Rows that fail are reported back instead of aborting the import.
+    """
+
+    def __init__(self, db: Session, grid_zone_getter, chunk_size: int = BULK_CHUNK_SIZE):
+        self.db = db
+        self.grid_zone_getter = grid_zone_getter
+        self.chunk_size = chunk_size
+
+    def import_file(self, file_obj, filename: str):
+        report = {"total_rows": 0, "created": 0, "errors": []}
+        seen_receipts = set()
+        for chunk in self._read_chunks(file_obj, filename):
+            self._import_chunk(chunk, seen_receipts, report)
+        report["failed"] = len(report["errors"])
+        return report
+
+    def _read_chunks(self, file_obj, filename: str):
+        dtypes = {name: str for name in STRING_COLUMNS}
+        if filename.endswith(".csv"):
+            chunks = pd.read_csv(file_obj, dtype=dtypes, chunksize=self.chunk_size)
+        elif filename.endswith((".xls", ".xlsx")):
+            # Excel cannot be read incrementally by pandas; slice it after loading
+            df = pd.read_excel(file_obj, dtype=dtypes)
+            chunks = (df.iloc[i:i + self.chunk_size] for i in range(0, max(len(df), 1), self.chunk_size))
+        else:
+            raise HTTPException(status_code=400, detail="Invalid file type. Only CSV and Excel files are allowed.")
+
+        for chunk in chunks:
+            missing = [name for name in REQUIRED_COLUMNS if name not in chunk.columns]
+            if missing:
+                raise HTTPException(status_code=400, detail=f"Missing required columns: {', '.join(missing)}")
+            yield chunk
+
+    def _import_chunk(self, chunk: pd.DataFrame, seen_receipts: set, report: dict):
+        n = len(chunk)
+        if n == 0:
+            return
+        # Row number as shown in a spreadsheet: header is row 1
+        row_numbers = chunk.index.to_numpy() + 2
+        errors = [[] for _ in range(n)]
+
+        def flag(mask, message):
+            for i in np.flatnonzero(np.asarray(mask)):
+                errors[i].append(message)
+
+        strings = {name: chunk[name].fillna("").astype(str).str.strip() for name in STRING_COLUMNS}
+        for name in STRING_COLUMNS:
+            flag(strings[name] == "", f"{name} cannot be empty")
+        flag(strings["receipt_no"].str.len() > RECEIPT_NO_MAX_LENGTH,
+             f"receipt_no cannot be longer than {RECEIPT_NO_MAX_LENGTH} characters")
+
+        numbers = {}
+        for name in POSITIVE_INT_COLUMNS:
+            numbers[name] = pd.to_numeric(chunk[name], errors="coerce")
+            flag(~(numbers[name] > 0) | (numbers[name] != numbers[name].round()), f"{name} must be a positive integer")
+        for name in POSITIVE_NUMBER_COLUMNS:
+            numbers[name] = pd.to_numeric(chunk[name], errors="coerce")
+            flag(~(numbers[name] > 0), f"{name} must be greater than zero")
+
+        dates = {name: pd.to_datetime(chunk[name], errors="coerce") for name in DATE_COLUMNS}
+        dates_ok = dates["date_from"].notna() & dates["date_to"].notna()
+        flag(~dates_ok, "date_from and date_to must be valid dates")
+        flag(dates_ok & (dates["date_from"] >= dates["date_to"]), "date_from must be before date_to")
+
+        # Geocode every row with usable coordinates in one query
+        lats = pd.to_numeric(chunk["lattitude"], errors="coerce").to_numpy(dtype=np.float64)
+        lons = pd.to_numeric(chunk["longitude"], errors="coerce").to_numpy(dtype=np.float64)
+        coords_ok = np.isfinite(lats) & np.isfinite(lons)
+        flag(~coords_ok, "Latitude or longitude is required.")
+        grids = np.full(n, np.nan)
+        cps_zones = np.full(n, np.nan)
+        if coords_ok.any():
+            g, z, zone_ok = self.grid_zone_getter.get_grid_and_zone_batch(lats[coords_ok], lons[coords_ok])
+            grids[coords_ok] = g
+            cps_zones[coords_ok] = z
+            bad_zone = np.zeros(n, dtype=bool)
+            bad_zone[coords_ok] = ~zone_ok
+            flag(bad_zone, "Grid/Zone error: CPS_ZONE is out of range (1-200).")
+
+        # Duplicate receipts, among rows that are otherwise valid: a rejected row never claims
+        # its receipt, so a later valid row may still use it. Within the file so far first,
+        # then against the database in one query.
+        receipts = strings["receipt_no"]
+        valid = np.array([not e for e in errors], dtype=bool)
+        in_file = np.zeros(n, dtype=bool)
+        in_file[valid] = (receipts[valid].duplicated(keep="first") | receipts[valid].isin(seen_receipts)).to_numpy()
+        flag(in_file, "Duplicate receipt_no in file")
+        unique = valid & ~in_file
+        candidates = set(receipts[unique])
+        if candidates:
+            existing = {
+                r for (r,) in self.db.query(Enrolement.receipt_no).filter(Enrolement.receipt_no.in_(candidates))
+            }
+            flag(unique & receipts.isin(existing).to_numpy(), "Duplicate receipt_no is not allowed")
+
+        ok = np.array([not e for e in errors], dtype=bool)
+        report["total_rows"] += n
+        for i in np.flatnonzero(~ok):
+            report["errors"].append({
+                "row": int(row_numbers[i]),
+                "receipt_no": strings["receipt_no"].iat[i] or None,
+                "errors": errors[i],
+            })
+        if not ok.any():
+            return
+
+        idx = np.flatnonzero(ok)
+        customer_rows = [
+            {name: strings[name].iat[i] for name in CUSTOMER_COLUMNS}
+            for i in idx
+        ]
+        try:
+            customer_ids = self.db.execute(
+                insert(Customer).returning(Customer.customer_id, sort_by_parameter_order=True),
+                customer_rows,
+            ).scalars().all()
+
+            now = datetime.utcnow()
+            enrolement_rows = [
+                {
+                    "customer_id": customer_id,
+                    "user_id": int(numbers["user_id"].iat[i]),
+                    "ic_company_id": int(numbers["ic_company_id"].iat[i]),
+                    "branch_id": int(numbers["branch_id"].iat[i]),
+                    "product_id": int(numbers["product_id"].iat[i]),
+                    "premium": float(numbers["premium"].iat[i]),
+                    "sum_insured": float(numbers["sum_insured"].iat[i]),
+                    "date_from": dates["date_from"].iat[i].date(),
+                    "date_to": dates["date_to"].iat[i].date(),
+                    "receipt_no": strings["receipt_no"].iat[i],
+                    "cps_zone": int(cps_zones[i]),
+                    "grid": int(grids[i]),
+                    "lattitude": float(lats[i]),
+                    "longitude": float(lons[i]),
+                    "status": EnrolementStatus.pending,
+                    "createdAt": now,
+                }
+                for customer_id, i in zip(customer_ids, idx)
+            ]
+            self.db.execute(insert(Enrolement), enrolement_rows)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            for i in idx:
+                report["errors"].append({
+                    "row": int(row_numbers[i]),
+                    "receipt_no": strings["receipt_no"].iat[i],
+                    "errors": [f"Enrollment creation failed: {e.__class__.__name__}"],
+                })
+            return
+
+        seen_receipts.update(strings["receipt_no"].iat[i] for i in idx)
+        report["created"] += len(idx)
@@ -1,11 +1,11 @@
 # src/database/crud/insurance_company_crud.py
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from src.database.models.enrolement import Enrolement
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload
+from src.database.models.enrolement import Enrolement, EnrolementStatus
+from src.database.crud.policy_outbox_crud import PolicyOutboxService
 from src.schemas.enrolement_schema import EnrolementRequest
 from datetime import datetime
-from src.core.config import settings
-import httpx
 class EnrolementService:
     def __init__(self, db: Session):
         self.db = db
@@ -79,16 +79,47 @@ class EnrolementService:
         
 
     def get_enrolement(self, enrolement_id: int):
-        return self.db.query(Enrolement).filter(Enrolement.enrolment_id == enrolement_id).first()
+        return (
+            self.db.query(Enrolement)
+            .options(joinedload(Enrolement.customer))
+            .filter(Enrolement.enrolment_id == enrolement_id)
+            .first()
+        )
+
+    def get_enrolements_by_ids(self, enrollment_ids):
+        """Enrollments for the given IDs with their customer, in one query, ordered by ID."""
+        return (
+            self.db.query(Enrolement)
+            .options(joinedload(Enrolement.customer))
+            .filter(Enrolement.enrolment_id.in_(enrollment_ids))
+            .order_by(Enrolement.enrolment_id)
+            .all()
+        )
 
-    def get_enrolements_by_company_id(self, company_id: int):
-        return self.db.query(Enrolement).filter(Enrolement.ic_company_id == company_id).all()
+    def get_enrolements_by_company_id(self, company_id: int, **filters):
+        return self.get_enrolements(company_id=company_id, **filters)
 
-    def get_enrolements_by_user_id(self, user_id: int):
-        return self.db.query(Enrolement).filter(Enrolement.user_id == user_id).all()
+    def get_enrolements_by_user_id(self, user_id: int, **filters):
+        return self.get_enrolements(user_id=user_id, **filters)
 
-    def get_enrolements(self):
-        return self.db.query(Enrolement).all()
+    def get_enrolements(self, company_id=None, user_id=None, status=None, after_id=None, limit=None):
+        """
+        Enrollments with their customer loaded in the same query, ordered by ID.
+        Pass the last enrolment_id of a page as `after_id` to fetch the next one.
+        """
+        query = self.db.query(Enrolement).options(joinedload(Enrolement.customer))
+        if company_id is not None:
+            query = query.filter(Enrolement.ic_company_id == company_id)
+        if user_id is not None:
+            query = query.filter(Enrolement.user_id == user_id)
+        if status is not None:
+            query = query.filter(Enrolement.status == status)
+        if after_id is not None:
+            query = query.filter(Enrolement.enrolment_id > after_id)
+        query = query.order_by(Enrolement.enrolment_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
 
     def approve_enrolement(self, enrolement_id: int):
         db_enroll = self.db.query(Enrolement).filter(Enrolement.enrolment_id == enrolement_id).first()
@@ -97,10 +128,42 @@ class EnrolementService:
         if db_enroll.status == "approved":
             raise HTTPException(status_code=400, detail="Enrolement is already approved")
         db_enroll.status = "approved"
+        # Policy creation is queued in the same transaction and delivered by the outbox dispatcher
+        PolicyOutboxService(self.db).enqueue([enrolement_id])
 
         self.db.commit()
         self.db.refresh(db_enroll)
         return db_enroll
+    def bulk_change_status(self, new_status: EnrolementStatus, enrollment_ids=None, company_id=None,
+                           branch_id=None, created_from=None, created_to=None):
+        """
+        Move every pending enrollment matching the selectors to `new_status` with one
+        UPDATE ... RETURNING. Approvals queue policy creation in the same transaction.
+        Returns the IDs that changed.
+        """
+        if enrollment_ids is None and company_id is None and branch_id is None \
+                and created_from is None and created_to is None:
+            raise HTTPException(status_code=400, detail="At least one of enrollment_ids, company_id, branch_id or a date range is required")
+
+        stmt = update(Enrolement).where(Enrolement.status == EnrolementStatus.pending)
+        if enrollment_ids is not None:
+            stmt = stmt.where(Enrolement.enrolment_id.in_(enrollment_ids))
+        if company_id is not None:
+            stmt = stmt.where(Enrolement.ic_company_id == company_id)
+        if branch_id is not None:
+            stmt = stmt.where(Enrolement.branch_id == branch_id)
+        if created_from is not None:
+            stmt = stmt.where(Enrolement.createdAt >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(Enrolement.createdAt <= created_to)
+        stmt = stmt.values(status=new_status).returning(Enrolement.enrolment_id).execution_options(synchronize_session=False)
+
+        changed_ids = sorted(self.db.execute(stmt).scalars().all())
+        if new_status == EnrolementStatus.approved:
+            PolicyOutboxService(self.db).enqueue(changed_ids)
+        self.db.commit()
+        return changed_ids
+
     def reject_enrolement(self, enrolement_id: int):
         db_enroll = self.db.query(Enrolement).filter(Enrolement.enrolment_id == enrolement_id).first()
         if not db_enroll:
@@ -5,6 +5,7 @@ from sqlalchemy import Column, Integer, String, Date, Enum as SQLEnum
 
 from sqlalchemy.orm import relationship
 from src.database.db import Base
+from src.database.models.customer import Customer
 
 
 
@@ -36,3 +37,5 @@ class Enrolement(Base):
     grid = Column(Integer, nullable=False)
     lattitude = Column(Numeric(12, 8), nullable=False)
     longitude = Column(Numeric(12, 8), nullable=False)
+
+    customer = relationship(Customer, lazy="select")
@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from src.database.db import Base
+
+
+class PolicyOutbox(Base):
+    """Policy creations owed to the policy service, written in the same transaction as the approval."""
+    __tablename__ = "policy_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    enrollment_id = Column(Integer, nullable=False, index=True)
+    status = Column(String(10), nullable=False, default="pending")  # pending | sent | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_policy_outbox_due", "status", "next_attempt_at"),
+    )
@@ -1,13 +1,24 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from service_auth import require_auth
 from fastapi.middleware.cors import CORSMiddleware
 from src.core.config import settings
 from src.routes.enrolement import router as dfs_router
 from src.database.db import Base, engine
+from src.services.policy_dispatcher import policy_dispatcher
 
 # Create all tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="DFS API")
+app = FastAPI(title="DFS API", dependencies=[Depends(require_auth)])
+
+@app.on_event("startup")
+async def start_policy_dispatcher():
+    if settings.POLICY_OUTBOX_ENABLED:
+        policy_dispatcher.start()
+
+@app.on_event("shutdown")
+async def stop_policy_dispatcher():
+    await policy_dispatcher.stop()
 
 # Enable CORS
 app.add_middleware(
@@ -1,17 +1,23 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy.orm import Session
 from src.database.crud.enrolement_crud import EnrolementService
 from src.database.crud.customer_crud import CustomerService
-from src.schemas.enrolement_schema import EnrolementRequest, EnrolementResponse, CustomerResponse
+from src.database.crud.bulk_enrolement_crud import BulkEnrolementService
+from src.schemas.enrolement_schema import (
+    EnrolementRequest, EnrolementResponse, CustomerResponse, BulkEnrolementResponse,
+    BulkStatusChangeRequest, BulkStatusChangeResponse,
+    EnrolementLookupRequest, EnrolementLookupResponse,
+)
 from src.database.db import get_db
 from src.schemas.customer_schema import CustomerRequest
+from src.schemas.grid_zone_schema import GridZoneBatchRequest, GridZoneBatchResponse
 from src.core.config import settings
 from src.utils.grid_and_zone_getter import GridAndZoneGetter
-import httpx
-from src.database.models.customer import Customer
+from src.database.models.enrolement import EnrolementStatus
+from src.services.policy_cache import invalidate_enrollment_snapshots
 
-POLICY_SERVICE_URL = settings.POLICY_SERVICE_URL + '/api'
+MAX_PAGE_SIZE = 5000
 
 # Initialize GridAndZoneGetter
 grid_zone_getter = GridAndZoneGetter()
@@ -125,17 +131,44 @@ def create_enrolement(
     return response
 
 
-@router.get("/{enrollment_id}", response_model=EnrolementResponse)
-def read_enrolement(
-    enrollment_id: int,
-    db: Session = Depends(get_db)
+@router.post("/bulk", response_model=BulkEnrolementResponse)
+def bulk_create_enrolements(
+    file: UploadFile = File(..., description="CSV or Excel sheet with one farmer per row, using the EnrolementRequest field names as headers (grid and cps_zone are looked up)."),
+    db: Session = Depends(get_db),
 ):
-    service = EnrolementService(db)
-    db_enr = service.get_enrolement(enrollment_id)
-    if not db_enr:
-        raise HTTPException(status_code=404, detail="Enrollment not found")
-    db_customer = db.query(Customer).filter(Customer.customer_id == db_enr.customer_id).first()
-    result = EnrolementResponse(
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="Filename cannot be empty.")
+
+    service = BulkEnrolementService(db, grid_zone_getter)
+    try:
+        report = service.import_file(file.file, file.filename)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse {file.filename}: {e}")
+
+    logger.info(f"Bulk enrollment from {file.filename}: {report['created']} created, {report['failed']} failed")
+    return report
+
+
+@router.post("/grid-zone/batch", response_model=GridZoneBatchResponse)
+def lookup_grid_and_zone_batch(request: GridZoneBatchRequest):
+    try:
+        grids, cps_zones, valid = grid_zone_getter.get_grid_and_zone_batch(
+            request.lattitudes, request.longitudes
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return GridZoneBatchResponse(
+        grid=[int(g) if ok else None for g, ok in zip(grids.tolist(), valid.tolist())],
+        cps_zone=[int(z) if ok else None for z, ok in zip(cps_zones.tolist(), valid.tolist())],
+    )
+
+
+def to_enrolement_response(db_enr) -> EnrolementResponse:
+    db_customer = db_enr.customer
+    return EnrolementResponse(
         enrolement_id=db_enr.enrolment_id,
         customer_id=db_enr.customer_id,
         customer=CustomerResponse(
@@ -162,164 +195,136 @@ def read_enrolement(
         lattitude=db_enr.lattitude,
         longitude=db_enr.longitude,
     )
-    return result
+
+
+@router.post("/lookup", response_model=EnrolementLookupResponse)
+def lookup_enrolements(
+    request: EnrolementLookupRequest,
+    db: Session = Depends(get_db)
+):
+    """Fetch many enrollments (with customer) in one call; IDs that do not exist are listed in `missing`."""
+    service = EnrolementService(db)
+    enrollments = service.get_enrolements_by_ids(set(request.enrollment_ids))
+    found = {db_enr.enrolment_id for db_enr in enrollments}
+    return EnrolementLookupResponse(
+        enrollments=[to_enrolement_response(db_enr) for db_enr in enrollments],
+        missing=[eid for eid in dict.fromkeys(request.enrollment_ids) if eid not in found],
+    )
+
+
+@router.get("/{enrollment_id}", response_model=EnrolementResponse)
+def read_enrolement(
+    enrollment_id: int,
+    db: Session = Depends(get_db)
+):
+    service = EnrolementService(db)
+    db_enr = service.get_enrolement(enrollment_id)
+    if not db_enr:
+        raise HTTPException(status_code=404, detail="Enrollment not found")
+    return to_enrolement_response(db_enr)
 
 
 @router.get("/by-company/{company_id}", response_model=list[EnrolementResponse])
 def get_enrollments_by_company_id(
     company_id: int,
+    status: EnrolementStatus | None = None,
+    after_id: int | None = Query(None, description="Return enrollments with an ID greater than this (last ID of the previous page)."),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
 ):
     service = EnrolementService(db)
-    enrollments = service.get_enrolements_by_company_id(company_id)
-    result = []
-    for db_enr in enrollments:
-        db_customer = db.query(Customer).filter(Customer.customer_id == db_enr.customer_id).first()
-        enrol = EnrolementResponse(
-            enrolement_id=db_enr.enrolment_id,
-            customer_id=db_enr.customer_id,
-            customer=CustomerResponse(
-                customer_id=db_customer.customer_id,
-                f_name=db_customer.f_name,
-                m_name=db_customer.m_name,
-                l_name=db_customer.l_name,
-                account_no=db_customer.account_no,
-                account_type=db_customer.account_type,
-            ),
-            createdAt=db_enr.createdAt,
-            user_id=db_enr.user_id,
-            status=db_enr.status,
-            ic_company_id=db_enr.ic_company_id,
-            branch_id=db_enr.branch_id,
-            premium=db_enr.premium,
-            sum_insured=db_enr.sum_insured,
-            date_from=db_enr.date_from,
-            date_to=db_enr.date_to,
-            receipt_no=db_enr.receipt_no,
-            product_id=db_enr.product_id,
-            cps_zone=db_enr.cps_zone,
-            grid=db_enr.grid,
-            lattitude=db_enr.lattitude,
-            longitude=db_enr.longitude,
-        )
-        result.append(enrol)
-    return result
+    enrollments = service.get_enrolements_by_company_id(company_id, status=status, after_id=after_id, limit=limit)
+    return [to_enrolement_response(db_enr) for db_enr in enrollments]
 
 @router.get("/by-user/{user_id}", response_model=list[EnrolementResponse])
 def get_enrollments_by_user_id(
     user_id: int,
+    status: EnrolementStatus | None = None,
+    after_id: int | None = Query(None, description="Return enrollments with an ID greater than this (last ID of the previous page)."),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
 ):
     service = EnrolementService(db)
-    enrollments = service.get_enrolements_by_user_id(user_id)
-    result = []
-    for db_enr in enrollments:
-        db_customer = db.query(Customer).filter(Customer.customer_id == db_enr.customer_id).first()
-        enrol = EnrolementResponse(
-            enrolement_id=db_enr.enrolment_id,
-            customer_id=db_enr.customer_id,
-            customer=CustomerResponse(
-                customer_id=db_customer.customer_id,
-                f_name=db_customer.f_name,
-                m_name=db_customer.m_name,
-                l_name=db_customer.l_name,
-                account_no=db_customer.account_no,
-                account_type=db_customer.account_type,
-            ),
-            createdAt=db_enr.createdAt,
-            user_id=db_enr.user_id,
-            status=db_enr.status,
-            ic_company_id=db_enr.ic_company_id,
-            branch_id=db_enr.branch_id,
-            premium=db_enr.premium,
-            sum_insured=db_enr.sum_insured,
-            date_from=db_enr.date_from,
-            date_to=db_enr.date_to,
-            receipt_no=db_enr.receipt_no,
-            product_id=db_enr.product_id,
-            cps_zone=db_enr.cps_zone,
-            grid=db_enr.grid,
-            lattitude=db_enr.lattitude,
-            longitude=db_enr.longitude,
-        )
-        result.append(enrol)
-    return result
+    enrollments = service.get_enrolements_by_user_id(user_id, status=status, after_id=after_id, limit=limit)
+    return [to_enrolement_response(db_enr) for db_enr in enrollments]
 
 @router.get("/", response_model=list[EnrolementResponse])
 def list_enrolements(
+    company_id: int | None = None,
+    user_id: int | None = None,
+    status: EnrolementStatus | None = None,
+    after_id: int | None = Query(None, description="Return enrollments with an ID greater than this (last ID of the previous page)."),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     service = EnrolementService(db)
-    enrollments =  service.get_enrolements()
-    result = []
-    for db_enr in enrollments:
-        db_customer = db.query(Customer).filter(Customer.customer_id == db_enr.customer_id).first()
-        enrol = EnrolementResponse(
-            enrolement_id=db_enr.enrolment_id,
-            customer_id=db_enr.customer_id,
-            customer=CustomerResponse(
-                customer_id=db_customer.customer_id,
-                f_name=db_customer.f_name,
-                m_name=db_customer.m_name,
-                l_name=db_customer.l_name,
-                account_no=db_customer.account_no,
-                account_type=db_customer.account_type,
-            ),
-            createdAt=db_enr.createdAt,
-            user_id=db_enr.user_id,
-            status=db_enr.status,
-            ic_company_id=db_enr.ic_company_id,
-            branch_id=db_enr.branch_id,
-            premium=db_enr.premium,
-            sum_insured=db_enr.sum_insured,
-            date_from=db_enr.date_from,
-            date_to=db_enr.date_to,
-            receipt_no=db_enr.receipt_no,
-            product_id=db_enr.product_id,
-            cps_zone=db_enr.cps_zone,
-            grid=db_enr.grid,
-            lattitude=db_enr.lattitude,
-            longitude=db_enr.longitude,
-        )
-        result.append(enrol)
-    return result
+    enrollments = service.get_enrolements(
+        company_id=company_id, user_id=user_id, status=status, after_id=after_id, limit=limit
+    )
+    return [to_enrolement_response(db_enr) for db_enr in enrollments]
+
+def bulk_change_status(request: BulkStatusChangeRequest, new_status: EnrolementStatus, db: Session,
+                       background_tasks: BackgroundTasks) -> BulkStatusChangeResponse:
+    service = EnrolementService(db)
+    changed_ids = service.bulk_change_status(
+        new_status,
+        enrollment_ids=request.enrollment_ids,
+        company_id=request.company_id,
+        branch_id=request.branch_id,
+        created_from=request.created_from,
+        created_to=request.created_to,
+    )
+    logger.info(f"Bulk {new_status.value}: {len(changed_ids)} enrollments")
+    background_tasks.add_task(invalidate_enrollment_snapshots, changed_ids)
+    return BulkStatusChangeResponse(status=new_status.value, updated=len(changed_ids), enrollment_ids=changed_ids)
+
+
+# Registered before /{enrollment_id}/... so "bulk" is not parsed as an ID
+@router.put("/bulk/approve", response_model=BulkStatusChangeResponse)
+def bulk_approve_enrolements(
+    request: BulkStatusChangeRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    return bulk_change_status(request, EnrolementStatus.approved, db, background_tasks)
+
+@router.put("/bulk/reject", response_model=BulkStatusChangeResponse)
+def bulk_reject_enrolements(
+    request: BulkStatusChangeRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    return bulk_change_status(request, EnrolementStatus.rejected, db, background_tasks)
 
 @router.put("/{enrollment_id}/approve")
 def approve_enrolement(
     enrollment_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     service = EnrolementService(db)
     try:
-        result = service.approve_enrolement(enrollment_id)
+        service.approve_enrolement(enrollment_id)
     except HTTPException as e:
         raise e
+    background_tasks.add_task(invalidate_enrollment_snapshots, [enrollment_id])
 
-    if result:
-        url = f"{POLICY_SERVICE_URL}/policy"
-        payload = {
-            "enrollment_id": enrollment_id,
-        }
-        try:
-            response = httpx.post(url, json=payload)
-            response.raise_for_status()
-            return {
-                "sucess": True,
-                "message": f"Enrollment for {enrollment_id} approved and policy created successfully",
-            }
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=500, detail=f"Policy service request failed: {e}")
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=response.status_code, detail=f"Policy service error: {e}")
+    return {
+        "sucess": True,
+        "message": f"Enrollment for {enrollment_id} approved and policy creation queued",
+    }
 
 @router.put("/{enrollment_id}/reject")
 def reject_enrolement(
     enrollment_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     service = EnrolementService(db)
     try:
-        return service.reject_enrolement(enrollment_id)
+        result = service.reject_enrolement(enrollment_id)
     except HTTPException as e:
         raise e
+    background_tasks.add_task(invalidate_enrollment_snapshots, [enrollment_id])
+    return result
     
\ No newline at end of file
@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class CustomerResponse(BaseModel):
     customer_id: int
@@ -51,3 +51,40 @@ class EnrolementResponse(BaseModel):
     lattitude: float 
     longitude: float
 
+
+
+class BulkEnrolementRowError(BaseModel):
+    row: int  # Spreadsheet row number; the header is row 1
+    receipt_no: str | None = None
+    errors: list[str]
+
+
+class BulkEnrolementResponse(BaseModel):
+    total_rows: int
+    created: int
+    failed: int
+    errors: list[BulkEnrolementRowError]
+
+
+class EnrolementLookupRequest(BaseModel):
+    enrollment_ids: list[int] = Field(..., min_length=1, max_length=5000)
+
+
+class EnrolementLookupResponse(BaseModel):
+    enrollments: list[EnrolementResponse]
+    missing: list[int]
+
+
+class BulkStatusChangeRequest(BaseModel):
+    # Any combination narrows the selection; only pending enrollments are changed
+    enrollment_ids: list[int] | None = None
+    company_id: int | None = None
+    branch_id: int | None = None
+    created_from: date | None = None
+    created_to: date | None = None
+
+
+class BulkStatusChangeResponse(BaseModel):
+    status: str
+    updated: int
+    enrollment_ids: list[int]
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field, model_validator
+
+# Largest coordinate list one request may look up, so a single call cannot force an
+# arbitrarily large KDTree query
+GRID_ZONE_BATCH_LIMIT = 5000
+
+
+class GridZoneBatchRequest(BaseModel):
+    lattitudes: list[float] = Field(..., max_length=GRID_ZONE_BATCH_LIMIT)
+    longitudes: list[float] = Field(..., max_length=GRID_ZONE_BATCH_LIMIT)
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        if len(self.lattitudes) != len(self.longitudes):
+            raise ValueError("lattitudes and longitudes must have the same length")
+        return self
+
+
+class GridZoneBatchResponse(BaseModel):
+    # Aligned with the request arrays; None where the nearest grid has no valid CPS zone
+    grid: list[int | None]
+    cps_zone: list[int | None]
@@ -0,0 +1,28 @@
+import logging
+
+import httpx
+from service_auth import service_headers
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+POLICY_SERVICE_URL = settings.POLICY_SERVICE_URL + '/api'
+
+# Invalidation is best effort: the policy cache TTL bounds staleness if a push is lost
+timeout = httpx.Timeout(connect=2.0, read=5.0, write=2.0, pool=None)
+
+
+def invalidate_enrollment_snapshots(enrollment_ids):
+    """Tell the policy service to drop its cached snapshots of these enrollments."""
+    enrollment_ids = list(enrollment_ids)
+    if not enrollment_ids:
+        return
+    try:
+        response = httpx.post(
+            f"{POLICY_SERVICE_URL}/enrollment-cache/invalidate",
+            json={"enrollment_ids": enrollment_ids}, headers=service_headers(), timeout=timeout,
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.warning(f"Could not invalidate policy enrollment cache for {len(enrollment_ids)} enrollments: {e}")
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+
+import httpx
+from service_auth import service_headers
+
+from src.core.config import settings
+from src.database.db import SessionLocal
+from src.database.crud.policy_outbox_crud import PolicyOutboxService
+
+logger = logging.getLogger(__name__)
+
+POLICY_SERVICE_URL = settings.POLICY_SERVICE_URL + '/api'
+
+# Timeout configuration for HTTP calls
+timeout = httpx.Timeout(connect=5.0, read=30.0, write=5.0, pool=None)
+
+
+class PolicyOutboxDispatcher:
+    """
+    Drains the policy outbox in the background: leases a batch of due rows, asks the
+    policy service to issue all their policies in one batch call, and records the
+    outcome per row. Failures are retried with exponential backoff.
+    """
+
+    def __init__(self, session_factory=SessionLocal, client: httpx.AsyncClient | None = None):
+        self.session_factory = session_factory
+        self.client = client
+        self.batch_size = settings.POLICY_OUTBOX_BATCH_SIZE
+        self.poll_interval = settings.POLICY_OUTBOX_POLL_SECONDS
+        self.max_attempts = settings.POLICY_OUTBOX_MAX_ATTEMPTS
+        self._task: asyncio.Task | None = None
+        self._owns_client = client is None
+
+    def _run_db(self, method, *args):
+        db = self.session_factory()
+        try:
+            return getattr(PolicyOutboxService(db), method)(*args)
+        finally:
+            db.close()
+
+    async def _create_policies(self, claimed):
+        """Returns (outbox_id, error, retryable) per claimed row; error is None on success."""
+        outbox_ids = {}
+        for outbox_id, enrollment_id in claimed:
+            outbox_ids.setdefault(enrollment_id, []).append(outbox_id)
+        try:
+            response = await self.client.post(
+                f"{POLICY_SERVICE_URL}/policies/batch", json={"enrollment_ids": list(outbox_ids)}
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            # Client errors will not fix themselves, except timeouts and throttling
+            retryable = status >= 500 or status in (408, 429)
+            error = f"Policy service error {status}: {e.response.text[:500]}"
+            return [(outbox_id, error, retryable) for outbox_id, _ in claimed]
+        except httpx.RequestError as e:
+            return [(outbox_id, f"Policy service request failed: {e}", True) for outbox_id, _ in claimed]
+
+        body = response.json()
+        outcomes = {}
+        for policy in body["policies"]:
+            for outbox_id in outbox_ids.get(policy["enrollment_id"], ()):
+                outcomes[outbox_id] = (outbox_id, None, True)
+        # Per-enrollment rejections are data problems; retrying the same enrollment will not help
+        for error in body["errors"]:
+            for outbox_id in outbox_ids.get(error["enrollment_id"], ()):
+                outcomes[outbox_id] = (outbox_id, f"Policy rejected: {error['detail']}", False)
+        # A row the response does not mention goes through the normal backoff, so it is
+        # eventually dead-lettered instead of being leased forever
+        return [
+            outcomes.get(outbox_id, (outbox_id, "Policy service response did not include this enrollment", True))
+            for outbox_id, _ in claimed
+        ]
+
+    async def dispatch_once(self) -> int:
+        """Deliver one batch of due rows. Returns the number of rows attempted."""
+        lease_seconds = timeout.read + timeout.connect + 30
+        claimed = await asyncio.to_thread(self._run_db, "claim_due", self.batch_size, lease_seconds)
+        if not claimed:
+            return 0
+
+        results = await self._create_policies(claimed)
+        sent = [outbox_id for outbox_id, error, _ in results if error is None]
+        failures = [result for result in results if result[1] is not None]
+
+        await asyncio.to_thread(self._run_db, "mark_sent", sent)
+        await asyncio.to_thread(
+            self._run_db, "mark_failed_attempts", failures, self.max_attempts,
+            settings.POLICY_OUTBOX_BASE_BACKOFF_SECONDS, settings.POLICY_OUTBOX_MAX_BACKOFF_SECONDS,
+        )
+        if failures:
+            logger.warning(f"Policy outbox: {len(sent)} sent, {len(failures)} failed (first error: {failures[0][1]})")
+        else:
+            logger.info(f"Policy outbox: {len(sent)} sent")
+        return len(claimed)
+
+    async def run(self):
+        while True:
+            try:
+                processed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Policy outbox dispatch failed")
+                processed = 0
+            # A full batch means there is probably more waiting
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=timeout, headers=service_headers())
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+policy_dispatcher = PolicyOutboxDispatcher()
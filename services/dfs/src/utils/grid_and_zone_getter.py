@@ -1,6 +1,10 @@
+import os
+import shutil
+import tempfile
 import pandas as pd
 from sklearn.neighbors import KDTree
 import pickle
+import threading
 import numpy as np
 import logging
 from fastapi import HTTPException, Depends
@@ -10,41 +14,160 @@ from sqlalchemy.orm import Session
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CPS_ZONE_MIN = 1
+CPS_ZONE_MAX = 200
+
+# Memory-mappable index layout: one .npy per array plus a small pickle of the KDTree scalars
+TREE_ARRAYS = ("tree_data", "tree_idx_array", "tree_node_data", "tree_node_bounds")
+COLUMN_ARRAYS = {
+    "grid_code": "GRID_CODE",
+    "cps_zone": "CPS_ZONE",
+    "latitude": "latitude",
+    "longitude": "longitude",
+}
+TREE_META_FILE = "tree_meta.pkl"
+# Written last; an index directory without it is incomplete and is ignored
+COMPLETE_MARKER = "COMPLETE"
+
+
+def is_complete_index(index_dir: str) -> bool:
+    return os.path.isfile(os.path.join(index_dir, COMPLETE_MARKER))
+
+
+def export_grid_index(tree_model: KDTree, data_df: pd.DataFrame, index_dir: str):
+    """
+    Write the KDTree and the GRID_CODE/CPS_ZONE/lat/lon columns as .npy files that
+    `load_grid_index` can memory-map, so workers share the pages through the OS cache.
+    The files go to a temporary sibling directory that is moved into place once
+    complete, so an interrupted export never leaves a half-written index behind.
+    """
+    index_dir = os.path.abspath(index_dir)
+    parent = os.path.dirname(index_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(index_dir)}-", dir=parent)
+    try:
+        state = tree_model.__getstate__()
+        for name, arr in zip(TREE_ARRAYS, state[:len(TREE_ARRAYS)]):
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(arr))
+        with open(os.path.join(tmp_dir, TREE_META_FILE), "wb") as f:
+            pickle.dump(state[len(TREE_ARRAYS):], f)
+        for name, column in COLUMN_ARRAYS.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), data_df[column].to_numpy(dtype=np.float64))
+        open(os.path.join(tmp_dir, COMPLETE_MARKER), "w").close()
+
+        # os.replace cannot overwrite a non-empty directory: move any old index aside first
+        stale_dir = None
+        if os.path.exists(index_dir):
+            stale_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(index_dir)}-old-", dir=parent)
+            os.replace(index_dir, os.path.join(stale_dir, "index"))
+        os.replace(tmp_dir, index_dir)
+        if stale_dir:
+            shutil.rmtree(stale_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    logger.info(f"Grid index with {len(data_df)} points written to {index_dir}")
+
+
+def load_grid_index(index_dir: str):
+    """Memory-map an index written by `export_grid_index`. Returns (tree_model, columns)."""
+    arrays = [np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r") for name in TREE_ARRAYS]
+    with open(os.path.join(index_dir, TREE_META_FILE), "rb") as f:
+        meta = pickle.load(f)
+    tree_model = KDTree.__new__(KDTree)
+    tree_model.__setstate__(tuple(arrays) + tuple(meta))
+    columns = {
+        name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+        for name in COLUMN_ARRAYS
+    }
+    return tree_model, columns
+
+
 class GridAndZoneGetter:
-    def __init__(self, tree_path="src/utils/kdtree.pkl", data_path="src/utils/selected_data_sorted.pkl", distance_threshold=0.9):
-        logger.info("Initializing GridAndZoneGetter...")
-        with open(tree_path, "rb") as f:
-            self.tree_model = pickle.load(f)
-            logger.info(f"KDTree model loaded from {tree_path}")
-        with open(data_path, "rb") as f:
-            self.data_df = pickle.load(f)
-            logger.info(f"Data loaded from {data_path}")
+    def __init__(self, index_dir="src/utils/grid_index", tree_path="src/utils/kdtree.pkl", data_path="src/utils/selected_data_sorted.pkl", distance_threshold=0.9):
+        # Nothing is read here: the index is loaded on first lookup
+        self.index_dir = index_dir
+        self.tree_path = tree_path
+        self.data_path = data_path
         self.distance_threshold = distance_threshold
-        logger.info(f"Distance threshold set to {self.distance_threshold}")
+        self.tree_model = None
+        self.grid_codes = None
+        self.cps_zones = None
+        self._load_lock = threading.Lock()
 
-    def get_grid_and_zone_inference_filtered(self, lat, lon):
-     logger.info(f"Querying grid and zone for coordinates: lat={lat}, lon={lon}")
+    def _ensure_loaded(self):
+        if self.tree_model is not None:
+            return
+        with self._load_lock:
+            if self.tree_model is not None:
+                return
+            if is_complete_index(self.index_dir):
+                tree_model, columns = load_grid_index(self.index_dir)
+                logger.info(f"Memory-mapped grid index loaded from {self.index_dir}")
+            else:
+                # Legacy pickles: fully deserialized into this process
+                logger.warning(f"No complete grid index at {self.index_dir}; falling back to {self.tree_path} and {self.data_path}")
+                with open(self.tree_path, "rb") as f:
+                    tree_model = pickle.load(f)
+                with open(self.data_path, "rb") as f:
+                    data_df = pickle.load(f)
+                columns = {
+                    name: data_df[column].to_numpy(dtype=np.float64)
+                    for name, column in COLUMN_ARRAYS.items()
+                }
+            self.grid_codes = columns["grid_code"]
+            self.cps_zones = columns["cps_zone"]
+            self.tree_model = tree_model
+
+    def get_grid_and_zone_batch(self, lats, lons):
+        """
+        Look up the nearest grid and CPS zone for N coordinates with a single KDTree query.
+        Returns (grids, cps_zones, valid) arrays of length N; `valid` is False where the
+        matched CPS zone is outside 1-200.
+        """
+        self._ensure_loaded()
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        if lats.shape != lons.shape:
+            raise ValueError("Latitude and longitude arrays must have the same length.")
 
-     if self.data_df.empty:
-        logger.warning("DataFrame is empty. Returning None, None.")
-        return None, None
+        if len(self.grid_codes) == 0 or lats.size == 0:
+            empty = np.empty(lats.size, dtype=np.float64)
+            return np.full_like(empty, np.nan), np.full_like(empty, np.nan), np.zeros(lats.size, dtype=bool)
 
-     dist, ind = self.tree_model.query([[lon, lat]], k=1)
-     logger.info(f"KDTree query result: dist={dist}, ind={ind}")
+        # The tree is built on (lon, lat) pairs
+        _, ind = self.tree_model.query(np.column_stack((lons, lats)), k=1)
+        ind = ind[:, 0]
+
+        grids = self.grid_codes[ind]
+        cps_zones = self.cps_zones[ind]
+        valid = (cps_zones >= CPS_ZONE_MIN) & (cps_zones <= CPS_ZONE_MAX)
+        logger.info(f"Batch grid/zone lookup: {lats.size} points, {int((~valid).sum())} out of zone range")
+        return grids, cps_zones, valid
+
+    def get_grid_and_zone_inference_filtered(self, lat, lon):
+        logger.info(f"Querying grid and zone for coordinates: lat={lat}, lon={lon}")
 
-     closest_row_index = self.data_df.iloc[ind[0][0]].name
-     closest_row = self.data_df.loc[closest_row_index]
+        self._ensure_loaded()
+        if len(self.grid_codes) == 0:
+            logger.warning("Grid index is empty. Returning None, None.")
+            return None, None
 
-    # ✅ Explicitly log the closest latitude and longitude matched
-     closest_lat = closest_row["latitude"]
-     closest_lon = closest_row["longitude"]
-     logger.info(f"Closest match coordinates (from dataset): latitude={closest_lat}, longitude={closest_lon}")
+        grids, cps_zones, valid = self.get_grid_and_zone_batch([lat], [lon])
+        if not valid[0]:
+            logger.error(f"CPS_ZONE {cps_zones[0]} is out of range ({CPS_ZONE_MIN}-{CPS_ZONE_MAX}).")
+            raise ValueError(f"CPS_ZONE {cps_zones[0]} is out of range ({CPS_ZONE_MIN}-{CPS_ZONE_MAX}).")
 
-     logger.info(f"Closest row found: {closest_row.to_dict()}")
+        logger.info(f"Returning GRID_CODE={grids[0]}, CPS_ZONE={cps_zones[0]}")
+        return float(grids[0]), float(cps_zones[0])
 
-     if not (1 <= closest_row["CPS_ZONE"] <= 200):
-        logger.error(f"CPS_ZONE {closest_row['CPS_ZONE']} is out of range (1-200).")
-        raise ValueError(f"CPS_ZONE {closest_row['CPS_ZONE']} is out of range (1-200).")
 
-     logger.info(f"Returning GRID_CODE={closest_row['GRID_CODE']}, CPS_ZONE={closest_row['CPS_ZONE']}")
-     return float(closest_row["GRID_CODE"]), float(closest_row["CPS_ZONE"])
+if __name__ == "__main__":
+    # Convert the legacy pickles into the memory-mapped index:
+    #   python -m src.utils.grid_and_zone_getter
+    getter = GridAndZoneGetter()
+    with open(getter.tree_path, "rb") as f:
+        tree = pickle.load(f)
+    with open(getter.data_path, "rb") as f:
+        df = pickle.load(f)
+    export_grid_index(tree, df, getter.index_dir)
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.database.db import get_db
+from src.database.models.customer import Customer
+from src.database.models.enrolement import Enrolement
+from src.main import app
+
+HEADER = (
+    "f_name,m_name,l_name,account_no,account_type,user_id,sum_insured,ic_company_id,"
+    "branch_id,premium,date_from,date_to,receipt_no,product_id,lattitude,longitude"
+)
+
+
+class FakeGridZoneGetter:
+    """Zone 0 (invalid) for negative latitudes, zone 3 otherwise."""
+
+    def get_grid_and_zone_batch(self, lats, lons):
+        lats = np.asarray(lats, dtype=float)
+        zones = np.where(lats < 0, 0.0, 3.0)
+        return np.full(lats.size, 42.0), zones, zones > 0
+
+
+@pytest.fixture
+def bulk_db(monkeypatch):
+    monkeypatch.setattr("src.routes.enrolement.grid_zone_getter", FakeGridZoneGetter())
+    # Same session factory the app uses under test (see conftest)
+    sessions = app.dependency_overrides[get_db]()
+    db = next(sessions)
+    yield db
+    db.rollback()
+    db.query(Enrolement).delete()
+    db.query(Customer).delete()
+    db.commit()
+    sessions.close()
+
+
+def row(receipt_no, **overrides):
+    values = {
+        "f_name": "Abebe", "m_name": "Kebede", "l_name": "Tesfaye", "account_no": "ACC-1",
+        "account_type": "saving", "user_id": "10", "sum_insured": "5000", "ic_company_id": "2",
+        "branch_id": "3", "premium": "100", "date_from": "2025-01-01", "date_to": "2026-01-01",
+        "receipt_no": receipt_no, "product_id": "7", "lattitude": "9.0", "longitude": "38.7",
+    }
+    values.update(overrides)
+    return ",".join(values[name] for name in HEADER.split(","))
+
+
+def upload(client, lines, filename="farmers.csv"):
+    content = "\n".join([HEADER] + lines).encode()
+    return client.post("/api/enrollments/bulk", files={"file": (filename, content, "text/csv")})
+
+
+def test_bulk_import_creates_valid_rows_and_reports_errors(client: TestClient, bulk_db):
+    resp = upload(client, [
+        row("R1"),
+        row("R2", premium="0"),
+        row("R1"),
+        row("R3", lattitude="-1"),
+        row("R4", date_from="2027-01-01"),
+        row("R5", user_id="abc", f_name=""),
+    ])
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["total_rows"] == 6
+    assert body["created"] == 1
+    assert body["failed"] == 5
+
+    errors = {e["row"]: e["errors"] for e in body["errors"]}
+    assert errors[3] == ["premium must be greater than zero"]
+    assert errors[4] == ["Duplicate receipt_no in file"]
+    assert "CPS_ZONE is out of range" in errors[5][0]
+    assert errors[6] == ["date_from must be before date_to"]
+    assert set(errors[7]) == {"f_name cannot be empty", "user_id must be a positive integer"}
+
+    enrolement = bulk_db.query(Enrolement).filter(Enrolement.receipt_no == "R1").one()
+    assert enrolement.grid == 42 and enrolement.cps_zone == 3
+    assert bulk_db.query(Customer).filter(Customer.customer_id == enrolement.customer_id).one().f_name == "Abebe"
+
+
+def test_bulk_import_rejects_receipts_already_in_db(client: TestClient, bulk_db):
+    assert upload(client, [row("R10")]).json()["created"] == 1
+    body = upload(client, [row("R10"), row("R11")]).json()
+    assert body["created"] == 1
+    assert body["errors"] == [{"row": 2, "receipt_no": "R10", "errors": ["Duplicate receipt_no is not allowed"]}]
+
+
+def test_bulk_import_requires_columns(client: TestClient, bulk_db):
+    resp = client.post("/api/enrollments/bulk", files={"file": ("farmers.csv", b"f_name\nAbebe", "text/csv")})
+    assert resp.status_code == 400
+    assert "Missing required columns" in resp.text
+
+
+def test_bulk_import_rejects_unknown_file_type(client: TestClient, bulk_db):
+    resp = upload(client, [row("R1")], filename="farmers.txt")
+    assert resp.status_code == 400
+
+
+def test_bulk_import_lets_valid_row_reuse_receipt_of_rejected_row(client: TestClient, bulk_db):
+    body = upload(client, [row("R20", premium="0"), row("R20"), row("R20")]).json()
+    assert body["created"] == 1
+    errors = {e["row"]: e["errors"] for e in body["errors"]}
+    assert errors == {2: ["premium must be greater than zero"], 4: ["Duplicate receipt_no in file"]}
+    assert bulk_db.query(Enrolement).filter(Enrolement.receipt_no == "R20").count() == 1
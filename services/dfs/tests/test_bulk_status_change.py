@@ -0,0 +1,90 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db import get_db
+from src.database.models.customer import Customer
+from src.database.models.enrolement import Enrolement, EnrolementStatus
+from src.database.models.policy_outbox import PolicyOutbox
+from src.main import app
+
+
+@pytest.fixture
+def db():
+    sessions = app.dependency_overrides[get_db]()
+    engine = next(sessions).get_bind()
+    sessions.close()
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.rollback()
+    session.query(PolicyOutbox).delete()
+    session.query(Enrolement).delete()
+    session.query(Customer).delete()
+    session.commit()
+    session.close()
+
+
+@pytest.fixture
+def enrolements(db):
+    rows = [
+        # (company, branch, created, status)
+        (1, 1, date(2025, 1, 10), EnrolementStatus.pending),
+        (1, 2, date(2025, 2, 10), EnrolementStatus.pending),
+        (1, 1, date(2025, 3, 10), EnrolementStatus.rejected),
+        (2, 1, date(2025, 1, 10), EnrolementStatus.pending),
+    ]
+    ids = []
+    for n, (company_id, branch_id, created, status) in enumerate(rows):
+        enrolement = Enrolement(
+            customer=Customer(f_name="F", m_name="M", l_name="L", account_no=f"A{n}", account_type="saving"),
+            user_id=1, ic_company_id=company_id, branch_id=branch_id, premium=10, sum_insured=100,
+            date_from=date(2025, 1, 1), date_to=date(2026, 1, 1), receipt_no=f"B{n}", product_id=1,
+            status=status, cps_zone=3, grid=42, lattitude=9.0, longitude=38.0, createdAt=created,
+        )
+        db.add(enrolement)
+        db.flush()
+        ids.append(enrolement.enrolment_id)
+    db.commit()
+    return ids
+
+
+def statuses(db):
+    db.expire_all()
+    return {e.enrolment_id: e.status for e in db.query(Enrolement)}
+
+
+def test_bulk_approve_by_company_only_touches_pending(client: TestClient, db, enrolements):
+    resp = client.put("/api/enrollments/bulk/approve", json={"company_id": 1})
+    assert resp.status_code == 200, resp.text
+    assert resp.json() == {"status": "approved", "updated": 2, "enrollment_ids": enrolements[:2]}
+
+    current = statuses(db)
+    assert current[enrolements[2]] == EnrolementStatus.rejected
+    assert current[enrolements[3]] == EnrolementStatus.pending
+
+    queued = sorted(row.enrollment_id for row in db.query(PolicyOutbox))
+    assert queued == enrolements[:2]
+
+
+def test_bulk_approve_by_branch_and_date_range(client: TestClient, db, enrolements):
+    resp = client.put("/api/enrollments/bulk/approve", json={
+        "branch_id": 1, "created_from": "2025-01-01", "created_to": "2025-01-31",
+    })
+    assert resp.json()["enrollment_ids"] == [enrolements[0], enrolements[3]]
+
+
+def test_bulk_reject_by_ids_does_not_queue_policies(client: TestClient, db, enrolements, monkeypatch):
+    invalidated = []
+    monkeypatch.setattr("src.routes.enrolement.invalidate_enrollment_snapshots", invalidated.extend)
+    resp = client.put("/api/enrollments/bulk/reject", json={"enrollment_ids": [enrolements[1], enrolements[3]]})
+    assert resp.json()["updated"] == 2
+    assert invalidated == [enrolements[1], enrolements[3]]
+    assert statuses(db)[enrolements[1]] == EnrolementStatus.rejected
+    assert db.query(PolicyOutbox).count() == 0
+
+
+def test_bulk_status_change_requires_a_selector(client: TestClient, db, enrolements):
+    resp = client.put("/api/enrollments/bulk/approve", json={})
+    assert resp.status_code == 400
@@ -143,26 +143,23 @@ class TestEnrolementAPI:
             "src.routes.enrolement.EnrolementService.approve_enrolement",
             lambda self, eid: True
         )
-        class Dummy:
-            status_code = 200
-            def raise_for_status(self): pass
-        monkeypatch.setattr("httpx.post", lambda url, json: Dummy())
 
-        resp = client.put("/enrollments/7/approve")
+        resp = client.put("/api/enrollments/7/approve")
         assert resp.status_code == 200
+        assert "policy creation queued" in resp.text
 
-    def test_approve_enrolement_policy_fail(self, client: TestClient, monkeypatch):
+    def test_approve_enrolement_does_not_call_policy_service(self, client: TestClient, monkeypatch):
         monkeypatch.setattr(
             "src.routes.enrolement.EnrolementService.approve_enrolement",
             lambda self, eid: True
         )
+        monkeypatch.setattr("src.routes.enrolement.invalidate_enrollment_snapshots", lambda ids: None)
         monkeypatch.setattr(
             "httpx.post",
             lambda url, json: (_ for _ in ()).throw(httpx.RequestError("fail"))
         )
-        resp = client.put("/enrollments/8/approve")
-        assert resp.status_code == 500
-        assert "Policy service request failed" in resp.text
+        resp = client.put("/api/enrollments/8/approve")
+        assert resp.status_code == 200
 
     def test_reject_enrolement_success(self, client: TestClient, monkeypatch):
         monkeypatch.setattr(
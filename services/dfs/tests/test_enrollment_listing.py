@@ -0,0 +1,79 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from src.database.db import get_db
+from src.database.models.customer import Customer
+from src.database.models.enrolement import Enrolement, EnrolementStatus
+from src.main import app
+
+
+@pytest.fixture
+def enrolements():
+    sessions = app.dependency_overrides[get_db]()
+    db = next(sessions)
+    rows = [
+        # (company, user, status)
+        (1, 10, EnrolementStatus.pending),
+        (1, 11, EnrolementStatus.approved),
+        (2, 10, EnrolementStatus.pending),
+        (1, 10, EnrolementStatus.pending),
+    ]
+    ids = []
+    for n, (company_id, user_id, status) in enumerate(rows):
+        customer = Customer(f_name=f"F{n}", m_name="M", l_name="L", account_no=f"A{n}", account_type="saving")
+        enrolement = Enrolement(
+            customer=customer, user_id=user_id, ic_company_id=company_id, branch_id=1,
+            premium=10, sum_insured=100, date_from=date(2025, 1, 1), date_to=date(2026, 1, 1),
+            receipt_no=f"L{n}", product_id=1, status=status, cps_zone=3, grid=42,
+            lattitude=9.0, longitude=38.0, createdAt=date(2025, 1, 1),
+        )
+        db.add(enrolement)
+        db.flush()
+        ids.append(enrolement.enrolment_id)
+    db.commit()
+    yield ids
+    db.query(Enrolement).delete()
+    db.query(Customer).delete()
+    db.commit()
+    sessions.close()
+
+
+def test_listing_uses_single_query(client: TestClient, enrolements):
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    engine = next(app.dependency_overrides[get_db]()).get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        resp = client.get("/api/enrollments/")
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert resp.status_code == 200
+    assert [e["enrolement_id"] for e in resp.json()] == enrolements
+    assert resp.json()[0]["customer"]["f_name"] == "F0"
+    assert len(statements) == 1
+
+
+def test_listing_filters(client: TestClient, enrolements):
+    resp = client.get("/api/enrollments/", params={"company_id": 1, "user_id": 10, "status": "pending"})
+    assert [e["enrolement_id"] for e in resp.json()] == [enrolements[0], enrolements[3]]
+
+    resp = client.get("/api/enrollments/by-company/1", params={"status": "approved"})
+    assert [e["enrolement_id"] for e in resp.json()] == [enrolements[1]]
+
+    resp = client.get("/api/enrollments/by-user/10")
+    assert [e["enrolement_id"] for e in resp.json()] == [enrolements[0], enrolements[2], enrolements[3]]
+
+
+def test_listing_keyset_pagination(client: TestClient, enrolements):
+    first = client.get("/api/enrollments/", params={"limit": 3}).json()
+    assert [e["enrolement_id"] for e in first] == enrolements[:3]
+
+    second = client.get("/api/enrollments/", params={"limit": 3, "after_id": first[-1]["enrolement_id"]}).json()
+    assert [e["enrolement_id"] for e in second] == enrolements[3:]
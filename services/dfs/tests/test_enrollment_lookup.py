@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.database.db import get_db
+from src.database.models.customer import Customer
+from src.database.models.enrolement import Enrolement, EnrolementStatus
+from src.main import app
+
+
+@pytest.fixture
+def enrolements():
+    sessions = app.dependency_overrides[get_db]()
+    db = next(sessions)
+    ids = []
+    for n in range(3):
+        enrolement = Enrolement(
+            customer=Customer(f_name=f"F{n}", m_name="M", l_name="L", account_no=f"A{n}", account_type="saving"),
+            user_id=1, ic_company_id=1, branch_id=1, premium=10, sum_insured=100 * (n + 1),
+            date_from=date(2025, 1, 1), date_to=date(2026, 1, 1), receipt_no=f"K{n}", product_id=1,
+            status=EnrolementStatus.approved, cps_zone=3, grid=42, lattitude=9.0, longitude=38.0,
+            createdAt=date(2025, 1, 1),
+        )
+        db.add(enrolement)
+        db.flush()
+        ids.append(enrolement.enrolment_id)
+    db.commit()
+    yield ids
+    db.query(Enrolement).delete()
+    db.query(Customer).delete()
+    db.commit()
+    sessions.close()
+
+
+def test_lookup_returns_enrollments_with_customers(client: TestClient, enrolements):
+    unknown = max(enrolements) + 100
+    resp = client.post("/api/enrollments/lookup", json={"enrollment_ids": [enrolements[2], unknown, enrolements[0]]})
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert [e["enrolement_id"] for e in body["enrollments"]] == [enrolements[0], enrolements[2]]
+    assert body["enrollments"][1]["customer"]["f_name"] == "F2"
+    assert body["enrollments"][1]["sum_insured"] == 300
+    assert body["missing"] == [unknown]
+
+
+def test_lookup_limits_batch_size(client: TestClient):
+    assert client.post("/api/enrollments/lookup", json={"enrollment_ids": []}).status_code == 422
+    assert client.post("/api/enrollments/lookup", json={"enrollment_ids": list(range(5001))}).status_code == 422
@@ -0,0 +1,138 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.neighbors import KDTree
+
+from src.schemas.grid_zone_schema import GRID_ZONE_BATCH_LIMIT
+from src.utils.grid_and_zone_getter import GridAndZoneGetter, export_grid_index
+
+
+@pytest.fixture
+def getter(tmp_path):
+    data_df = pd.DataFrame({
+        "GRID_CODE": [101, 102, 103],
+        "CPS_ZONE": [1, 5, 0],  # zone 0 is out of range
+        "latitude": [9.0, 10.0, 11.0],
+        "longitude": [38.0, 39.0, 40.0],
+    })
+    tree = KDTree(data_df[["longitude", "latitude"]].to_numpy())
+
+    tree_path = tmp_path / "kdtree.pkl"
+    data_path = tmp_path / "selected_data_sorted.pkl"
+    with open(tree_path, "wb") as f:
+        pickle.dump(tree, f)
+    with open(data_path, "wb") as f:
+        pickle.dump(data_df, f)
+    return GridAndZoneGetter(tree_path=str(tree_path), data_path=str(data_path))
+
+
+def test_batch_lookup_matches_nearest_points(getter):
+    grids, cps_zones, valid = getter.get_grid_and_zone_batch(
+        [9.1, 10.2, 10.9], [38.1, 38.9, 40.1]
+    )
+    assert grids.tolist() == [101, 102, 103]
+    assert cps_zones.tolist() == [1, 5, 0]
+    assert valid.tolist() == [True, True, False]
+
+
+def test_batch_lookup_rejects_mismatched_lengths(getter):
+    with pytest.raises(ValueError):
+        getter.get_grid_and_zone_batch([9.0, 10.0], [38.0])
+
+
+def test_single_lookup_uses_batch_path(getter):
+    assert getter.get_grid_and_zone_inference_filtered(10.0, 39.0) == (102.0, 5.0)
+    with pytest.raises(ValueError):
+        getter.get_grid_and_zone_inference_filtered(11.0, 40.0)
+
+
+def test_batch_endpoint(client, monkeypatch, getter):
+    monkeypatch.setattr("src.routes.enrolement.grid_zone_getter", getter)
+    resp = client.post(
+        "/api/enrollments/grid-zone/batch",
+        json={"lattitudes": [9.0, 11.0], "longitudes": [38.0, 40.0]},
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json() == {"grid": [101, None], "cps_zone": [1, None]}
+
+
+def test_batch_endpoint_length_mismatch(client):
+    resp = client.post(
+        "/api/enrollments/grid-zone/batch",
+        json={"lattitudes": [9.0], "longitudes": []},
+    )
+    assert resp.status_code == 422
+
+
+def test_batch_endpoint_rejects_oversized_batches(client, monkeypatch):
+    monkeypatch.setattr("src.routes.enrolement.grid_zone_getter", None)
+    coords = [9.0] * (GRID_ZONE_BATCH_LIMIT + 1)
+    resp = client.post(
+        "/api/enrollments/grid-zone/batch",
+        json={"lattitudes": coords, "longitudes": coords},
+    )
+    assert resp.status_code == 422
+
+
+def test_constructor_is_lazy(tmp_path):
+    # Missing files are only noticed on first lookup
+    getter = GridAndZoneGetter(
+        index_dir=str(tmp_path / "missing"),
+        tree_path=str(tmp_path / "missing.pkl"),
+        data_path=str(tmp_path / "missing.pkl"),
+    )
+    with pytest.raises(FileNotFoundError):
+        getter.get_grid_and_zone_batch([9.0], [38.0])
+
+
+def test_memory_mapped_index_matches_pickles(getter, tmp_path):
+    getter._ensure_loaded()
+    index_dir = tmp_path / "grid_index"
+    export_grid_index(getter.tree_model, pd.read_pickle(getter.data_path), str(index_dir))
+
+    mapped = GridAndZoneGetter(index_dir=str(index_dir), tree_path="unused", data_path="unused")
+    lats, lons = [9.1, 10.2, 10.9], [38.1, 38.9, 40.1]
+    for expected, actual in zip(getter.get_grid_and_zone_batch(lats, lons), mapped.get_grid_and_zone_batch(lats, lons)):
+        assert np.array_equal(expected, actual)
+    assert isinstance(mapped.grid_codes, np.memmap)
+
+
+def test_interrupted_export_leaves_no_index(getter, tmp_path, monkeypatch):
+    getter._ensure_loaded()
+    parent = tmp_path / "indexes"
+    index_dir = parent / "grid_index"
+    real_save = np.save
+
+    def failing_save(path, arr):
+        if path.endswith("latitude.npy"):
+            raise OSError("disk full")
+        real_save(path, arr)
+
+    monkeypatch.setattr(np, "save", failing_save)
+    with pytest.raises(OSError):
+        export_grid_index(getter.tree_model, pd.read_pickle(getter.data_path), str(index_dir))
+    assert list(parent.iterdir()) == []
+
+
+def test_incomplete_index_falls_back_to_pickles(getter, tmp_path):
+    # e.g. left behind by an export from before the COMPLETE marker
+    index_dir = tmp_path / "grid_index"
+    index_dir.mkdir()
+    (index_dir / "tree_data.npy").write_bytes(b"truncated")
+
+    fallback = GridAndZoneGetter(index_dir=str(index_dir), tree_path=getter.tree_path, data_path=getter.data_path)
+    grids, zones, valid = fallback.get_grid_and_zone_batch([9.1], [38.1])
+    assert valid[0] and not isinstance(fallback.grid_codes, np.memmap)
+
+
+def test_reexport_replaces_an_existing_index(getter, tmp_path):
+    getter._ensure_loaded()
+    parent = tmp_path / "indexes"
+    index_dir = parent / "grid_index"
+    df = pd.read_pickle(getter.data_path)
+    export_grid_index(getter.tree_model, df, str(index_dir))
+    export_grid_index(getter.tree_model, df, str(index_dir))
+    assert [p.name for p in parent.iterdir()] == ["grid_index"]
+    assert (index_dir / "COMPLETE").is_file()
@@ -0,0 +1,147 @@
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db import get_db
+from src.database.models.customer import Customer
+from src.database.models.enrolement import Enrolement, EnrolementStatus
+from src.database.models.policy_outbox import PolicyOutbox
+from src.main import app
+from src.services.policy_dispatcher import PolicyOutboxDispatcher
+
+
+@pytest.fixture
+def session_factory():
+    sessions = app.dependency_overrides[get_db]()
+    engine = next(sessions).get_bind()
+    sessions.close()
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    yield factory
+    db = factory()
+    db.query(PolicyOutbox).delete()
+    db.query(Enrolement).delete()
+    db.query(Customer).delete()
+    db.commit()
+    db.close()
+
+
+def add_enrolement(db, n):
+    enrolement = Enrolement(
+        customer=Customer(f_name="F", m_name="M", l_name="L", account_no=f"A{n}", account_type="saving"),
+        user_id=1, ic_company_id=1, branch_id=1, premium=10, sum_insured=100,
+        date_from=date(2025, 1, 1), date_to=date(2026, 1, 1), receipt_no=f"O{n}", product_id=1,
+        status=EnrolementStatus.pending, cps_zone=3, grid=42, lattitude=9.0, longitude=38.0,
+        createdAt=date(2025, 1, 1),
+    )
+    db.add(enrolement)
+    db.commit()
+    return enrolement.enrolment_id
+
+
+def dispatcher_with(session_factory, handler):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return PolicyOutboxDispatcher(session_factory=session_factory, client=client)
+
+
+def test_approval_enqueues_policy_creation(client: TestClient, session_factory, monkeypatch):
+    invalidated = []
+    monkeypatch.setattr("src.routes.enrolement.invalidate_enrollment_snapshots", invalidated.extend)
+    monkeypatch.setattr("httpx.post", lambda *a, **kw: pytest.fail("approval must not create the policy inline"))
+    db = session_factory()
+    enrollment_id = add_enrolement(db, 1)
+
+    resp = client.put(f"/api/enrollments/{enrollment_id}/approve")
+    assert resp.status_code == 200
+    assert invalidated == [enrollment_id]
+
+    outbox = db.query(PolicyOutbox).all()
+    assert [(row.enrollment_id, row.status) for row in outbox] == [(enrollment_id, "pending")]
+    db.close()
+
+
+def test_dispatcher_delivers_batch(session_factory):
+    db = session_factory()
+    ids = [add_enrolement(db, n) for n in range(3)]
+    for enrollment_id in ids:
+        db.add(PolicyOutbox(enrollment_id=enrollment_id))
+    db.commit()
+
+    requests = []
+
+    def handler(request):
+        assert request.url.path == "/api/policies/batch"
+        enrollment_ids = json.loads(request.content)["enrollment_ids"]
+        requests.append(enrollment_ids)
+        return httpx.Response(200, json={"policies": [{"enrollment_id": i} for i in enrollment_ids], "errors": []})
+
+    assert asyncio.run(dispatcher_with(session_factory, handler).dispatch_once()) == 3
+    assert requests == [ids]
+    db.expire_all()
+    assert {row.status for row in db.query(PolicyOutbox)} == {"sent"}
+    # Nothing left to deliver
+    assert asyncio.run(dispatcher_with(session_factory, handler).dispatch_once()) == 0
+    db.close()
+
+
+def test_dispatcher_retries_server_errors(session_factory):
+    db = session_factory()
+    enrollment_id = add_enrolement(db, 10)
+    db.add(PolicyOutbox(enrollment_id=enrollment_id))
+    db.commit()
+
+    before = datetime.utcnow()
+    asyncio.run(dispatcher_with(session_factory, lambda request: httpx.Response(503, text="unavailable")).dispatch_once())
+
+    db.expire_all()
+    retry = db.query(PolicyOutbox).one()
+    assert retry.status == "pending" and retry.attempts == 1
+    assert retry.next_attempt_at > before + timedelta(seconds=1)
+    assert "503" in retry.last_error
+    db.close()
+
+
+def test_dispatcher_dead_letters_rejected_enrollments(session_factory):
+    db = session_factory()
+    ok_id, reject_id = add_enrolement(db, 11), add_enrolement(db, 12)
+    db.add_all([PolicyOutbox(enrollment_id=ok_id), PolicyOutbox(enrollment_id=reject_id)])
+    db.commit()
+
+    def handler(request):
+        return httpx.Response(200, json={
+            "policies": [{"enrollment_id": ok_id}],
+            "errors": [{"enrollment_id": reject_id, "detail": "Invalid enrollment data"}],
+        })
+
+    asyncio.run(dispatcher_with(session_factory, handler).dispatch_once())
+
+    db.expire_all()
+    assert db.query(PolicyOutbox).filter_by(enrollment_id=ok_id).one().status == "sent"
+    rejected = db.query(PolicyOutbox).filter_by(enrollment_id=reject_id).one()
+    assert rejected.status == "failed" and rejected.attempts == 1
+    assert "Invalid enrollment data" in rejected.last_error
+    db.close()
+
+
+def test_dispatcher_retries_enrollments_missing_from_the_response(session_factory):
+    db = session_factory()
+    ok_id, missing_id = add_enrolement(db, 13), add_enrolement(db, 14)
+    db.add_all([PolicyOutbox(enrollment_id=ok_id), PolicyOutbox(enrollment_id=missing_id)])
+    db.commit()
+
+    def handler(request):
+        # An unknown enrollment ID must not abort the dispatch, and missing_id is left out
+        return httpx.Response(200, json={"policies": [{"enrollment_id": ok_id}, {"enrollment_id": 999999}], "errors": []})
+
+    assert asyncio.run(dispatcher_with(session_factory, handler).dispatch_once()) == 2
+
+    db.expire_all()
+    assert db.query(PolicyOutbox).filter_by(enrollment_id=ok_id).one().status == "sent"
+    missing = db.query(PolicyOutbox).filter_by(enrollment_id=missing_id).one()
+    assert missing.status == "pending" and missing.attempts == 1
+    assert "did not include" in missing.last_error
+    db.close()
@@ -13,6 +13,26 @@ class Settings:
     SMTP_USER: str = os.getenv("SMTP_USERNAME")
     SMTP_PASS: str = os.getenv("SMTP_PASSWORD")
     SENDER_EMAIL: str = os.getenv("SMTP_FROM")
+    # Delivery: pooled, authenticated connections reused across messages
+    SMTP_STARTTLS: bool = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+    SMTP_TIMEOUT: float = float(os.getenv("SMTP_TIMEOUT", 30))
+    SMTP_POOL_SIZE: int = int(os.getenv("SMTP_POOL_SIZE", 4))
+    SMTP_MAX_IDLE_SECONDS: float = float(os.getenv("SMTP_MAX_IDLE_SECONDS", 60))
+    SMTP_MAX_RETRIES: int = int(os.getenv("SMTP_MAX_RETRIES", 3))
+    SMTP_RETRY_BACKOFF_SECONDS: float = float(os.getenv("SMTP_RETRY_BACKOFF_SECONDS", 1.0))
+    # Threads rendering templates for /notify/email/batch
+    RENDER_WORKERS: int = int(os.getenv("RENDER_WORKERS", 4))
+    NOTIFY_BATCH_MAX_SIZE: int = int(os.getenv("NOTIFY_BATCH_MAX_SIZE", 5000))
+    # Durable outbox behind /notify/email, drained by a background worker
+    OUTBOX_DATABASE_URL: str = os.getenv("OUTBOX_DATABASE_URL", "sqlite:///./data/notification_outbox.db")
+    OUTBOX_ENABLED: bool = os.getenv("OUTBOX_ENABLED", "true").lower() == "true"
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", 200))
+    OUTBOX_POLL_SECONDS: float = float(os.getenv("OUTBOX_POLL_SECONDS", 1.0))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 6))
+    OUTBOX_BASE_BACKOFF_SECONDS: float = float(os.getenv("OUTBOX_BASE_BACKOFF_SECONDS", 30.0))
+    OUTBOX_MAX_BACKOFF_SECONDS: float = float(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", 3600.0))
+    # Dead-lettered bodies are kept this long for manual retry, then redacted
+    OUTBOX_DEAD_LETTER_RETENTION_SECONDS: float = float(os.getenv("OUTBOX_DEAD_LETTER_RETENTION_SECONDS", 7 * 24 * 3600))
 
     def __init__(self):
         required_vars = [self.SMTP_HOST, self.SMTP_PORT, self.SMTP_USER, self.SMTP_PASS, self.SENDER_EMAIL]
@@ -2,6 +2,10 @@ import uvicorn
 from fastapi import FastAPI
 from app.config import settings
 from app.routers import email_router
+from app.database import Base, engine
+from app.services.email_service import email_sender
+from app.services.outbox_worker import outbox_worker
+from app.services.template_renderer import load_templates, render_executor
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
@@ -11,6 +15,19 @@ def health_check():
 
 app.include_router(email_router.router, prefix="/api/v1")
 
+@app.on_event("startup")
+async def startup():
+    Base.metadata.create_all(bind=engine)
+    load_templates()
+    if settings.OUTBOX_ENABLED:
+        outbox_worker.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await outbox_worker.stop()
+    email_sender.pool.close()
+    render_executor.shutdown(wait=False)
+
 if __name__ == "main":
     # For local development. For production, consider using gunicorn + uvicorn workers.
     uvicorn.run("app.main:app", host=settings.HOST, port=settings.PORT, reload=True)
\ No newline at end of file
@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from app.database import Base
+
+
+class EmailOutbox(Base):
+    """A rendered email waiting for (or done with) delivery."""
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Optional client-supplied key; a repeated request returns the original row
+    idempotency_key = Column(String(255), unique=True, nullable=True)
+    type = Column(String(50), nullable=False)
+    to = Column(String(320), nullable=False)
+    subject = Column(String(998), nullable=False)
+    # Cleared once sent, and on dead letters after OUTBOX_DEAD_LETTER_RETENTION_SECONDS:
+    # account emails carry the generated password
+    html = Column(Text, nullable=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_due", "status", "next_attempt_at"),
+    )
@@ -1,8 +1,13 @@
 # app/routers/notifications.py
-from fastapi import APIRouter, status, HTTPException, BackgroundTasks
-from app.schemas import NotificationUnion
-from app.services.email_service import send_email_notification
-from app.services.template_renderer import render_notification
+from fastapi import APIRouter, status, HTTPException, Depends, Query
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import get_db
+from app.schemas import NotificationUnion, NotificationBatchRequest, NotificationBatchResponse
+from app.services.email_service import email_sender
+from app.services.outbox import EmailOutboxService
+from app.services.template_renderer import render_notification, render_notifications
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,59 +15,136 @@ logger.setLevel(logging.INFO)
 
 router = APIRouter()
 
+notification_adapter = TypeAdapter(NotificationUnion)
+
 @router.post("/notify/email", status_code=status.HTTP_200_OK)
 def notify_email(
-    notification: NotificationUnion, 
-    background_tasks: BackgroundTasks
+    notification: NotificationUnion,
+    db: Session = Depends(get_db)
 ):
     """
-    Endpoint to accept a NotificationUnion JSON, 
-    render a template, and send an email.
-    
-    Example JSON for an InterviewScheduledNotification:
+    Endpoint to accept a NotificationUnion JSON, render a template,
+    and queue the email in the durable outbox. A background worker
+    delivers it, retrying with backoff if the SMTP server is unavailable.
+
+    Example JSON for an AccountApprovalNotification:
     {
-      "type": "interview_scheduled",
-      "interview_link": "https://zoom.us/some-meeting",
+      "type": "account_approval",
       "to": "alice@example.com",
-      "name": "Alice",
-      "title": "Software Engineer"
+      "subject": "Your account is approved",
+      "username": "alice",
+      "password": "secret",
+      "idempotency_key": "approval-42"
     }
     """
 
-    logger.info(f"Received notification: {notification}")
+    logger.info(f"Received notification: {notification.type} for {notification.to}")
 
     try:
-        logger.info(f"Rendering notification")
         # Render the email body (HTML) based on the notification
         html_body = render_notification(notification)
-        logger.info(f"Rendered HTML: {html_body}")
-
-        # You can also define your logic for 'to' and 'subject'.
-        # For example, notification.user_email might be the "to"
-        # subject could be something dynamic for each type, or hard-coded.
-
-        # For demonstration, let's say:
-        to_email = notification.to 
-        subject = notification.subject
-
-        if html_body:
-            logger.info(f"Sending email notification to {to_email}")
-            # Send the email in the background
-            background_tasks.add_task(
-                send_email_notification,
-                to=to_email,
-                subject=subject,# if you also want a plain text version
-                html=html_body
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to render notification."
-            )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+    if not html_body:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to render notification."
+        )
+
+    row, created = EmailOutboxService(db).enqueue(
+        type=notification.type.value,
+        to=notification.to,
+        subject=notification.subject,
+        html=html_body,
+        idempotency_key=notification.idempotency_key,
+    )
+    logger.info(f"Email notification {row.id} {'queued' if created else 'already queued'} for {row.to}")
+
+    return {"message": "Email notification queued.", "id": row.id, "status": row.status}
+
+
+@router.post("/notify/email/batch", status_code=status.HTTP_200_OK, response_model=NotificationBatchResponse)
+def notify_email_batch(payload: NotificationBatchRequest, db: Session = Depends(get_db)):
+    """
+    Queue many notifications in one call, e.g. every agent of a company.
+    Templates are rendered on a thread pool and all emails are queued in one
+    transaction; each item gets its own status instead of failing the batch.
+    """
+    if len(payload.notifications) > settings.NOTIFY_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.NOTIFY_BATCH_MAX_SIZE} notifications per batch"
+        )
+
+    results = [None] * len(payload.notifications)
+    valid = []
+    for index, item in enumerate(payload.notifications):
+        try:
+            valid.append((index, notification_adapter.validate_python(item)))
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results[index] = {"index": index, "status": "invalid", "detail": errors}
+
+    rendered = render_notifications([notification for _, notification in valid])
+
+    emails = []
+    queued_indexes = []
+    for (index, notification), html_body in zip(valid, rendered):
+        if not html_body:
+            results[index] = {"index": index, "status": "render_failed", "detail": "Failed to render notification."}
+            continue
+        emails.append({
+            "type": notification.type.value,
+            "to": notification.to,
+            "subject": notification.subject,
+            "html": html_body,
+            "idempotency_key": notification.idempotency_key,
+        })
+        queued_indexes.append(index)
+
+    for index, (outbox_id, created) in zip(queued_indexes, EmailOutboxService(db).enqueue_many(emails)):
+        results[index] = {"index": index, "status": "queued" if created else "duplicate", "id": outbox_id}
+
+    queued = sum(1 for r in results if r["status"] == "queued")
+    duplicates = sum(1 for r in results if r["status"] == "duplicate")
+    logger.info(f"Batch of {len(results)} notifications: {queued} queued, {duplicates} duplicates")
+    return {
+        "queued": queued,
+        "duplicates": duplicates,
+        "failed": len(results) - queued - duplicates,
+        "results": results,
+    }
+
+
+@router.get("/notify/email/failed", status_code=status.HTTP_200_OK)
+def list_failed_emails(limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
+    """Dead-lettered emails: permanently rejected, or out of retry attempts."""
+    return [
+        {
+            "id": row.id, "type": row.type, "to": row.to, "subject": row.subject,
+            "attempts": row.attempts, "last_error": row.last_error, "created_at": row.created_at,
+        }
+        for row in EmailOutboxService(db).dead_letters(limit)
+    ]
+
+
+@router.post("/notify/email/{outbox_id}/retry", status_code=status.HTTP_200_OK)
+def retry_failed_email(outbox_id: int, db: Session = Depends(get_db)):
+    """
+    Put a dead-lettered email back in the queue with a fresh set of attempts.
+    Only possible until its body is redacted (OUTBOX_DEAD_LETTER_RETENTION_SECONDS).
+    """
+    row = EmailOutboxService(db).requeue(outbox_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Failed email not found or its body has been purged")
+    return {"message": "Email notification queued.", "id": row.id, "status": row.status}
+
+
+@router.get("/metrics/email", status_code=status.HTTP_200_OK)
+def email_delivery_metrics():
+    """Delivery counters, latency and throughput of the pooled SMTP sender."""
+    return email_sender.stats()
 
-    return {"message": "Email notification sent successfully."}
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, Union
+from pydantic import BaseModel, EmailStr, Field
+from typing import Any, Optional, Union
 from enum import Enum
 
 class NotificationType(str, Enum):
@@ -14,6 +14,8 @@ class BaseNotification(BaseModel):
     type: NotificationType
     subject: str
     to: EmailStr
+    # Repeating a request with the same key queues the email only once
+    idempotency_key: Optional[str] = None
 
 class AccountApprovalNotification(BaseNotification):
     type: Literal[NotificationType.account_approval]
@@ -37,4 +39,21 @@ NotificationUnion = Union[
     AccountApprovalNotification,
     AccountRejectionNotification,
     AgentAccountNotification
-]
\ No newline at end of file
+]
+
+
+class NotificationBatchRequest(BaseModel):
+    # Items are validated one by one, so a bad item fails alone instead of the whole batch
+    notifications: list[dict[str, Any]] = Field(..., min_length=1)
+
+class NotificationBatchItem(BaseModel):
+    index: int
+    status: Literal["queued", "duplicate", "invalid", "render_failed"]
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+class NotificationBatchResponse(BaseModel):
+    queued: int
+    duplicates: int
+    failed: int
+    results: list[NotificationBatchItem]
@@ -1,14 +1,27 @@
+import logging
+import queue
 import smtplib
 import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from email.message import EmailMessage
+from typing import NamedTuple
 from app.config import settings
 
-def send_email_notification(to: str, subject: str, body: str = "", html: str = ""):
-    """
-    Basic SMTP-based sending of an email.
-    Could be replaced with an API-based provider like SendGrid or Mailgun.
-    """
+logger = logging.getLogger(__name__)
+
+# Failures worth another attempt: dropped connections and 4xx (temporary) SMTP replies
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
 
+
+class DeliveryFailure(NamedTuple):
+    error: str
+    transient: bool  # worth retrying later, e.g. the server was down or replied 4xx
+
+
+def build_message(to: str, subject: str, body: str = "", html: str = "") -> EmailMessage:
     msg = EmailMessage()
     msg["Subject"] = subject
     msg["From"] = settings.SENDER_EMAIL
@@ -19,23 +32,217 @@ def send_email_notification(to: str, subject: str, body: str = "", html: str = "
         msg.add_alternative(html, subtype="html")
     else:
         msg.set_content(body)
+    return msg
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` connected, STARTTLS'd and logged-in SMTP sessions for reuse, so a
+    message costs one SMTP transaction instead of a full handshake. Connections idle for
+    longer than `max_idle` are dropped rather than risk a server-side timeout.
+    """
+
+    def __init__(self, host, port, username=None, password=None, size=4, starttls=True,
+                 timeout=30.0, max_idle=60.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls(context=ssl.create_default_context())
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.connections_opened += 1
+        return server
+
+    @staticmethod
+    def _discard(server) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it goes back to the pool unless the caller raised."""
+        self._slots.acquire()
+        server = None
+        try:
+            while server is None:
+                try:
+                    server, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    server = self._connect()
+                    break
+                if time.monotonic() - last_used > self.max_idle:
+                    self._discard(server)
+                    server = None
+            yield server
+        except Exception:
+            if server is not None:
+                self._discard(server)
+            raise
+        else:
+            self._idle.put((server, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(server)
+
+
+class DeliveryMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def record(self, ok: bool, seconds: float, retries: int) -> None:
+        with self._lock:
+            if ok:
+                self.sent += 1
+            else:
+                self.failed += 1
+            self.retries += retries
+            self.latency_total += seconds
+            self.latency_max = max(self.latency_max, seconds)
+
+    def snapshot(self, connections_opened: int = 0) -> dict:
+        with self._lock:
+            attempted = self.sent + self.failed
+            uptime = time.monotonic() - self.started_at
+            return {
+                "sent": self.sent,
+                "failed": self.failed,
+                "retries": self.retries,
+                "connections_opened": connections_opened,
+                "avg_latency_ms": 1000 * self.latency_total / attempted if attempted else 0.0,
+                "max_latency_ms": 1000 * self.latency_max,
+                "throughput_per_second": self.sent / uptime if uptime else 0.0,
+            }
+
+
+class EmailSender:
+    """Sends messages over a connection pool, retrying transient failures with exponential backoff."""
+
+    def __init__(self, pool: SMTPConnectionPool, max_retries=3, backoff_seconds=1.0, sleep=time.sleep):
+        self.pool = pool
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.metrics = DeliveryMetrics()
+        self._sleep = sleep
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 400 <= error.smtp_code < 500
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return all(400 <= code < 500 for code, _ in error.recipients.values())
+        return isinstance(error, TRANSIENT_ERRORS)
+
+    def _send_chunk(self, messages: list[EmailMessage]) -> list[DeliveryFailure | None]:
+        """Send messages back to back over one borrowed connection; returns a failure (or None) per message."""
+        results = []
+        pending = list(messages)
+        attempts = [0] * len(messages)
+        # Start of the current attempt, so each message's latency is its own
+        started = time.monotonic()
+
+        def handle_failure(error: Exception) -> None:
+            i = len(results)
+            transient = self._is_transient(error)
+            if transient and attempts[i] < self.max_retries:
+                attempts[i] += 1
+                self._sleep(self.backoff_seconds * 2 ** (attempts[i] - 1))
+                return
+            msg = pending.pop(0)
+            logger.warning(f"Email to {msg['To']} failed after {attempts[i] + 1} attempts: {error}")
+            self.metrics.record(False, time.monotonic() - started, attempts[i])
+            results.append(DeliveryFailure(str(error) or type(error).__name__, transient))
+
+        while pending:
+            try:
+                started = time.monotonic()
+                with self.pool.connection() as server:
+                    while pending:
+                        try:
+                            started = time.monotonic()
+                            server.send_message(pending[0])
+                        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                            # The server refused this message; the connection itself is still usable
+                            handle_failure(e)
+                            continue
+                        pending.pop(0)
+                        self.metrics.record(True, time.monotonic() - started, attempts[len(results)])
+                        results.append(None)
+            except Exception as e:
+                handle_failure(e)
+        return results
+
+    def send(self, msg: EmailMessage) -> bool:
+        return self._send_chunk([msg])[0] is None
+
+    def send_batch(self, messages: list[EmailMessage]) -> list[DeliveryFailure | None]:
+        """
+        Spread messages across the pool, one chunk per connection sent back to back.
+        Returns a DeliveryFailure (or None on success) per message, in order.
+        """
+        if not messages:
+            return []
+        workers = min(self.pool.size, len(messages))
+        chunks = [messages[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            chunk_results = list(executor.map(self._send_chunk, chunks))
+        results = [None] * len(messages)
+        for i, chunk in enumerate(chunk_results):
+            results[i::workers] = chunk
+        return results
+
+    def stats(self) -> dict:
+        return self.metrics.snapshot(self.pool.connections_opened)
+
+
+email_sender = EmailSender(
+    SMTPConnectionPool(
+        settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_USER, settings.SMTP_PASS,
+        size=settings.SMTP_POOL_SIZE, starttls=settings.SMTP_STARTTLS,
+        timeout=settings.SMTP_TIMEOUT, max_idle=settings.SMTP_MAX_IDLE_SECONDS,
+    ),
+    max_retries=settings.SMTP_MAX_RETRIES,
+    backoff_seconds=settings.SMTP_RETRY_BACKOFF_SECONDS,
+)
+
+
+def send_email_notification(to: str, subject: str, body: str = "", html: str = ""):
+    """
+    Send one email over the shared connection pool.
+    Could be replaced with an API-based provider like SendGrid or Mailgun.
+    """
+    return email_sender.send(build_message(to, subject, body=body, html=html))
 
-    try:
-        print("Creating secure connection...")
-        context = ssl.create_default_context()
-        print("Connecting to SMTP server...")
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls(context=context)
-            print("Logging in...")
-            server.login(settings.SMTP_USER, settings.SMTP_PASS)
-            print("Sending email...")
-            server.send_message(msg)
-            print("Email sent.")
-        return True
-    except Exception as e:
-        # Logging, retries, etc. could be handled here
-        print(f"Error sending email: {e}")
-        return False
 
 if __name__ == "__main__":
     # For local testing
@@ -45,4 +252,4 @@ if __name__ == "__main__":
         subject="Hello",
         body="Hello World!"
     )
-    print("Email sent successfully." if result else "Failed to send email.")
\ No newline at end of file
+    print("Email sent successfully." if result else "Failed to send email.")
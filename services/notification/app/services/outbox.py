@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import EmailOutbox
+
+
+class EmailOutboxService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, type: str, to: str, subject: str, html: str, idempotency_key: str | None = None):
+        """
+        Durably queue one email. Returns (row, created); with an idempotency key that was
+        already used, the original row is returned and nothing new is queued.
+        """
+        if idempotency_key:
+            existing = self.db.query(EmailOutbox).filter(EmailOutbox.idempotency_key == idempotency_key).first()
+            if existing:
+                return existing, False
+        now = datetime.utcnow()
+        row = EmailOutbox(
+            idempotency_key=idempotency_key, type=type, to=to, subject=subject, html=html,
+            status="pending", attempts=0, next_attempt_at=now, created_at=now,
+        )
+        self.db.add(row)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent request using the same key
+            self.db.rollback()
+            return self.db.query(EmailOutbox).filter(EmailOutbox.idempotency_key == idempotency_key).one(), False
+        self.db.refresh(row)
+        return row, True
+
+    def enqueue_many(self, emails: list[dict]):
+        """
+        Queue many emails (dicts of enqueue's arguments) in one transaction.
+        Returns (outbox_id, created) per email, in order. Keys already queued, or repeated
+        earlier in the batch, resolve to the existing row instead of a new one.
+        """
+        keys = {email["idempotency_key"] for email in emails if email.get("idempotency_key")}
+        existing = {}
+        if keys:
+            existing = dict(
+                self.db.query(EmailOutbox.idempotency_key, EmailOutbox.id)
+                .filter(EmailOutbox.idempotency_key.in_(keys))
+                .all()
+            )
+
+        now = datetime.utcnow()
+        slots = []  # (existing outbox id, None, False) or (None, index into new_rows, created)
+        new_rows = []
+        new_keys = {}
+        for email in emails:
+            key = email.get("idempotency_key")
+            if key and key in existing:
+                slots.append((existing[key], None, False))
+            elif key and key in new_keys:
+                slots.append((None, new_keys[key], False))
+            else:
+                if key:
+                    new_keys[key] = len(new_rows)
+                slots.append((None, len(new_rows), True))
+                new_rows.append({
+                    "idempotency_key": key, "type": email["type"], "to": email["to"],
+                    "subject": email["subject"], "html": email["html"], "status": "pending",
+                    "attempts": 0, "next_attempt_at": now, "created_at": now,
+                })
+
+        new_ids = []
+        if new_rows:
+            try:
+                new_ids = self.db.execute(
+                    insert(EmailOutbox).returning(EmailOutbox.id, sort_by_parameter_order=True), new_rows
+                ).scalars().all()
+                self.db.commit()
+            except IntegrityError:
+                # A concurrent request queued one of the keys first; settle them one at a time
+                self.db.rollback()
+                results = []
+                for email in emails:
+                    row, created = self.enqueue(**email)
+                    results.append((row.id, created))
+                return results
+        return [
+            (outbox_id if outbox_id is not None else new_ids[position], created)
+            for outbox_id, position, created in slots
+        ]
+
+    def claim_due(self, batch_size: int, lease_seconds: float):
+        """
+        Lease up to `batch_size` due rows by pushing their next_attempt_at forward,
+        so other workers skip them until the lease expires.
+        Returns (id, to, subject, html) tuples.
+        """
+        now = datetime.utcnow()
+        rows = (
+            self.db.query(EmailOutbox)
+            .filter(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        lease_until = now + timedelta(seconds=lease_seconds)
+        for row in rows:
+            row.next_attempt_at = lease_until
+        self.db.commit()
+        return [(row.id, row.to, row.subject, row.html) for row in rows]
+
+    def mark_sent(self, outbox_ids):
+        if not outbox_ids:
+            return
+        self.db.query(EmailOutbox).filter(EmailOutbox.id.in_(outbox_ids)).update(
+            # The body is not needed once delivered, and may contain credentials
+            {"status": "sent", "sent_at": datetime.utcnow(), "last_error": None, "html": None},
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def mark_failed_attempts(self, failures, max_attempts: int, base_backoff: float, max_backoff: float):
+        """
+        Record failed deliveries as (outbox_id, error, retryable) tuples. Retryable rows are
+        rescheduled with exponential backoff until `max_attempts`, then dead-lettered as 'failed'.
+        """
+        if not failures:
+            return
+        by_id = {outbox_id: (error, retryable) for outbox_id, error, retryable in failures}
+        now = datetime.utcnow()
+        for row in self.db.query(EmailOutbox).filter(EmailOutbox.id.in_(by_id)).all():
+            error, retryable = by_id[row.id]
+            row.attempts += 1
+            row.last_error = error
+            if not retryable or row.attempts >= max_attempts:
+                row.status = "failed"
+            else:
+                delay = min(base_backoff * (2 ** (row.attempts - 1)), max_backoff)
+                row.next_attempt_at = now + timedelta(seconds=delay)
+        self.db.commit()
+
+    def dead_letters(self, limit: int = 100):
+        return (
+            self.db.query(EmailOutbox)
+            .filter(EmailOutbox.status == "failed")
+            .order_by(EmailOutbox.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def purge_dead_letters(self, older_than_seconds: float) -> int:
+        """Redact the bodies of dead letters queued more than `older_than_seconds` ago. Returns the count."""
+        cutoff = datetime.utcnow() - timedelta(seconds=older_than_seconds)
+        purged = self.db.query(EmailOutbox).filter(
+            EmailOutbox.status == "failed", EmailOutbox.html.isnot(None), EmailOutbox.created_at < cutoff,
+        ).update({"html": None}, synchronize_session=False)
+        self.db.commit()
+        return purged
+
+    def requeue(self, outbox_id: int):
+        """
+        Give a dead-lettered email a fresh set of attempts. Returns None if it is not
+        dead-lettered or its body has already been purged.
+        """
+        row = self.db.query(EmailOutbox).filter(
+            EmailOutbox.id == outbox_id, EmailOutbox.status == "failed", EmailOutbox.html.isnot(None),
+        ).first()
+        if not row:
+            return None
+        row.status = "pending"
+        row.attempts = 0
+        row.next_attempt_at = datetime.utcnow()
+        self.db.commit()
+        self.db.refresh(row)
+        return row
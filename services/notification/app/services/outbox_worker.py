@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from app.config import settings
+from app.database import SessionLocal
+from app.services.email_service import build_message, email_sender
+from app.services.outbox import EmailOutboxService
+
+logger = logging.getLogger(__name__)
+
+# How often the run loop redacts expired dead letters
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class EmailOutboxWorker:
+    """
+    Drains the email outbox in the background: leases a batch of due rows, sends them over
+    the pooled SMTP sender (at most SMTP_POOL_SIZE at once) and records the outcome.
+    Failures are retried with exponential backoff and dead-lettered after OUTBOX_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, session_factory=SessionLocal, sender=email_sender):
+        self.session_factory = session_factory
+        self.sender = sender
+        self.batch_size = settings.OUTBOX_BATCH_SIZE
+        self.poll_interval = settings.OUTBOX_POLL_SECONDS
+        self.max_attempts = settings.OUTBOX_MAX_ATTEMPTS
+        self._task: asyncio.Task | None = None
+
+    def _run_db(self, method, *args):
+        db = self.session_factory()
+        try:
+            return getattr(EmailOutboxService(db), method)(*args)
+        finally:
+            db.close()
+
+    async def dispatch_once(self) -> int:
+        """Deliver one batch of due rows. Returns the number of rows attempted."""
+        # Long enough for a batch to get through the sender's own quick retries
+        lease_seconds = settings.SMTP_TIMEOUT * (settings.SMTP_MAX_RETRIES + 1) + 60
+        claimed = await asyncio.to_thread(self._run_db, "claim_due", self.batch_size, lease_seconds)
+        if not claimed:
+            return 0
+
+        messages = [build_message(to, subject, html=html) for _, to, subject, html in claimed]
+        results = await asyncio.to_thread(self.sender.send_batch, messages)
+
+        sent = [row[0] for row, failure in zip(claimed, results) if failure is None]
+        failures = [
+            (row[0], failure.error, failure.transient)
+            for row, failure in zip(claimed, results) if failure is not None
+        ]
+        await asyncio.to_thread(self._run_db, "mark_sent", sent)
+        await asyncio.to_thread(
+            self._run_db, "mark_failed_attempts", failures, self.max_attempts,
+            settings.OUTBOX_BASE_BACKOFF_SECONDS, settings.OUTBOX_MAX_BACKOFF_SECONDS,
+        )
+        if failures:
+            logger.warning(f"Email outbox: {len(sent)} sent, {len(failures)} failed (first error: {failures[0][1]})")
+        else:
+            logger.info(f"Email outbox: {len(sent)} sent")
+        return len(claimed)
+
+    async def purge_once(self) -> int:
+        """Redact bodies of dead letters past their retention. Returns the number redacted."""
+        purged = await asyncio.to_thread(
+            self._run_db, "purge_dead_letters", settings.OUTBOX_DEAD_LETTER_RETENTION_SECONDS
+        )
+        if purged:
+            logger.info(f"Email outbox: redacted {purged} expired dead letters")
+        return purged
+
+    async def run(self):
+        last_purge = None
+        while True:
+            try:
+                if last_purge is None or time.monotonic() - last_purge >= PURGE_INTERVAL_SECONDS:
+                    last_purge = time.monotonic()
+                    await self.purge_once()
+                processed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Email outbox dispatch failed")
+                processed = 0
+            # A full batch means there is probably more waiting
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+outbox_worker = EmailOutboxWorker()
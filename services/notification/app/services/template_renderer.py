@@ -1,44 +1,73 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from fastapi.templating import Jinja2Templates
+from jinja2 import Template
+from app.config import settings
 from app.schemas import NotificationUnion
 
 templates = Jinja2Templates(directory="app/templates")
 logger = logging.getLogger(__name__)
 
+# Map notification types to template filenames.
+TEMPLATE_MAP = {
+    'account_approval': 'account_approval.html',
+    'account_rejection': 'account_rejection.html',
+    'agent_account': 'agent_account.html',
+}
+
+# Compiled templates per notification type, filled by load_templates() at startup
+compiled_templates: dict[str, Template] = {}
+
+render_executor = ThreadPoolExecutor(max_workers=settings.RENDER_WORKERS, thread_name_prefix="render")
+
+
+def load_templates() -> None:
+    """
+    Compile every notification template once, so rendering does not have to look up
+    the template (and check the file for changes) on each call.
+    """
+    for notification_type, template_name in TEMPLATE_MAP.items():
+        compiled_templates[notification_type] = templates.get_template(template_name)
+    logger.info("Compiled %d notification templates", len(compiled_templates))
+
+
+def _template_for(notification_type: str) -> Template | None:
+    template = compiled_templates.get(notification_type)
+    if template is None and notification_type in TEMPLATE_MAP:
+        template = compiled_templates[notification_type] = templates.get_template(TEMPLATE_MAP[notification_type])
+    return template
+
+
 def render_notification(notification: NotificationUnion) -> str:
     """
     Render a notification into HTML using the appropriate Jinja2 template.
 
-    This function selects a template based on notification.type and renders it with
+    This function selects the compiled template for notification.type and renders it with
     the data from the notification model. It wraps the rendered HTML in a consistent 
     container for styling, and in case of an error (such as an unknown notification type
-    or rendering failure), it logs the issue and returns a fallback error message.
+    or rendering failure), it logs the issue and returns None.
 
     Returns:
         str: The rendered HTML.
     """
-    # Map notification types to template filenames.
-    template_map = {
-        'account_approval': 'account_approval.html',
-        'account_rejection': 'account_rejection.html',
-        'agent_account': 'agent_account.html',
-    }
-    
     try:
-        # Select the appropriate template, or fallback if type is unknown.
-        template_name = template_map.get(notification.type)
-        if not template_name:
-            logger.warning("Unknown notification type: %s. Using default template.", notification.type)
-            template_name = "default_.html"  # Ensure this fallback template exists.
+        template = _template_for(notification.type)
+        if template is None:
+            logger.warning("Unknown notification type: %s.", notification.type)
+            return None
 
         # Render the template with the notification's data.
-        context = notification.model_dump()
-        template = templates.get_template(template_name)
-        rendered_html = template.render(context)
-        
+        rendered_html = template.render(notification.model_dump())
+
         # Wrap the output in a consistent container.
         return f"<div class='notification'>{rendered_html}</div>"
     except Exception as e:
         logger.exception("Failed to render notification.")
-        # Return a consistent fallback error message.
-        return None
\ No newline at end of file
+        return None
+
+
+def render_notifications(notifications: list[NotificationUnion]) -> list[str | None]:
+    """Render many notifications on the render thread pool; returns HTML (or None) per notification, in order."""
+    if not notifications:
+        return []
+    return list(render_executor.map(render_notification, notifications))
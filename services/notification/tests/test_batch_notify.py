@@ -0,0 +1,70 @@
+from sqlalchemy import event
+
+from app.models import EmailOutbox
+from app.schemas import AgentAccountNotification
+from app.services import template_renderer
+
+
+def agent(n, **overrides):
+    return {
+        "type": "agent_account", "to": f"agent{n}@example.com", "subject": "Welcome",
+        "username": f"agent{n}", "password": "secret", **overrides,
+    }
+
+
+def test_batch_queues_each_item_with_its_own_status(client, session_factory):
+    resp = client.post("/api/v1/notify/email/batch", json={"notifications": [
+        agent(1, idempotency_key="agent-1"),
+        agent(2, to="not-an-email"),
+        agent(3),
+        agent(4, idempotency_key="agent-1"),
+    ]})
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert (body["queued"], body["duplicates"], body["failed"]) == (2, 1, 1)
+
+    results = body["results"]
+    assert [r["status"] for r in results] == ["queued", "invalid", "queued", "duplicate"]
+    assert "to" in results[1]["detail"]
+    assert results[3]["id"] == results[0]["id"]
+
+    db = session_factory()
+    rows = db.query(EmailOutbox).order_by(EmailOutbox.id).all()
+    assert [row.to for row in rows] == ["agent1@example.com", "agent3@example.com"]
+    assert "agent3" in rows[1].html
+    db.close()
+
+    # Keys queued by an earlier request resolve to the original row
+    again = client.post("/api/v1/notify/email/batch", json={"notifications": [agent(1, idempotency_key="agent-1")]})
+    assert again.json()["results"] == [{"index": 0, "status": "duplicate", "id": results[0]["id"], "detail": None}]
+
+
+def test_batch_does_not_query_per_item(client, session_factory):
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        resp = client.post("/api/v1/notify/email/batch", json={"notifications": [
+            agent(n, idempotency_key=f"agent-{n}") for n in range(500)
+        ]})
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert resp.json()["queued"] == 500
+    # One lookup for all idempotency keys, no per-row refresh after the insert
+    assert sum(statement.lstrip().upper().startswith("SELECT") for statement in statements) == 1
+
+
+def test_templates_are_compiled_once(monkeypatch):
+    template_renderer.load_templates()
+
+    def get_template(name):
+        raise AssertionError(f"{name} loaded again")
+
+    monkeypatch.setattr(template_renderer.templates, "get_template", get_template)
+    html = template_renderer.render_notifications([AgentAccountNotification(**agent(n)) for n in range(3)])
+    assert [f"agent{n}" in h for n, h in enumerate(html)] == [True, True, True]
@@ -1,21 +1,21 @@
-import pytest
-from fastapi.testclient import TestClient
-from app.main import app
-
-client = TestClient(app)
-
-def test_send_email_notification():
+def test_send_email_notification(client):
     response = client.post(
-    "/api/v1/notify/email",
-    json={
-    "to": "test@example.com",
-    "subject": "Test Subject",
-    "body": "Test Body"
-    },
+        "/api/v1/notify/email",
+        json={
+            "type": "account_rejection",
+            "to": "test@example.com",
+            "subject": "Test Subject",
+        },
     )
-    assert response.status_code == 200
-    assert "message" in response.json()
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["message"] == "Email notification queued."
+    assert body["status"] == "pending"
 
 
-    # Additional checks or mocking (smtplib) should be added
-    # to ensure that email_service.send_email_notification is called properly.
\ No newline at end of file
+def test_send_email_notification_rejects_unknown_type(client):
+    response = client.post(
+        "/api/v1/notify/email",
+        json={"type": "newsletter", "to": "test@example.com", "subject": "Test Subject"},
+    )
+    assert response.status_code == 422
@@ -0,0 +1,130 @@
+from contextlib import contextmanager
+import smtplib
+import socket
+import threading
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+from app.services.email_service import EmailSender, SMTPConnectionPool, build_message
+
+
+class RecordingHandler:
+    def __init__(self, refuse=()):
+        self.messages = []
+        self.refuse = set(refuse)
+        self.lock = threading.Lock()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refuse:
+            return "550 mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            self.messages.append(envelope.rcpt_tos[0])
+        return "250 Message accepted"
+
+
+def authenticate(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=auth_data.login == b"user" and auth_data.password == b"secret")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler(refuse={"bounce@example.com"})
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=free_port(),
+        authenticator=authenticate, auth_require_tls=False,
+    )
+    controller.start()
+    yield handler, controller.hostname, controller.port
+    controller.stop()
+
+
+def make_sender(host, port, size=2, **kwargs):
+    pool = SMTPConnectionPool(host, port, "user", "secret", size=size, starttls=False, timeout=5)
+    return EmailSender(pool, backoff_seconds=0, **kwargs)
+
+
+def test_batch_reuses_pooled_connections(smtp_server):
+    handler, host, port = smtp_server
+    sender = make_sender(host, port, size=2)
+    messages = [build_message(f"agent{i}@example.com", "Welcome", body="hi") for i in range(20)]
+
+    results = sender.send_batch(messages)
+    sender.pool.close()
+
+    assert results == [None] * 20
+    assert sorted(handler.messages) == sorted(f"agent{i}@example.com" for i in range(20))
+    stats = sender.stats()
+    assert stats["sent"] == 20 and stats["failed"] == 0
+    assert stats["connections_opened"] == 2
+
+
+def test_permanent_refusal_is_reported_without_dropping_the_batch(smtp_server):
+    handler, host, port = smtp_server
+    sender = make_sender(host, port, size=1)
+    messages = [build_message(to, "Hi", body="x") for to in ("a@example.com", "bounce@example.com", "b@example.com")]
+
+    results = sender.send_batch(messages)
+
+    assert results[0] is None and results[2] is None
+    assert "550" in results[1].error and not results[1].transient
+    assert handler.messages == ["a@example.com", "b@example.com"]
+    assert sender.stats()["connections_opened"] == 1
+
+
+def test_transient_failures_are_retried_with_backoff(smtp_server):
+    _, host, port = smtp_server
+    delays = []
+    sender = make_sender(host, port, size=1, max_retries=2, sleep=delays.append)
+    sender.backoff_seconds = 0.5
+    real_connect = sender.pool._connect
+    failures = iter([smtplib.SMTPServerDisconnected("gone")])
+
+    def flaky_connect():
+        error = next(failures, None)
+        if error:
+            raise error
+        return real_connect()
+
+    sender.pool._connect = flaky_connect
+    assert sender.send(build_message("c@example.com", "Hi", body="x"))
+    assert delays == [0.5]
+    assert sender.stats()["retries"] == 1
+
+
+
+def test_latency_is_measured_per_message(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("app.services.email_service.time.monotonic", lambda: clock[0])
+
+    class OneSecondServer:
+        def send_message(self, msg):
+            clock[0] += 1.0
+
+    class StubPool:
+        size = 1
+        connections_opened = 1
+
+        @contextmanager
+        def connection(self):
+            yield OneSecondServer()
+
+    sender = EmailSender(StubPool(), backoff_seconds=0)
+    messages = [build_message(f"m{i}@example.com", "Hi", body="x") for i in range(5)]
+    assert sender.send_batch(messages) == [None] * 5
+
+    stats = sender.stats()
+    # Not 1..5 seconds by position in the chunk
+    assert stats["avg_latency_ms"] == 1000.0
+    assert stats["max_latency_ms"] == 1000.0
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import EmailOutbox
+from app.services.email_service import DeliveryFailure
+from app.services.outbox import EmailOutboxService
+from app.services.outbox_worker import EmailOutboxWorker
+
+APPROVAL = {
+    "type": "account_approval", "to": "alice@example.com", "subject": "Approved",
+    "username": "alice", "password": "secret",
+}
+
+
+class FakeSender:
+    def __init__(self, fail=None):
+        self.sent = []
+        self.fail = fail or {}
+
+    def send_batch(self, messages):
+        results = []
+        for msg in messages:
+            failure = self.fail.get(msg["To"])
+            if failure is None:
+                self.sent.append(msg["To"])
+            results.append(failure)
+        return results
+
+
+def test_notify_queues_without_sending(client, session_factory, monkeypatch):
+    monkeypatch.setattr("smtplib.SMTP", lambda *a, **kw: pytest.fail("request must not talk to SMTP"))
+    resp = client.post("/api/v1/notify/email", json=APPROVAL)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["status"] == "pending"
+
+    db = session_factory()
+    row = db.query(EmailOutbox).one()
+    assert row.to == "alice@example.com" and "alice" in row.html
+    db.close()
+
+
+def test_notify_is_idempotent_per_key(client, session_factory):
+    first = client.post("/api/v1/notify/email", json={**APPROVAL, "idempotency_key": "approval-1"}).json()
+    second = client.post("/api/v1/notify/email", json={**APPROVAL, "idempotency_key": "approval-1"}).json()
+    assert first["id"] == second["id"]
+    db = session_factory()
+    assert db.query(EmailOutbox).count() == 1
+    db.close()
+
+
+def test_worker_delivers_and_retries(client, session_factory):
+    for to in ("ok@example.com", "later@example.com", "bounce@example.com"):
+        client.post("/api/v1/notify/email", json={**APPROVAL, "to": to})
+    sender = FakeSender(fail={
+        "later@example.com": DeliveryFailure("421 try again", transient=True),
+        "bounce@example.com": DeliveryFailure("550 mailbox unavailable", transient=False),
+    })
+
+    before = datetime.utcnow()
+    assert asyncio.run(EmailOutboxWorker(session_factory, sender).dispatch_once()) == 3
+    assert sender.sent == ["ok@example.com"]
+
+    db = session_factory()
+    rows = {row.to: row for row in db.query(EmailOutbox)}
+    assert rows["ok@example.com"].status == "sent" and rows["ok@example.com"].sent_at is not None
+    later = rows["later@example.com"]
+    assert later.status == "pending" and later.attempts == 1
+    assert later.next_attempt_at > before + timedelta(seconds=1)
+    assert rows["bounce@example.com"].status == "failed"
+    db.close()
+
+    # Nothing is due until the backoff expires
+    assert asyncio.run(EmailOutboxWorker(session_factory, sender).dispatch_once()) == 0
+
+
+def test_dead_letters_can_be_listed_and_retried(client, session_factory):
+    client.post("/api/v1/notify/email", json={**APPROVAL, "to": "bounce@example.com"})
+    sender = FakeSender(fail={"bounce@example.com": DeliveryFailure("550 mailbox unavailable", transient=False)})
+    asyncio.run(EmailOutboxWorker(session_factory, sender).dispatch_once())
+
+    failed = client.get("/api/v1/notify/email/failed").json()
+    assert [(row["to"], row["attempts"]) for row in failed] == [("bounce@example.com", 1)]
+    assert "550" in failed[0]["last_error"]
+
+    resp = client.post(f"/api/v1/notify/email/{failed[0]['id']}/retry")
+    assert resp.json()["status"] == "pending"
+    assert asyncio.run(EmailOutboxWorker(session_factory, FakeSender()).dispatch_once()) == 1
+    assert client.get("/api/v1/notify/email/failed").json() == []
+    assert client.post(f"/api/v1/notify/email/{failed[0]['id']}/retry").status_code == 404
+
+
+def test_sent_rows_drop_their_body(client, session_factory):
+    client.post("/api/v1/notify/email", json=APPROVAL)
+    asyncio.run(EmailOutboxWorker(session_factory, FakeSender()).dispatch_once())
+
+    db = session_factory()
+    row = db.query(EmailOutbox).one()
+    assert row.status == "sent" and row.html is None
+    db.close()
+
+
+def test_expired_dead_letters_are_redacted(client, session_factory):
+    for to in ("old@example.com", "new@example.com", "pending@example.com"):
+        client.post("/api/v1/notify/email", json={**APPROVAL, "to": to})
+    db = session_factory()
+    rows = {row.to: row for row in db.query(EmailOutbox)}
+    rows["old@example.com"].status = rows["new@example.com"].status = "failed"
+    rows["old@example.com"].created_at = rows["pending@example.com"].created_at = datetime.utcnow() - timedelta(days=30)
+    db.commit()
+    old_id = rows["old@example.com"].id
+
+    assert EmailOutboxService(db).purge_dead_letters(older_than_seconds=7 * 24 * 3600) == 1
+    db.expire_all()
+    assert {row.to: row.html is None for row in db.query(EmailOutbox)} == {
+        "old@example.com": True, "new@example.com": False, "pending@example.com": False,
+    }
+    db.close()
+
+    # Nothing left to resend
+    assert client.post(f"/api/v1/notify/email/{old_id}/retry").status_code == 404
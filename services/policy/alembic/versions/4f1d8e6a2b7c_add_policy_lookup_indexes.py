@@ -0,0 +1,34 @@
+"""Add indexes for policy lookups by company, user, enrollment and detail policy_id
+
+Revision ID: 4f1d8e6a2b7c
+Revises: 9c4e7b2a1d3f
+Create Date: 2026-10-19 14:03:27.118604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1d8e6a2b7c'
+down_revision: Union[str, None] = '9c4e7b2a1d3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_policy_ic_company_id_status', 'policy', ['ic_company_id', 'status'], unique=False)
+    op.create_index('ix_policy_user_id', 'policy', ['user_id'], unique=False)
+    op.create_index('ix_policy_enrollment_id', 'policy', ['enrollment_id'], unique=False)
+    op.create_index('ix_policy_detail_policy_id_period', 'policy_detail', ['policy_id', 'period'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_policy_detail_policy_id_period', table_name='policy_detail')
+    op.drop_index('ix_policy_enrollment_id', table_name='policy')
+    op.drop_index('ix_policy_user_id', table_name='policy')
+    op.drop_index('ix_policy_ic_company_id_status', table_name='policy')
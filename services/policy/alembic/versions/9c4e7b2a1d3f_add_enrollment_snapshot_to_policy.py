@@ -0,0 +1,34 @@
+"""Add enrollment snapshot columns to policy
+
+Revision ID: 9c4e7b2a1d3f
+Revises: 535532062c79
+Create Date: 2026-10-19 10:12:41.502113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e7b2a1d3f'
+down_revision: Union[str, None] = '535532062c79'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('policy', sa.Column('customer_id', sa.Integer(), nullable=True))
+    op.add_column('policy', sa.Column('product_id', sa.Integer(), nullable=True))
+    op.add_column('policy', sa.Column('cps_zone', sa.Integer(), nullable=True))
+    op.add_column('policy', sa.Column('grid', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('policy', 'grid')
+    op.drop_column('policy', 'cps_zone')
+    op.drop_column('policy', 'product_id')
+    op.drop_column('policy', 'customer_id')
@@ -4,5 +4,12 @@
 # Run initial migrations (if no migration exists, alembic will create one based on your autogenerate settings)
 alembic upgrade head
 
+# Fill in enrollment snapshots for policies created before they were stored (no-op once done).
+# The API still starts if some remain, but detail reads filtered by product_type are refused
+# with 409 until a later run fills them in.
+if ! python -m src.utils.backfill_snapshots; then
+    echo "Enrollment snapshot backfill incomplete; product_type detail filters are refused until it completes" >&2
+fi
+
 # Start the FastAPI application
 exec uvicorn src.main:app --host 0.0.0.0 --port 8000 --reload
@@ -6,6 +6,9 @@ class Settings(BaseSettings):
     DFS_SERVICE_URL: str
     PRODUCT_SERVICE_URL: str
     API_V1_STR: str = "/api"
+    # Enrollment snapshots fetched from DFS; 0 disables the cache
+    ENROLLMENT_CACHE_MAX_SIZE: int = 10000
+    ENROLLMENT_CACHE_TTL_SECONDS: float = 300.0
     model_config = ConfigDict(from_attributes=True)
 
 settings = Settings()
@@ -1,75 +1,169 @@
 import os
 import httpx
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from service_auth import service_headers
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime
 from ..models.policy import Policy, PolicyDetail
 from src.core.config import settings
+from src.utils.enrollment_cache import enrollment_cache
 
 DFS_SERVICE_URL = settings.DFS_SERVICE_URL 
+# Largest ID list the DFS lookup endpoint accepts
+DFS_LOOKUP_LIMIT = 5000
 
 def fetch_enrollment(enrollment_id: int) -> dict:
+    cached = enrollment_cache.get(enrollment_id)
+    if cached is not None:
+        return cached
     try:
         resp = httpx.get(
-            f"{DFS_SERVICE_URL}/api/enrollments/{enrollment_id}", timeout=5
+            f"{DFS_SERVICE_URL}/api/enrollments/{enrollment_id}", headers=service_headers(), timeout=5
         )
         resp.raise_for_status()
-        return resp.json()
+        data = resp.json()
+        enrollment_cache.put(enrollment_id, data)
+        return data
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"Enrollment (DFS) service error: {e}")
 
-def create_policy(db: Session, enrollment_id: int) -> Policy:
-    data = fetch_enrollment(enrollment_id)
 
-    sum_insured = data.get('sum_insured')
-    user_id = data.get('user_id')
-    ic_company_id = data.get('ic_company_id')
-    receipt_no = data.get('receipt_no')
-    product_id = data.get('product_id')
+def fetch_enrollments(enrollment_ids: list[int]) -> dict[int, dict]:
+    """Fetch many enrollments, from the cache or in one DFS call, keyed by enrollment ID. Unknown IDs are left out."""
+    found = enrollment_cache.get_many(enrollment_ids)
+    missing = [eid for eid in enrollment_ids if eid not in found]
+    if not missing:
+        return found
+    try:
+        resp = httpx.post(
+            f"{DFS_SERVICE_URL}/api/enrollments/lookup",
+            json={"enrollment_ids": missing}, headers=service_headers(), timeout=30
+        )
+        resp.raise_for_status()
+        fetched = {e['enrolement_id']: e for e in resp.json()['enrollments']}
+        enrollment_cache.put_many(fetched)
+        return {**found, **fetched}
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Enrollment (DFS) service error: {e}")
+
+def apply_enrollment_snapshot(policy: Policy, enrollment: dict) -> None:
+    policy.customer_id = enrollment.get('customer_id')
+    policy.product_id = enrollment.get('product_id')
+    policy.cps_zone = enrollment.get('cps_zone')
+    policy.grid = enrollment.get('grid')
 
-    if None in (sum_insured, user_id, ic_company_id, receipt_no, product_id):
+
+def policy_values(enrollment_id: int, data: dict) -> dict:
+    """Column values for a new policy built from its enrollment; 400 if the enrollment is incomplete."""
+    required = [data.get(k) for k in ('sum_insured', 'user_id', 'ic_company_id', 'receipt_no', 'product_id')]
+    if None in required:
         raise HTTPException(status_code=400, detail="Invalid enrollment data")
 
-    fiscal_year = str(datetime.utcnow().year)
+    return {
+        'enrollment_id': enrollment_id,
+        'user_id': data['user_id'],
+        'ic_company_id': data['ic_company_id'],
+        'policy_no': data['receipt_no'],
+        'fiscal_year': str(datetime.utcnow().year),
+        'status': 'pending',
+        'customer_id': data.get('customer_id'),
+        'product_id': data['product_id'],
+        'cps_zone': data.get('cps_zone'),
+        'grid': data.get('grid'),
+    }
 
-    policy = Policy(
-        enrollment_id=enrollment_id,
-        user_id=user_id,
-        ic_company_id=ic_company_id,
-        policy_no=receipt_no,
-        fiscal_year=fiscal_year,
-        status='pending'
-    )
-    db.add(policy)
-    db.flush()  # to populate policy.policy_id
 
-    details = []
+def period_sums(product_id: int, sum_insured: float) -> list[tuple[int, float]]:
+    """(period, period_sum_insured) pairs for a policy."""
     if product_id == 2:
         # Livestock: 2 periods
-        details.append(PolicyDetail(
-            policy_id=policy.policy_id, period=1,
-            period_sum_insured=sum_insured * 0.58
-        ))
-        details.append(PolicyDetail(
-            policy_id=policy.policy_id, period=2,
-            period_sum_insured=sum_insured * 0.42
-        ))
-    else:
-        # Crop: 36 equal periods
-        per_sum = sum_insured / 36
-        for p in range(1, 37):
-            details.append(PolicyDetail(
-                policy_id=policy.policy_id,
-                period=p,
-                period_sum_insured=per_sum
-            ))
-
-    db.add_all(details)
+        return [(1, sum_insured * 0.58), (2, sum_insured * 0.42)]
+    # Crop: 36 equal periods
+    per_sum = sum_insured / 36
+    return [(p, per_sum) for p in range(1, 37)]
+
+
+def create_policy(db: Session, enrollment_id: int) -> Policy:
+    # Creation requests are retried by the dfs outbox, so a repeat must not fail
+    existing = get_policy_by_enrollment(db, enrollment_id)
+    if existing:
+        return existing
+
+    data = fetch_enrollment(enrollment_id)
+    policy = Policy(**policy_values(enrollment_id, data))
+    policy.details = [
+        PolicyDetail(period=period, period_sum_insured=amount)
+        for period, amount in period_sums(policy.product_id, data['sum_insured'])
+    ]
+    db.add(policy)
     db.commit()
     db.refresh(policy)
     return policy
 
 
+def create_policies(db: Session, enrollment_ids: list[int]) -> tuple[list[Policy], list[dict]]:
+    """
+    Issue policies for a batch of enrollments: one DFS call, one multi-row insert for the
+    policies, one for their details, one commit. Enrollments that already have a policy
+    return it unchanged; ones that cannot be issued are reported as
+    {"enrollment_id", "detail"} errors and do not block the rest of the batch.
+    """
+    enrollment_ids = list(dict.fromkeys(enrollment_ids))
+    existing = {
+        p.enrollment_id: p.policy_id
+        for p in db.query(Policy.enrollment_id, Policy.policy_id).filter(Policy.enrollment_id.in_(enrollment_ids))
+    }
+    to_create = [eid for eid in enrollment_ids if eid not in existing]
+    enrollments = fetch_enrollments(to_create)
+
+    errors, rows, sums = [], [], {}
+    for enrollment_id in to_create:
+        data = enrollments.get(enrollment_id)
+        if data is None:
+            errors.append({'enrollment_id': enrollment_id, 'detail': "Enrollment not found"})
+            continue
+        try:
+            values = policy_values(enrollment_id, data)
+        except HTTPException as e:
+            errors.append({'enrollment_id': enrollment_id, 'detail': e.detail})
+            continue
+        rows.append(values)
+        sums[enrollment_id] = period_sums(values['product_id'], data['sum_insured'])
+
+    # policy_no is unique: drop receipts already issued or repeated within the batch
+    taken = {
+        no for (no,) in db.query(Policy.policy_no).filter(Policy.policy_no.in_([r['policy_no'] for r in rows]))
+    }
+    unique_rows = []
+    for values in rows:
+        if values['policy_no'] in taken:
+            errors.append({'enrollment_id': values['enrollment_id'], 'detail': "Duplicate policy number"})
+            continue
+        taken.add(values['policy_no'])
+        unique_rows.append(values)
+
+    if unique_rows:
+        created = db.execute(
+            insert(Policy).returning(Policy.policy_id, Policy.enrollment_id, sort_by_parameter_order=True),
+            unique_rows,
+        ).all()
+        db.execute(insert(PolicyDetail), [
+            {'policy_id': policy_id, 'period': period, 'period_sum_insured': amount}
+            for policy_id, enrollment_id in created
+            for period, amount in sums[enrollment_id]
+        ])
+        db.commit()
+        existing.update({enrollment_id: policy_id for policy_id, enrollment_id in created})
+
+    by_id = {
+        p.policy_id: p
+        for p in db.query(Policy).options(selectinload(Policy.details)).filter(Policy.policy_id.in_(existing.values()))
+    }
+    policies = [by_id[existing[eid]] for eid in enrollment_ids if eid in existing]
+    return policies, errors
+
+
 def change_status(db: Session, policy_id: int, new_status: str) -> Policy:
     policy = db.query(Policy).get(policy_id)
     if not policy:
@@ -106,20 +200,118 @@ def get_policy_details(db: Session, policy_id: int):
     return policy.details
 
 
-def list_policy_details(db: Session):
-    details = db.query(PolicyDetail).all()
-    output = []
-    for d in details:
-        p = d.policy
-        enrollment = fetch_enrollment(p.enrollment_id)
-        output.append({
-            'policy_detail_id': d.policy_detail_id,
-            'customer_id': enrollment.get('customer_id'),
-            'policy_id': p.policy_id,
-            'period_sum_insured': float(d.period_sum_insured),
-            'cps_zone': str(enrollment.get('cps_zone')),
-            'grid': str(enrollment.get('grid')),
-            'product_type': enrollment.get('product_id'),
-            "period": d.period,
-        })
-    return output
+def backfill_enrollment_snapshots(db: Session) -> int:
+    """
+    Capture the enrollment snapshot for policies created before it was stored, via bulk
+    DFS lookups. Run once at deploy (python -m src.utils.backfill_snapshots), not on reads.
+    Returns the number of policies filled in.
+    """
+    missing = db.query(Policy).filter(Policy.product_id.is_(None)).all()
+    filled = 0
+    for start in range(0, len(missing), DFS_LOOKUP_LIMIT):
+        chunk = missing[start:start + DFS_LOOKUP_LIMIT]
+        enrollments = fetch_enrollments([policy.enrollment_id for policy in chunk])
+        for policy in chunk:
+            if policy.enrollment_id in enrollments:
+                apply_enrollment_snapshot(policy, enrollments[policy.enrollment_id])
+                filled += 1
+        # Keep what is done if DFS fails on a later chunk
+        db.commit()
+    return filled
+
+
+def count_missing_snapshots(db: Session) -> int:
+    """Policies still waiting for backfill_enrollment_snapshots."""
+    return db.query(Policy).filter(Policy.product_id.is_(None)).count()
+
+
+def _require_snapshots(db: Session, product_type=None):
+    """
+    A product_type filter cannot match a policy without a snapshot; refuse instead of
+    silently leaving those policies out of, e.g., a claim run.
+    """
+    if product_type is None:
+        return
+    missing = count_missing_snapshots(db)
+    if missing:
+        raise HTTPException(
+            status_code=409,
+            detail=(
+                f"{missing} policies have no enrollment snapshot yet, so filtering by product_type "
+                "would leave them out. Run python -m src.utils.backfill_snapshots first."
+            ),
+        )
+
+
+def _policy_details_page(db: Session, period=None, product_type=None, status=None,
+                         company_id=None, after_id=None, limit=None):
+    query = (
+        db.query(
+            PolicyDetail.policy_detail_id,
+            PolicyDetail.period,
+            PolicyDetail.period_sum_insured,
+            Policy.policy_id,
+            Policy.customer_id,
+            Policy.product_id,
+            Policy.cps_zone,
+            Policy.grid,
+        )
+        .join(Policy, PolicyDetail.policy_id == Policy.policy_id)
+    )
+    if period is not None:
+        query = query.filter(PolicyDetail.period == period)
+    if product_type is not None:
+        query = query.filter(Policy.product_id == product_type)
+    if status is not None:
+        query = query.filter(Policy.status == status)
+    if company_id is not None:
+        query = query.filter(Policy.ic_company_id == company_id)
+    if after_id is not None:
+        query = query.filter(PolicyDetail.policy_detail_id > after_id)
+    query = query.order_by(PolicyDetail.policy_detail_id)
+    if limit is not None:
+        query = query.limit(limit)
+    rows = query.all()
+    return [
+        {
+            'policy_detail_id': r.policy_detail_id,
+            'customer_id': r.customer_id,
+            'policy_id': r.policy_id,
+            'period_sum_insured': float(r.period_sum_insured),
+            # Null, not "None", for policies whose snapshot has not been backfilled yet
+            'cps_zone': str(r.cps_zone) if r.cps_zone is not None else None,
+            'grid': str(r.grid) if r.grid is not None else None,
+            'product_type': r.product_id,
+            "period": r.period,
+        }
+        for r in rows
+    ]
+
+
+def list_policy_details(db: Session, **filters):
+    """
+    Policy detail rows joined with their policy's enrollment snapshot, ordered by
+    policy_detail_id. Filters: period, product_type, status, company_id; pass the last
+    policy_detail_id of a page as `after_id` (with `limit`) to get the next page.
+    """
+    _require_snapshots(db, filters.get('product_type'))
+    return _policy_details_page(db, **filters)
+
+
+def iter_policy_details(db: Session, page_size: int = 1000, **filters):
+    """
+    Every matching detail row, fetched `page_size` rows at a time by keyset. The snapshot
+    check runs on the call, before any row is produced, so it can still fail the request.
+    """
+    _require_snapshots(db, filters.get('product_type'))
+    return _iter_policy_detail_pages(db, page_size, **filters)
+
+
+def _iter_policy_detail_pages(db: Session, page_size: int, **filters):
+    after_id = None
+    while True:
+        page = _policy_details_page(db, after_id=after_id, limit=page_size, **filters)
+        yield from page
+        if len(page) < page_size:
+            return
+        after_id = page[-1]['policy_detail_id']
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, CheckConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 from src.database.db import Base
 
@@ -11,9 +11,18 @@ class Policy(Base):
     policy_no = Column(String(50), nullable=False, unique=True)
     fiscal_year = Column(String(4), nullable=False)
     status = Column(String(20), nullable=False, default='pending')
+    # Snapshot of the enrollment at creation, so detail listings need no DFS round trip
+    customer_id = Column(Integer, nullable=True)
+    product_id = Column(Integer, nullable=True)
+    cps_zone = Column(Integer, nullable=True)
+    grid = Column(Integer, nullable=True)
 
     __table_args__ = (
         CheckConstraint("status IN ('pending', 'approved', 'rejected')", name='ck_policy_status'),
+        # Company listings, optionally narrowed by status (details feed)
+        Index('ix_policy_ic_company_id_status', 'ic_company_id', 'status'),
+        Index('ix_policy_user_id', 'user_id'),
+        Index('ix_policy_enrollment_id', 'enrollment_id'),
     )
 
     details = relationship(
@@ -27,4 +36,9 @@ class PolicyDetail(Base):
     period = Column(Integer, nullable=False)
     period_sum_insured = Column(Numeric(14, 2), nullable=False)
 
-    policy = relationship('Policy', back_populates='details')
\ No newline at end of file
+    policy = relationship('Policy', back_populates='details')
+
+    __table_args__ = (
+        # Loading a policy's details, optionally for one period
+        Index('ix_policy_detail_policy_id_period', 'policy_id', 'period'),
+    )
\ No newline at end of file
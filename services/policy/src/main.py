@@ -1,12 +1,13 @@
 # policy/src/main.py
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from service_auth import require_auth
 from fastapi.middleware.cors import CORSMiddleware
 from src.database.db import Base, engine
 from src.routes.policy import router as policy_router
 from src.core.config import settings
 from contextlib import asynccontextmanager
 
-app = FastAPI(title="Policy Administration API")
+app = FastAPI(title="Policy Administration API", dependencies=[Depends(require_auth)])
 
 
 @asynccontextmanager
@@ -1,20 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from src.database.db import get_db
 from src.database.crud.policy_crud import (
 
-    create_policy, change_status,
+    create_policy, create_policies, change_status,
     get_policy, list_policies,
-    get_policy_details, list_policy_details,
+    get_policy_details, list_policy_details, iter_policy_details,
     get_policies_by_company,
     get_policy_by_enrollment,
     get_policies_by_user
 )
 from ..schemas.policy_schema import (
     PolicyCreateSchema, PolicySchema,
+    PolicyBatchCreateSchema, PolicyBatchSchema,
+    EnrollmentCacheInvalidateSchema,
     PolicyDetailSchema, MessageSchema
 )
+from src.utils.enrollment_cache import enrollment_cache
 
 router = APIRouter()
 
@@ -25,6 +30,14 @@ def create_policy_endpoint(
 ):
     return create_policy(db, payload.enrollment_id)
 
+@router.post("/policies/batch", response_model=PolicyBatchSchema)
+def create_policies_endpoint(
+    payload: PolicyBatchCreateSchema,
+    db: Session = Depends(get_db)
+):
+    policies, errors = create_policies(db, payload.enrollment_ids)
+    return {"policies": policies, "errors": errors}
+
 @router.post("/policy/{policy_id}/approve", response_model=PolicySchema)
 def approve_policy(
     policy_id: int,
@@ -89,8 +102,54 @@ def list_policies_endpoint(
 ):
     return list_policies(db)
 
+MAX_DETAILS_PAGE_SIZE = 10000
+
+
 @router.get("/policies/details", response_model=List[dict])
 def list_policy_details_endpoint(
+    period: Optional[int] = Query(None, ge=1, le=36),
+    product_type: Optional[int] = None,
+    status: Optional[str] = None,
+    company_id: Optional[int] = None,
+    after_id: Optional[int] = Query(None, description="Return details with a policy_detail_id greater than this (last ID of the previous page)."),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_DETAILS_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    return list_policy_details(
+        db, period=period, product_type=product_type, status=status,
+        company_id=company_id, after_id=after_id, limit=limit,
+    )
+
+
+@router.get("/policies/details/stream")
+def stream_policy_details_endpoint(
+    period: Optional[int] = Query(None, ge=1, le=36),
+    product_type: Optional[int] = None,
+    status: Optional[str] = None,
+    company_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    return list_policy_details(db)
\ No newline at end of file
+    """Same rows as /policies/details, as newline-delimited JSON read from the DB page by page."""
+    # Called here, not inside the generator, so a refusal is still a proper error response
+    rows = iter_policy_details(
+        db, period=period, product_type=product_type, status=status, company_id=company_id,
+    )
+
+    def ndjson():
+        try:
+            for row in rows:
+                yield json.dumps(row) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.post("/enrollment-cache/invalidate")
+def invalidate_enrollment_cache(payload: EnrollmentCacheInvalidateSchema):
+    """Called by DFS when enrollments change so cached snapshots are refetched."""
+    return {"invalidated": enrollment_cache.invalidate(payload.enrollment_ids)}
+
+@router.get("/enrollment-cache/stats")
+def enrollment_cache_stats():
+    return enrollment_cache.stats()
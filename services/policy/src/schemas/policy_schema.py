@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 class PolicyDetailSchema(BaseModel):
@@ -16,6 +16,10 @@ class PolicySchema(BaseModel):
     policy_no: str
     fiscal_year: str
     status: str
+    customer_id: Optional[int] = None
+    product_id: Optional[int] = None
+    cps_zone: Optional[int] = None
+    grid: Optional[int] = None
     details: List[PolicyDetailSchema] = []
 
     class Config:
@@ -24,5 +28,19 @@ class PolicySchema(BaseModel):
 class PolicyCreateSchema(BaseModel):
     enrollment_id: int
 
+class PolicyBatchCreateSchema(BaseModel):
+    enrollment_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class PolicyBatchErrorSchema(BaseModel):
+    enrollment_id: int
+    detail: str
+
+class PolicyBatchSchema(BaseModel):
+    policies: List[PolicySchema]
+    errors: List[PolicyBatchErrorSchema] = []
+
+class EnrollmentCacheInvalidateSchema(BaseModel):
+    enrollment_ids: List[int]
+
 class MessageSchema(BaseModel):
     message: str
@@ -0,0 +1,40 @@
+"""
+One-off backfill of the enrollment snapshot columns on policies created before they
+were stored. Safe to re-run: only policies still missing a snapshot are looked up.
+
+    python -m src.utils.backfill_snapshots
+"""
+import logging
+
+from fastapi import HTTPException
+
+from src.database.crud.policy_crud import backfill_enrollment_snapshots, count_missing_snapshots
+from src.database.db import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        try:
+            filled = backfill_enrollment_snapshots(db)
+        except HTTPException as e:
+            # DFS unavailable: the rest is picked up on the next run
+            logger.error(f"Enrollment snapshot backfill incomplete: {e.detail}")
+            filled = None
+        remaining = count_missing_snapshots(db)
+    finally:
+        db.close()
+    if filled is not None:
+        logger.info(f"Enrollment snapshot backfill: {filled} policies filled in")
+    if remaining:
+        # Unknown to DFS or not reached: these policies are refused by product_type filters
+        logger.error(f"Enrollment snapshot backfill: {remaining} policies still have no snapshot")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
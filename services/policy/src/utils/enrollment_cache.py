@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+
+from src.core.config import settings
+
+
+class EnrollmentCache:
+    """
+    Bounded, thread-safe LRU cache of DFS enrollment snapshots keyed by enrollment_id.
+    Entries expire after `ttl_seconds`; DFS also pushes invalidations when an
+    enrollment changes, so the TTL only bounds staleness if a push is lost.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _lookup(self, enrollment_id: int, now: float):
+        entry = self._entries.get(enrollment_id)
+        if entry is not None:
+            expires_at, snapshot = entry
+            if expires_at > now:
+                self._entries.move_to_end(enrollment_id)
+                self.hits += 1
+                return snapshot
+            del self._entries[enrollment_id]
+        self.misses += 1
+        return None
+
+    def get(self, enrollment_id: int):
+        with self._lock:
+            return self._lookup(enrollment_id, self._clock())
+
+    def get_many(self, enrollment_ids) -> dict[int, dict]:
+        """Cached snapshots for the IDs that are present; callers fetch the rest."""
+        with self._lock:
+            now = self._clock()
+            found = {}
+            for enrollment_id in enrollment_ids:
+                snapshot = self._lookup(enrollment_id, now)
+                if snapshot is not None:
+                    found[enrollment_id] = snapshot
+            return found
+
+    def put(self, enrollment_id: int, snapshot: dict) -> None:
+        self.put_many({enrollment_id: snapshot})
+
+    def put_many(self, snapshots: dict[int, dict]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            expires_at = self._clock() + self.ttl_seconds
+            for enrollment_id, snapshot in snapshots.items():
+                self._entries[enrollment_id] = (expires_at, snapshot)
+                self._entries.move_to_end(enrollment_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, enrollment_ids) -> int:
+        """Drop the given enrollments; returns how many were cached."""
+        with self._lock:
+            removed = sum(self._entries.pop(enrollment_id, None) is not None for enrollment_id in enrollment_ids)
+            self.invalidations += removed
+            return removed
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+enrollment_cache = EnrollmentCache(
+    max_size=settings.ENROLLMENT_CACHE_MAX_SIZE,
+    ttl_seconds=settings.ENROLLMENT_CACHE_TTL_SECONDS,
+)
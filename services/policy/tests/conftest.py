@@ -9,6 +9,7 @@ from src.main import app
 from src.database.db import Base, get_db
 from src.database.crud import policy_crud
 from src.database.models.policy import Policy, PolicyDetail
+from src.utils.enrollment_cache import enrollment_cache
 
 # --- Database Test Setup ---------------------------------------------------
 DATABASE_URL = "sqlite:///:memory:"
@@ -37,6 +38,14 @@ def setup_database():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_enrollment_cache():
+    """Each test mocks DFS itself, so snapshots must not leak between tests."""
+    enrollment_cache.clear()
+    yield
+    enrollment_cache.clear()
+
+
 @pytest.fixture(scope="session")
 def client():
     """TestClient with overridden DB dependency."""
@@ -62,7 +71,7 @@ def mock_enrollment(monkeypatch):
             def json(self):
                 return self._json
 
-        def _mock_get(url, timeout):
+        def _mock_get(url, timeout, headers=None):
             return MockResponse(data, status_code, error)
 
         monkeypatch.setattr(policy_crud.httpx, 'get', _mock_get)
@@ -0,0 +1,51 @@
+from src.database.crud import policy_crud
+from src.utils.enrollment_cache import EnrollmentCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = EnrollmentCache(max_size=2, ttl_seconds=10, clock=clock)
+    cache.put(1, {'id': 1})
+    cache.put(2, {'id': 2})
+    assert cache.get(1) == {'id': 1}  # 1 is now most recently used
+    cache.put(3, {'id': 3})
+    assert cache.get(2) is None
+    assert cache.get_many([1, 3]) == {1: {'id': 1}, 3: {'id': 3}}
+
+    clock.now = 11
+    assert cache.get(1) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (3, 2, 1)
+    assert stats['size'] == 1
+
+
+def test_fetch_enrollment_is_cached_until_invalidated(client, mock_enrollment, monkeypatch):
+    calls = []
+    mock_enrollment(data={'enrolement_id': 80, 'product_id': 1})
+    real_get = policy_crud.httpx.get
+
+    def counting_get(url, timeout, headers=None):
+        calls.append(url)
+        return real_get(url, timeout)
+
+    monkeypatch.setattr(policy_crud.httpx, 'get', counting_get)
+
+    assert policy_crud.fetch_enrollment(80)['product_id'] == 1
+    assert policy_crud.fetch_enrollment(80)['product_id'] == 1
+    assert len(calls) == 1
+
+    response = client.post('/api/enrollment-cache/invalidate', json={'enrollment_ids': [80, 81]})
+    assert response.json() == {'invalidated': 1}
+    policy_crud.fetch_enrollment(80)
+    assert len(calls) == 2
+
+    stats = client.get('/api/enrollment-cache/stats').json()
+    assert (stats['hits'], stats['misses'], stats['invalidations']) == (1, 2, 1)
@@ -1,7 +1,14 @@
 from random import randint
+import json
 import pytest
 import httpx
 
+from src.database.crud import policy_crud
+from src.database.models.policy import Policy, PolicyDetail
+from src.database.db import get_db
+from src.routes import policy as policy_routes
+from src.main import app
+
 # All fixtures (client, mock_enrollment) imported from conftest
 
 def test_create_crop_policy(client, mock_enrollment):
@@ -55,6 +62,27 @@ def test_create_livestock_policy(client, mock_enrollment):
     assert body['details'][1]['period_sum_insured'] == pytest.approx(1000 * 0.42)
 
 
+def test_create_policy_is_idempotent_per_enrollment(client, mock_enrollment):
+    enrollment_data = {
+        'sum_insured': 720,
+        'user_id': 5,
+        'ic_company_id': 3,
+        'receipt_no': 'IDEM1',
+        'product_id': 1,
+        'customer_id': 10,
+        'cps_zone': 12
+    }
+    mock_enrollment(data=enrollment_data)
+    first = client.post('/api/policy', json={'enrollment_id': 8})
+    assert first.status_code == 200
+
+    # A retried request (e.g. from the dfs outbox) must not fail or duplicate
+    mock_enrollment(error=httpx.HTTPError('should not be called'))
+    second = client.post('/api/policy', json={'enrollment_id': 8})
+    assert second.status_code == 200
+    assert second.json()['policy_id'] == first.json()['policy_id']
+
+
 def test_enrollment_service_error(client, mock_enrollment):
     mock_enrollment(error=httpx.HTTPError('Service down'))
     response = client.post('/api/policy', json={'enrollment_id': 3})
@@ -154,3 +182,156 @@ def test_not_found(client, method, endpoint):
     response = getattr(client, method)(endpoint)
     assert response.status_code == 404
     assert response.json()['detail'] == 'Policy not found'
+
+
+def test_policy_details_use_enrollment_snapshot(client, mock_enrollment):
+    enrollment_data = {
+        'sum_insured': 3600,
+        'user_id': 4,
+        'ic_company_id': 9,
+        'receipt_no': 'SNAP1',
+        'product_id': 1,
+        'customer_id': 77,
+        'cps_zone': 14,
+        'grid': 5123,
+    }
+    mock_enrollment(data=enrollment_data)
+    policy = client.post('/api/policy', json={'enrollment_id': 30}).json()
+    assert (policy['customer_id'], policy['cps_zone'], policy['grid']) == (77, 14, 5123)
+
+    # Listing details must not go back to DFS
+    mock_enrollment(error=httpx.HTTPError('DFS should not be called'))
+    response = client.get('/api/policies/details')
+    assert response.status_code == 200
+    details = [d for d in response.json() if d['policy_id'] == policy['policy_id']]
+    assert len(details) == 36
+    assert details[0]['customer_id'] == 77
+    assert details[0]['cps_zone'] == '14'
+    assert details[0]['grid'] == '5123'
+    assert details[0]['product_type'] == 1
+
+
+def test_policy_details_backfill_runs_outside_reads(client, monkeypatch):
+    sessions = app.dependency_overrides[get_db]()
+    db = next(sessions)
+    legacy = Policy(enrollment_id=31, user_id=1, ic_company_id=1, policy_no='LEGACY1', fiscal_year='2024', status='pending')
+    legacy.details = [PolicyDetail(period=p, period_sum_insured=10) for p in range(1, 37)]
+    db.add(legacy)
+    db.commit()
+
+    calls = []
+
+    def fake_fetch(enrollment_ids):
+        calls.extend(enrollment_ids)
+        return {31: {'customer_id': 5, 'product_id': 1, 'cps_zone': 2, 'grid': 3}}
+
+    monkeypatch.setattr(policy_crud, 'fetch_enrollments', fake_fetch)
+    # Reads are plain SQL; the legacy row is listed without its snapshot
+    listed = [d for d in client.get('/api/policies/details').json() if d['policy_id'] == legacy.policy_id]
+    assert len(listed) == 36 and listed[0]['customer_id'] is None
+    assert listed[0]['cps_zone'] is None and listed[0]['grid'] is None
+    assert calls == []
+    # A product_type filter would silently leave the legacy policy out, so it is refused
+    for path in ('/api/policies/details', '/api/policies/details/stream'):
+        refused = client.get(path, params={'product_type': 1})
+        assert refused.status_code == 409 and '1 policies have no enrollment snapshot' in refused.json()['detail']
+
+    assert policy_crud.backfill_enrollment_snapshots(db) == 1
+    assert policy_crud.count_missing_snapshots(db) == 0
+    assert client.get('/api/policies/details', params={'product_type': 1}).status_code == 200
+    assert policy_crud.backfill_enrollment_snapshots(db) == 0
+    assert calls == [31]
+    listed = [d for d in client.get('/api/policies/details').json() if d['policy_id'] == legacy.policy_id]
+    assert listed[0]['customer_id'] == 5
+    sessions.close()
+
+
+def test_policy_details_filters_and_pagination(client, mock_enrollment):
+    for enrollment_id, product_id, company_id in [(40, 1, 501), (41, 2, 501), (42, 1, 502)]:
+        mock_enrollment(data={
+            'sum_insured': 720, 'user_id': 1, 'ic_company_id': company_id,
+            'receipt_no': f'PAGE{enrollment_id}', 'product_id': product_id,
+            'customer_id': enrollment_id, 'cps_zone': 3, 'grid': 7,
+        })
+        client.post('/api/policy', json={'enrollment_id': enrollment_id})
+
+    crop = client.get('/api/policies/details', params={'company_id': 501, 'product_type': 1}).json()
+    assert len(crop) == 36
+    assert {d['customer_id'] for d in crop} == {40}
+
+    period_two = client.get('/api/policies/details', params={'company_id': 501, 'period': 2}).json()
+    assert sorted(d['customer_id'] for d in period_two) == [40, 41]
+
+    first = client.get('/api/policies/details', params={'company_id': 501, 'limit': 30}).json()
+    rest = client.get('/api/policies/details', params={
+        'company_id': 501, 'limit': 30, 'after_id': first[-1]['policy_detail_id'],
+    }).json()
+    ids = [d['policy_detail_id'] for d in first + rest]
+    assert len(ids) == 38 and ids == sorted(set(ids))
+
+
+def test_policy_details_stream(client, mock_enrollment, monkeypatch):
+    mock_enrollment(data={
+        'sum_insured': 3600, 'user_id': 1, 'ic_company_id': 601, 'receipt_no': 'STREAM1',
+        'product_id': 1, 'customer_id': 50, 'cps_zone': 4, 'grid': 8,
+    })
+    client.post('/api/policy', json={'enrollment_id': 50})
+
+    # Small pages so the stream has to walk several keyset pages
+    real_iter = policy_crud.iter_policy_details
+    monkeypatch.setattr(policy_routes, 'iter_policy_details',
+                        lambda db, **filters: real_iter(db, page_size=10, **filters))
+
+    response = client.get('/api/policies/details/stream', params={'company_id': 601})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 36
+    assert rows == client.get('/api/policies/details', params={'company_id': 601}).json()
+
+
+def test_create_policies_batch(client, monkeypatch):
+    enrollments = {
+        60: {'enrolement_id': 60, 'sum_insured': 3600, 'user_id': 1, 'ic_company_id': 701,
+             'receipt_no': 'BATCH60', 'product_id': 1, 'customer_id': 600, 'cps_zone': 2, 'grid': 9},
+        61: {'enrolement_id': 61, 'sum_insured': 1000, 'user_id': 1, 'ic_company_id': 701,
+             'receipt_no': 'BATCH61', 'product_id': 2, 'customer_id': 601, 'cps_zone': 2, 'grid': 9},
+        62: {'enrolement_id': 62, 'sum_insured': 1000, 'user_id': 1, 'ic_company_id': 701,
+             'receipt_no': 'BATCH61', 'product_id': 2, 'customer_id': 602, 'cps_zone': 2, 'grid': 9},
+        63: {'enrolement_id': 63, 'user_id': 1, 'ic_company_id': 701, 'receipt_no': 'BATCH63', 'product_id': 1},
+    }
+    lookups = []
+
+    class LookupResponse:
+        def __init__(self, ids):
+            self.ids = ids
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'enrollments': [enrollments[i] for i in self.ids if i in enrollments]}
+
+    def fake_post(url, json, timeout, headers=None):
+        assert url.endswith('/api/enrollments/lookup')
+        lookups.append(json['enrollment_ids'])
+        return LookupResponse(json['enrollment_ids'])
+
+    monkeypatch.setattr(policy_crud.httpx, 'post', fake_post)
+
+    response = client.post('/api/policies/batch', json={'enrollment_ids': [60, 61, 62, 63, 64, 60]})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert lookups == [[60, 61, 62, 63, 64]]
+    assert [p['enrollment_id'] for p in body['policies']] == [60, 61]
+    assert len(body['policies'][0]['details']) == 36
+    assert body['policies'][1]['details'][0]['period_sum_insured'] == pytest.approx(580)
+    assert body['policies'][0]['customer_id'] == 600
+    assert {e['enrollment_id']: e['detail'] for e in body['errors']} == {
+        62: 'Duplicate policy number', 63: 'Invalid enrollment data', 64: 'Enrollment not found',
+    }
+
+    # Retrying the batch returns the issued policies without creating new ones
+    again = client.post('/api/policies/batch', json={'enrollment_ids': [60, 61]}).json()
+    assert len(lookups) == 1
+    assert [p['policy_id'] for p in again['policies']] == [p['policy_id'] for p in body['policies']]
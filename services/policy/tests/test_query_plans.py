@@ -0,0 +1,69 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from src.database.crud import policy_crud
+from src.database.db import Base
+from src.database.models.policy import Policy, PolicyDetail
+
+# Seed size for the plan checks; set POLICY_EXPLAIN_ROWS=1000000 to run at production scale locally
+ROWS = int(os.environ.get('POLICY_EXPLAIN_ROWS', 20000))
+DETAILS_PER_POLICY = 2
+
+
+@pytest.fixture(scope='module')
+def seeded_db(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'policy.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for start in range(1, ROWS + 1, 50000):
+            ids = range(start, min(start + 50000, ROWS + 1))
+            conn.execute(insert(Policy), [
+                {'policy_id': i, 'enrollment_id': i, 'user_id': i % 5000, 'ic_company_id': i % 200,
+                 'policy_no': f'P{i}', 'fiscal_year': '2025', 'status': 'pending'}
+                for i in ids
+            ])
+            conn.execute(insert(PolicyDetail), [
+                {'policy_id': i, 'period': p, 'period_sum_insured': 10}
+                for i in ids for p in range(1, DETAILS_PER_POLICY + 1)
+            ])
+        conn.execute(text('ANALYZE'))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def query_plans(db, lookup):
+    """Run `lookup` and return the EXPLAIN QUERY PLAN rows of every statement it issued."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        lookup()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    db.expire_all()
+    conn = db.connection()
+    return [
+        ' | '.join(row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters))
+        for statement, parameters in statements
+    ]
+
+
+@pytest.mark.parametrize('lookup, index', [
+    (lambda db: policy_crud.get_policies_by_company(db, 7), 'ix_policy_ic_company_id_status'),
+    (lambda db: policy_crud.get_policies_by_user(db, 7), 'ix_policy_user_id'),
+    (lambda db: policy_crud.get_policy_by_enrollment(db, 7), 'ix_policy_enrollment_id'),
+    (lambda db: policy_crud.get_policy_details(db, 7), 'ix_policy_detail_policy_id_period'),
+])
+def test_hot_lookups_use_indexes(seeded_db, lookup, index):
+    plans = query_plans(seeded_db, lambda: lookup(seeded_db))
+    assert any(f'USING INDEX {index}' in plan for plan in plans), plans
+    assert not any('SCAN policy' in plan and 'INDEX' not in plan for plan in plans), plans
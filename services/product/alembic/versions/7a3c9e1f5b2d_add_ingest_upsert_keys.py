@@ -0,0 +1,52 @@
+"""add unique keys used by the Excel ingest upsert
+
+Revision ID: 7a3c9e1f5b2d
+Revises: eb70aaee008f
+Create Date: 2026-10-19 15:21:09.402816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3c9e1f5b2d'
+down_revision: Union[str, None] = 'eb70aaee008f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The old row-by-row ingest could leave duplicates; keep the newest row per key
+    op.execute("""
+        DELETE FROM trigger_exit_points a
+        USING trigger_exit_points b
+        WHERE a.teid < b.teid
+          AND a.zone_id = b.zone_id AND a.product_id = b.product_id
+          AND a.fiscal_year = b.fiscal_year AND a.period_id = b.period_id
+          AND a.growing_season_id = b.growing_season_id
+    """)
+    op.execute("""
+        DELETE FROM ndvi_crop a
+        USING ndvi_crop b
+        WHERE a.ndvi_id < b.ndvi_id
+          AND a.zone_id = b.zone_id AND a.fiscal_year = b.fiscal_year
+          AND a.period_id = b.period_id AND a.growing_season_id = b.growing_season_id
+    """)
+    op.create_unique_constraint(
+        'uq_trigger_exit_points_key', 'trigger_exit_points',
+        ['zone_id', 'product_id', 'fiscal_year', 'period_id', 'growing_season_id'],
+    )
+    op.create_unique_constraint(
+        'uq_ndvi_crop_key', 'ndvi_crop',
+        ['zone_id', 'fiscal_year', 'period_id', 'growing_season_id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_ndvi_crop_key', 'ndvi_crop', type_='unique')
+    op.drop_constraint('uq_trigger_exit_points_key', 'trigger_exit_points', type_='unique')
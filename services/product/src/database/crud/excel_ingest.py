@@ -1,68 +1,75 @@
 # File: src/database/crud/excel_ingest.py
 
 import logging
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from fastapi import HTTPException, status
 
 from src.database.models.excel_ingest import (
     CPSZone, Product, Period,
     GrowingSeason, NDVICrop, TriggerExitPoint
 )
 from src.schemas.excel_ingest import (
-    CPSZoneIn, ProductIn, PeriodIn,
+    CPSZoneIn, PeriodIn,
     GrowingSeasonIn, TriggerExitPointIn, NDVICropIn
 )
 
 logger = logging.getLogger(__name__)
 
-def upsert(
-    db: Session, model, unique_attrs: dict, data: dict
-) -> tuple:
+# Rows per INSERT statement; keeps bound parameters well under driver limits
+CHUNK_SIZE = 1000
+
+TRIGGER_KEY = ("zone_id", "product_id", "fiscal_year", "period_id", "growing_season_id")
+NDVI_KEY = ("zone_id", "fiscal_year", "period_id", "growing_season_id")
+
+
+def bulk_upsert(db: Session, model, rows: list[dict], key: tuple[str, ...]) -> None:
     """
-    Generic upsert: query by unique_attrs, then update or insert.
-    Returns (instance, created_flag).
+    Set-based upsert: INSERT ... ON CONFLICT (key) DO UPDATE, one statement per chunk.
+    Later rows win when the same key appears more than once.
     """
-    instance = db.query(model).filter_by(**unique_attrs).one_or_none()
-    if instance:
-        for k, v in data.items():
-            setattr(instance, k, v)
-        created = False
-    else:
-        instance = model(**data)
-        db.add(instance)
-        created = True
-    return instance, created
+    rows = list({tuple(row[k] for k in key): row for row in rows}.values())
+    if not rows:
+        return
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    for start in range(0, len(rows), CHUNK_SIZE):
+        stmt = insert(model).values(rows[start:start + CHUNK_SIZE])
+        update_cols = {c: stmt.excluded[c] for c in rows[0] if c not in key}
+        if update_cols:
+            stmt = stmt.on_conflict_do_update(index_elements=list(key), set_=update_cols)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(key))
+        db.execute(stmt)
 
 
-def upsert_cps_zone(db: Session, inp: CPSZoneIn):
-    return upsert(db, CPSZone, {"zone_id": inp.zone_id}, inp.model_dump())
+def upsert_cps_zones(db: Session, zones: list[CPSZoneIn]) -> None:
+    bulk_upsert(db, CPSZone, [z.model_dump() for z in zones], ("zone_id",))
 
-def upsert_product(db: Session, inp: ProductIn):
-    return upsert(db, Product, {"product_type": inp.product_type}, inp.model_dump())
+def upsert_products(db: Session, product_types) -> dict[str, int]:
+    """Ensure the product types exist; returns product_type -> product_id."""
+    product_types = {str(p).lower() for p in product_types}
+    bulk_upsert(db, Product, [{"product_type": p} for p in product_types], ("product_type",))
+    rows = db.query(Product.product_type, Product.product_id).all()
+    return {product_type.value: product_id for product_type, product_id in rows}
 
-def upsert_period(db: Session, inp: PeriodIn):
-    return upsert(db, Period, {"period_id": inp.period_id}, inp.model_dump())
+def upsert_periods(db: Session, periods: list[PeriodIn]) -> None:
+    bulk_upsert(db, Period, [p.model_dump() for p in periods], ("period_id",))
 
-def upsert_growing_season(db: Session, inp: GrowingSeasonIn):
-    return upsert(db, GrowingSeason, {"season_id": inp.season_id}, inp.model_dump())
+def upsert_growing_seasons(db: Session, seasons: list[GrowingSeasonIn]) -> None:
+    bulk_upsert(db, GrowingSeason, [s.model_dump() for s in seasons], ("season_id",))
 
-def upsert_trigger(db: Session, inp: TriggerExitPointIn):
-    data = inp.model_dump()
-    unique = {
-        "zone_id": data["zone_id"],
-        "product_id": data["product_id"],
-        "fiscal_year": data["fiscal_year"],
-        "period_id": data["period_id"],
-        "growing_season_id": data["growing_season_id"]
-    }
-    return upsert(db, TriggerExitPoint, unique, data)
+def upsert_triggers(db: Session, triggers: list[TriggerExitPointIn]) -> tuple[int, int]:
+    """Upsert trigger/exit rows; returns (created, updated) counts."""
+    rows = [t.model_dump() for t in triggers]
+    keys = {tuple(row[k] for k in TRIGGER_KEY) for row in rows}
+    existing = 0
+    key_cols = tuple_(*(getattr(TriggerExitPoint, k) for k in TRIGGER_KEY))
+    key_list = list(keys)
+    for start in range(0, len(key_list), CHUNK_SIZE):
+        existing += db.query(TriggerExitPoint.teid).filter(key_cols.in_(key_list[start:start + CHUNK_SIZE])).count()
+    bulk_upsert(db, TriggerExitPoint, rows, TRIGGER_KEY)
+    return len(keys) - existing, existing
 
-def upsert_ndvi(db: Session, inp: NDVICropIn):
-    data = inp.model_dump()
-    unique = {
-        "zone_id": data["zone_id"],
-        "fiscal_year": data["fiscal_year"],
-        "period_id": data["period_id"],
-        "growing_season_id": data["growing_season_id"]
-    }
-    return upsert(db, NDVICrop, unique, data)
+def upsert_ndvi(db: Session, values: list[NDVICropIn]) -> None:
+    bulk_upsert(db, NDVICrop, [v.model_dump() for v in values], NDVI_KEY)
@@ -0,0 +1,86 @@
+# src/database/crud/premium_quote.py
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from src.database.models.product import ProductConfig as Product
+from src.database.models.excel_ingest import TriggerExitPoint
+from src.database.crud.product_crud import DEFAULT_TRIGGER, DEFAULT_EXIT
+
+
+def premium_rates(prod: Product) -> dict:
+    """Product-level rates; identical for every zone/period/season quoted against the product."""
+    elc = prod.elc or 0.0
+    load = prod.load or 0.0
+    discount = prod.discount or 0.0
+    commission_rate = prod.commission_rate or 0.0
+
+    premium_rate = elc + load - discount
+    commission = premium_rate * (commission_rate / 100)
+    return {
+        "premium": premium_rate + commission,
+        "premium_rate": premium_rate,
+        "commission": commission,
+        "commission_rate": commission_rate,
+        "elc": elc,
+        "load": load,
+        "discount": discount,
+    }
+
+
+def trigger_exit_points(db: Session, product_id: int, fiscal_year: int, zone_ids, period_ids, season_ids):
+    """
+    Trigger and exit point for each (zone, period, season) input, from one query over the
+    matching TriggerExitPoint rows. Inputs without a row get the product defaults.
+    """
+    query_keys = np.column_stack([zone_ids, period_ids, season_ids]).astype(np.int64)
+    rows = (
+        db.query(
+            TriggerExitPoint.zone_id, TriggerExitPoint.period_id, TriggerExitPoint.growing_season_id,
+            TriggerExitPoint.trigger_point, TriggerExitPoint.exit_point,
+        )
+        .filter(
+            TriggerExitPoint.product_id == product_id,
+            TriggerExitPoint.fiscal_year == fiscal_year,
+            TriggerExitPoint.zone_id.in_(np.unique(query_keys[:, 0]).tolist()),
+            TriggerExitPoint.period_id.in_(np.unique(query_keys[:, 1]).tolist()),
+            TriggerExitPoint.growing_season_id.in_(np.unique(query_keys[:, 2]).tolist()),
+        )
+        .order_by(TriggerExitPoint.teid)
+        .all()
+    )
+
+    trigger = np.full(len(query_keys), DEFAULT_TRIGGER)
+    exit_ = np.full(len(query_keys), DEFAULT_EXIT)
+    if not rows:
+        return trigger, exit_
+
+    table = np.array(rows, dtype=object)
+    table_keys = table[:, :3].astype(np.int64)
+    # Label every distinct key once, then map each input to the table row with the same label
+    _, labels = np.unique(np.vstack([table_keys, query_keys]), axis=0, return_inverse=True)
+    labels = labels.ravel()
+    row_for_label = np.full(labels.max() + 1, -1)
+    row_for_label[labels[:len(table_keys)]] = np.arange(len(table_keys))
+    matched = row_for_label[labels[len(table_keys):]]
+    found = matched >= 0
+
+    table_trigger = np.array([DEFAULT_TRIGGER if v is None else v for v in table[:, 3]], dtype=float)
+    table_exit = np.array([DEFAULT_EXIT if v is None else v for v in table[:, 4]], dtype=float)
+    trigger[found] = table_trigger[matched[found]]
+    exit_[found] = table_exit[matched[found]]
+    return trigger, exit_
+
+
+def quote_premiums(db: Session, prod: Product, fiscal_year: int, zone_ids, period_ids, season_ids, sum_insured) -> dict:
+    """Price many inputs against one product; per-row results are returned as columns."""
+    rates = premium_rates(prod)
+    trigger, exit_ = trigger_exit_points(db, prod.id, fiscal_year, zone_ids, period_ids, season_ids)
+    sum_insured = np.asarray(sum_insured, dtype=float)
+    return {
+        **rates,
+        "trigger": trigger,
+        "exit": exit_,
+        "premium_amount": sum_insured * rates["premium"] / 100,
+        "commission_amount": sum_insured * rates["commission"] / 100,
+    }
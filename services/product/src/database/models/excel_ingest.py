@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, Integer, String, Date, ForeignKey, Float, Enum as SQLEnum
+    Column, Integer, String, Date, ForeignKey, Float, Enum as SQLEnum, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 from src.database.db import Base
@@ -65,6 +65,11 @@ class NDVICrop(Base):
     period_id         = Column(Integer, ForeignKey("period.period_id"), nullable=False)
     index_value       = Column(Float, nullable=False)
 
+    __table_args__ = (
+        # Conflict target for the Excel ingest upsert
+        UniqueConstraint("zone_id", "fiscal_year", "period_id", "growing_season_id", name="uq_ndvi_crop_key"),
+    )
+
     zone           = relationship("CPSZone", back_populates="ndvi_data")
     period         = relationship("Period", back_populates="ndvi_data")
     growing_season = relationship("GrowingSeason", back_populates="ndvi_data")
@@ -84,6 +89,14 @@ class TriggerExitPoint(Base):
     exit_percentile    = Column(Integer, nullable=False)
     elc                = Column(Float, nullable=True)
 
+    __table_args__ = (
+        # Conflict target for the Excel ingest upsert
+        UniqueConstraint(
+            "zone_id", "product_id", "fiscal_year", "period_id", "growing_season_id",
+            name="uq_trigger_exit_points_key",
+        ),
+    )
+
     zone           = relationship("CPSZone", back_populates="triggers")
     product        = relationship("Product", back_populates="triggers")
     period         = relationship("Period", back_populates="triggers")
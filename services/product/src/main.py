@@ -1,4 +1,5 @@
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
+from service_auth import require_auth
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
@@ -20,7 +21,7 @@ logger = logging.getLogger(__name__)
 # Create tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Product Configuration Service")
+app = FastAPI(title="Product Configuration Service", dependencies=[Depends(require_auth)])
 
 # Enable CORS
 app.add_middleware(
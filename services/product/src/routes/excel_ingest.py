@@ -11,8 +11,8 @@ from sqlalchemy.orm import Session
 
 from src.database.db import get_db, SessionLocal
 from src.database.crud.excel_ingest import (
-    upsert_cps_zone, upsert_product, upsert_period,
-    upsert_growing_season, upsert_trigger, upsert_ndvi
+    upsert_cps_zones, upsert_products, upsert_periods,
+    upsert_growing_seasons, upsert_triggers, upsert_ndvi
 )
 from src.schemas.excel_ingest import (
     CPSZoneIn, ProductIn, PeriodIn, GrowingSeasonIn,
@@ -52,20 +52,19 @@ def upload_excel(
         raise HTTPException(
             status.HTTP_422_UNPROCESSABLE_ENTITY, "Missing sheet: CPS_ZONE_DATA"
         )
-    for r in df_z.itertuples(index=False):
-        upsert_cps_zone(db, CPSZoneIn(zone_id=int(r.ID), zone_name=r.NAME))
-    db.commit()
+    upsert_cps_zones(db, [
+        CPSZoneIn(zone_id=int(r.ID), zone_name=r.NAME) for r in df_z.itertuples(index=False)
+    ])
 
-    # 3) PRODUCT (from sheets)
+    # 3) PRODUCT (from sheets), resolved once to product_type -> product_id
     product_set = set()
     for sheet in ("TRIGGER_EXIT_ELC", "GROWING_SEASON_DATA"):
         if sheet in xls.sheet_names:
             df = xls.parse(sheet)
             if "PRODUCT" in df.columns:
-                product_set.update(df["PRODUCT"].astype(str).unique())
-    for p in product_set:
-        prod_obj, _ = upsert_product(db, ProductIn(product_type=p))
-    db.commit()
+                product_set.update(ProductIn(product_type=p).product_type.value
+                                   for p in df["PRODUCT"].astype(str).unique())
+    product_ids = upsert_products(db, product_set)
 
     # 4) PERIOD_DATA
     try:
@@ -74,14 +73,15 @@ def upload_excel(
         raise HTTPException(
             status.HTTP_422_UNPROCESSABLE_ENTITY, "Missing sheet: PERIOD_DATA"
         )
-    for r in df_p.itertuples(index=False):
-        upsert_period(db, PeriodIn(
+    upsert_periods(db, [
+        PeriodIn(
             period_id=int(r.ID),
             period_name=r.PERIOD_NAME,
             date_from=r.DATE_FROM,
             date_to=r.DATE_TO,
-        ))
-    db.commit()
+        )
+        for r in df_p.itertuples(index=False)
+    ])
 
     # 5) GROWING_SEASON_DATA
     try:
@@ -90,18 +90,18 @@ def upload_excel(
         raise HTTPException(
             status.HTTP_422_UNPROCESSABLE_ENTITY, "Missing sheet: GROWING_SEASON_DATA"
         )
-    for r in df_gs.itertuples(index=False):
-        prod_obj, _ = upsert_product(db, ProductIn(product_type=r.PRODUCT))
-        upsert_growing_season(db, GrowingSeasonIn(
+    upsert_growing_seasons(db, [
+        GrowingSeasonIn(
             season_id=int(r.ID),
             season_type=r.SEASON_TYPE,
             length=int(r.LENGTH),
             date_from=r.DATE_FROM,
             date_to=r.DATE_TO,
             zone_id=int(r.CPS_ZONE_ID),
-            product_id=prod_obj.product_id,
-        ))
-    db.commit()
+            product_id=product_ids[str(r.PRODUCT).lower()],
+        )
+        for r in df_gs.itertuples(index=False)
+    ])
 
     # 6) TRIGGER_EXIT_ELC
     try:
@@ -110,12 +110,10 @@ def upload_excel(
         raise HTTPException(
             status.HTTP_422_UNPROCESSABLE_ENTITY, "Missing sheet: TRIGGER_EXIT_ELC"
         )
-    created, updated = 0, 0
-    for r in df_te.itertuples(index=False):
-        prod_obj, _ = upsert_product(db, ProductIn(product_type=r.PRODUCT))
-        _, was_created = upsert_trigger(db, TriggerExitPointIn(
+    created, updated = upsert_triggers(db, [
+        TriggerExitPointIn(
             zone_id=int(r.CPS_ZONE_ID),
-            product_id=prod_obj.product_id,
+            product_id=product_ids[str(r.PRODUCT).lower()],
             fiscal_year=int(r.FISCAL_YEAR),
             period_id=int(r.PERIOD_ID),
             growing_season_id=growing_season_id,
@@ -124,11 +122,10 @@ def upload_excel(
             trigger_percentile=int(r.TRIGGER_PERCENTILE),
             exit_percentile=int(r.EXIT_PERCENTILE),
             elc=float(r.ELC),
-        ))
-        if was_created:
-            created += 1
-        else:
-            updated += 1
+        )
+        for r in df_te.itertuples(index=False)
+    ])
+    # The workbook's reference data lands in one transaction
     db.commit()
 
     # 7) NDVI_DATA (background)
@@ -175,29 +172,33 @@ def _process_ndvi(
             return
 
         if has_zone:
-            for rec in records:
-                zid = int(rec["CPS_ZONE_ID"])
-                for idx, col in enumerate(cols, start=19):
-                    upsert_ndvi(db, NDVICropIn(
-                        zone_id=zid,
-                        fiscal_year=2020,
-                        growing_season_id=season_id,
-                        period_id=idx,
-                        index_value=float(rec[col])
-                    ))
+            values = [
+                NDVICropIn(
+                    zone_id=int(rec["CPS_ZONE_ID"]),
+                    fiscal_year=2020,
+                    growing_season_id=season_id,
+                    period_id=idx,
+                    index_value=float(rec[col])
+                )
+                for rec in records
+                for idx, col in enumerate(cols, start=19)
+            ]
         else:
             all_vals = {col: [float(r[col]) for r in records] for col in cols}
             avg = {col: sum(vals)/len(vals) for col, vals in all_vals.items()}
-            zones = [z.zone_id for z in db.query(CPSZone).all()]
-            for zid in zones:
-                for idx, col in enumerate(cols, start=19):
-                    upsert_ndvi(db, NDVICropIn(
-                        zone_id=zid,
-                        fiscal_year=2020,
-                        growing_season_id=season_id,
-                        period_id=idx,
-                        index_value=avg[col]
-                    ))
+            zones = [zid for (zid,) in db.query(CPSZone.zone_id).all()]
+            values = [
+                NDVICropIn(
+                    zone_id=zid,
+                    fiscal_year=2020,
+                    growing_season_id=season_id,
+                    period_id=idx,
+                    index_value=avg[col]
+                )
+                for zid in zones
+                for idx, col in enumerate(cols, start=19)
+            ]
+        upsert_ndvi(db, values)
 
         db.commit()
         logger.info("NDVI background task completed successfully.")
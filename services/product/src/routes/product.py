@@ -10,12 +10,14 @@ from src.database.crud.product_crud import (
     update_product,
     get_products_by_company
 )
-from src.database.models.excel_ingest import TriggerExitPoint
+from src.database.crud.premium_quote import premium_rates, trigger_exit_points, quote_premiums
 from src.schemas.product_schema import (
     ProductCreate,
     ProductUpdate,
     ProductResponse,
     PremiumCalculation,
+    PremiumQuoteBatchRequest,
+    PremiumQuoteBatchResponse,
 )
 from src.schemas.excel_ingest import ProductType
 
@@ -106,44 +108,55 @@ def calculate_premium(
         logger.warning("Product not found")
         raise HTTPException(404, "Product not found")
 
-    record = (
-        db.query(TriggerExitPoint)
-        .filter(
-            TriggerExitPoint.zone_id == zone_id,
-            TriggerExitPoint.product_id == product_id,
-            TriggerExitPoint.fiscal_year == fiscal_year,
-            TriggerExitPoint.period_id == period_id,
-            TriggerExitPoint.growing_season_id == growing_season_id,
-        )
-        .order_by(TriggerExitPoint.fiscal_year.desc())
-        .first()
-    )
-
-    trigger = record.trigger_point if record and record.trigger_point is not None else 15.0
-    exit_ = record.exit_point if record and record.exit_point is not None else 5.0
+    trigger, exit_ = trigger_exit_points(db, product_id, fiscal_year, [zone_id], [period_id], [growing_season_id])
+    rates = premium_rates(prod)
 
-    elc = prod.elc or 0.0
-    load = prod.load or 0.0
-    discount = prod.discount or 0.0
-    commission_rate = prod.commission_rate or 0.0
+    logger.info(
+        f"ELC: {rates['elc']}, Load: {rates['load']}, Discount: {rates['discount']}, "
+        f"Commission Rate: {rates['commission_rate']}"
+    )
+    logger.info(f"Premium rate: {rates['premium_rate']}")
+    logger.info(f"Commission amount: {rates['commission']}")
+    logger.info(f"Final premium: {rates['premium']}")
 
-    logger.info(f"ELC: {elc}, Load: {load}, Discount: {discount}, Commission Rate: {commission_rate}")
+    return PremiumCalculation(
+        premium=rates["premium"],
+        premium_rate=rates["premium_rate"],
+        commission=rates["commission"],
+        elc=rates["elc"],
+        load=rates["load"],
+        discount=rates["discount"],
+        trigger=trigger[0],
+        exit=exit_[0],
+    )
 
-    premium_rate = elc + load - discount
-    commission_amt = premium_rate * (commission_rate / 100)
-    final_premium = premium_rate + commission_amt
 
-    logger.info(f"Premium rate: {premium_rate}")
-    logger.info(f"Commission amount: {commission_amt}")
-    logger.info(f"Final premium: {final_premium}")
+@router.post("/{product_id}/quote-premiums", response_model=PremiumQuoteBatchResponse)
+def quote_premiums_route(
+    product_id: int,
+    payload: PremiumQuoteBatchRequest,
+    db: Session = Depends(db.get_db),
+):
+    """Quote many (zone, period, season, sum insured) inputs in one call, e.g. a whole village."""
+    prod = get_product(db, product_id)
+    if not prod:
+        raise HTTPException(404, "Product not found")
 
-    return PremiumCalculation(
-        premium=final_premium,
-        premium_rate=premium_rate,
-        commission=commission_amt,
-        elc=elc,
-        load=load,
-        discount=discount,
-        trigger=trigger,
-        exit=exit_,
+    quote = quote_premiums(
+        db, prod, payload.fiscal_year,
+        payload.zone_ids, payload.period_ids, payload.growing_season_ids, payload.sum_insured,
+    )
+    logger.info(f"Quoted {len(payload.zone_ids)} inputs for Product ID: {product_id}")
+    return PremiumQuoteBatchResponse(
+        product_id=product_id,
+        premium=quote["premium"],
+        premium_rate=quote["premium_rate"],
+        commission_rate=quote["commission_rate"],
+        elc=quote["elc"],
+        load=quote["load"],
+        discount=quote["discount"],
+        trigger=quote["trigger"].tolist(),
+        exit=quote["exit"].tolist(),
+        premium_amount=quote["premium_amount"].tolist(),
+        commission_amount=quote["commission_amount"].tolist(),
     )
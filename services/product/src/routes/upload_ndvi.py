@@ -3,6 +3,7 @@ from fastapi import APIRouter
 import pandas as pd
 import re
 import httpx
+from service_auth import service_headers
 from src.core.config import settings
 
 # Base URL for the claim service
@@ -67,7 +68,7 @@ async def upload_ndvi(
     # 5. Forward to claim service
     payload = {"ndvi_data": cps_data, "period": period}
     url = f"{CLAIM_SERVICE_BASE_URL}/claims/{ndvi_type}"
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    async with httpx.AsyncClient(timeout=timeout, headers=service_headers()) as client:
         resp = await client.post(url, json=payload)
     if resp.status_code not in {200, 201, 204}:
         raise HTTPException(resp.status_code, f"Claim service error: {resp.text}")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import Optional
 
 from src.schemas.excel_ingest import ProductType
@@ -49,4 +49,35 @@ class PremiumCalculation(BaseModel):
     load: float                 # Load adjustment set by IC
     discount: float             # Discount adjustment set by IC
     trigger: float              # NDVI-based trigger point (for info only)
-    exit: float 
+    exit: float
+
+# Batch quoting: one row per (zone, period, season, sum insured) input, sent and returned as columns
+class PremiumQuoteBatchRequest(BaseModel):
+    fiscal_year: int
+    zone_ids: list[int] = Field(..., min_length=1, max_length=20000)
+    period_ids: list[int]
+    growing_season_ids: list[int]
+    sum_insured: list[float]
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        n = len(self.zone_ids)
+        if not (len(self.period_ids) == len(self.growing_season_ids) == len(self.sum_insured) == n):
+            raise ValueError("zone_ids, period_ids, growing_season_ids and sum_insured must have the same length")
+        return self
+
+class PremiumQuoteBatchResponse(BaseModel):
+    product_id: int
+    # Product-level rates, shared by every row (same meaning as PremiumCalculation)
+    premium: float
+    premium_rate: float
+    commission_rate: float
+    elc: float
+    load: float
+    discount: float
+    # Per-row columns, aligned with the request arrays
+    trigger: list[float]
+    exit: list[float]
+    premium_amount: list[float]     # sum_insured × premium / 100
+    commission_amount: list[float]  # sum_insured × commission / 100
+
@@ -125,3 +125,38 @@ def test_upload_excel_creates_expected_rows(client: TestClient):
     finally:
         db.close()
         db_gen.close()
+
+
+def test_upload_excel_is_set_based_and_idempotent(client: TestClient):
+    from sqlalchemy import event
+    from src.main import app
+
+    sessions = app.dependency_overrides[get_db]()
+    db = next(sessions)
+    engine = db.get_bind()
+    files = {"file": ("test.xlsx", create_test_excel_bytes(), "application/octet-stream")}
+
+    statements = []
+    count = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        first = client.post("/api/excel/upload_excel?growing_season_id=1", files=files)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert first.status_code == 202, first.text
+    # One statement per sheet plus the product lookup and trigger existence check
+    assert len(statements) <= 8, statements
+
+    files = {"file": ("test.xlsx", create_test_excel_bytes(), "application/octet-stream")}
+    second = IngestSummary(**client.post("/api/excel/upload_excel?growing_season_id=1", files=files).json())
+    assert (second.triggers_created, second.triggers_updated) == (0, 1)
+
+    try:
+        assert db.query(CPSZone).count() == 1
+        assert db.query(Product).count() == 1
+        assert db.query(Period).count() == 2
+        assert db.query(GrowingSeason).one().product_id == db.query(Product).one().product_id
+        trigger = db.query(TriggerExitPoint).one()
+        assert (trigger.trigger_point, trigger.elc) == (10, 0.7)
+    finally:
+        sessions.close()
@@ -87,3 +87,56 @@ class TestProductAPI:
     def test_calculate_premium_not_found(self, client: TestClient):
         resp = client.post("/api/products/99999/calculate-premium")
         assert resp.status_code == 404, resp.text
+
+    def test_quote_premiums_batch(self, client: TestClient):
+        from src.database.db import get_db
+        from src.database.models.excel_ingest import TriggerExitPoint
+        from src.main import app
+
+        create = client.post("/api/products", json={
+            "company_id": 4, "name": "Village Quote Product", "type": "crop",
+            "elc": 8.0, "load": 2.0, "discount": 1.0, "commission_rate": 10.0,
+        })
+        assert create.status_code == 200, create.text
+        pid = create.json()["id"]
+
+        sessions = app.dependency_overrides[get_db]()
+        db = next(sessions)
+        db.add_all([
+            TriggerExitPoint(zone_id=1, product_id=pid, fiscal_year=2025, period_id=1, growing_season_id=1,
+                             trigger_point=20, exit_point=4, trigger_percentile=80, exit_percentile=20),
+            TriggerExitPoint(zone_id=2, product_id=pid, fiscal_year=2025, period_id=3, growing_season_id=1,
+                             trigger_point=30, exit_point=7, trigger_percentile=80, exit_percentile=20),
+            TriggerExitPoint(zone_id=2, product_id=pid, fiscal_year=2024, period_id=3, growing_season_id=1,
+                             trigger_point=99, exit_point=99, trigger_percentile=80, exit_percentile=20),
+        ])
+        db.commit()
+        sessions.close()
+
+        resp = client.post(f"/api/products/{pid}/quote-premiums", json={
+            "fiscal_year": 2025,
+            "zone_ids": [2, 1, 9, 1],
+            "period_ids": [3, 1, 1, 1],
+            "growing_season_ids": [1, 1, 1, 1],
+            "sum_insured": [1000, 500, 100, 0],
+        })
+        assert resp.status_code == 200, resp.text
+        out = resp.json()
+        # premium rate = 8 + 2 - 1 = 9, commission = 9 × 10% = 0.9
+        assert out["premium"] == pytest.approx(9.9)
+        assert out["trigger"] == [30, 20, 15, 20]
+        assert out["exit"] == [7, 4, 5, 4]
+        assert out["premium_amount"] == pytest.approx([99.0, 49.5, 9.9, 0.0])
+        assert out["commission_amount"] == pytest.approx([9.0, 4.5, 0.9, 0.0])
+
+        single = client.post(f"/api/products/{pid}/calculate-premium", params={
+            "zone_id": 2, "fiscal_year": 2025, "period_id": 3, "growing_season_id": 1,
+        }).json()
+        assert (single["premium"], single["trigger"], single["exit"]) == (pytest.approx(9.9), 30, 7)
+
+    def test_quote_premiums_rejects_ragged_columns(self, client: TestClient):
+        resp = client.post("/api/products/1/quote-premiums", json={
+            "fiscal_year": 2025, "zone_ids": [1, 2], "period_ids": [1],
+            "growing_season_ids": [1, 1], "sum_insured": [1, 1],
+        })
+        assert resp.status_code == 422
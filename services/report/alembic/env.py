@@ -21,6 +21,7 @@ fileConfig(config.config_file_name)
 
 # Import your Base metadata so Alembic can auto-generate migrations.
 from src.database.db import Base
+import src.database.models.report  # noqa: F401  (registers the report tables)
 
 target_metadata = Base.metadata
 
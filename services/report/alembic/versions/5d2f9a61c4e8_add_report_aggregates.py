@@ -0,0 +1,59 @@
+"""Add incremental report aggregates
+
+Revision ID: 5d2f9a61c4e8
+Revises: cb8054b7e2a7
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f9a61c4e8'
+down_revision: Union[str, None] = 'cb8054b7e2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'report_state',
+        sa.Column('kind', sa.String(length=32), nullable=False),
+        sa.Column('watermark', sa.String(length=64), nullable=True),
+        sa.Column('data_version', sa.Integer(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('kind'),
+    )
+    op.create_table(
+        'report_daily_aggregate',
+        sa.Column('kind', sa.String(length=32), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('total', sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'day'),
+    )
+    op.create_table(
+        'report_source_row',
+        sa.Column('kind', sa.String(length=32), nullable=False),
+        sa.Column('source_id', sa.String(length=64), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('value', sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'source_id'),
+    )
+    # One state row per kind up front, so refreshes can lock it instead of racing to create it
+    op.bulk_insert(
+        sa.table('report_state', sa.column('kind', sa.String), sa.column('data_version', sa.Integer)),
+        [{'kind': kind, 'data_version': 0} for kind in ('sales', 'claims', 'commissions')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('report_source_row')
+    op.drop_table('report_daily_aggregate')
+    op.drop_table('report_state')
@@ -7,6 +7,12 @@ class Settings(BaseSettings):
     CLAIM_SERVICE_URL: str
     COMMISSION_SERVICE_URL: str
     API_V1_STR: str = "/api/v1"
+    # Upstream feeds are polled at most this often per report kind; requests in between use the stored aggregates
+    REPORT_REFRESH_SECONDS: float = 60
+    # Rendered PDF/CSV outputs kept in memory, keyed by (kind, format, data version)
+    REPORT_RENDER_CACHE_SIZE: int = 32
+    # Aggregate rows read per query when streaming a CSV export
+    REPORT_STREAM_PAGE_SIZE: int = 1000
     model_config = ConfigDict(from_attributes=True)
 
 settings = Settings()
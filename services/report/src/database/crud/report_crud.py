@@ -1,39 +1,252 @@
-from httpx import AsyncClient
-from src.core.config import settings
+import asyncio
+import logging
+from collections import defaultdict
 from datetime import datetime
+from decimal import Decimal
+from typing import NamedTuple
+
+import httpx
+from service_auth import service_headers
+from src.core.config import settings
+from src.database.db import SessionLocal
+from src.database.models.report import ReportState, ReportDailyAggregate, ReportSourceRow
+
+logger = logging.getLogger(__name__)
+
+# Timeout configuration for HTTP calls
+timeout = httpx.Timeout(connect=5.0, read=60.0, write=5.0, pool=5.0)
+
+CENT = Decimal("0.01")
+# Bound on the IN (...) list when looking up previously seen rows
+LOOKUP_CHUNK_SIZE = 1000
+
+
+class ReportKind(NamedTuple):
+    title: str
+    base_url: str
+    path: str
+    id_key: str
+    date_key: str
+    value_key: str
+    # Field that moves forward whenever an upstream row is written (e.g. updated_at or a
+    # sequence number). With one, refreshes ask only for rows past the watermark; without
+    # one, every refresh fetches the full list and rows no longer present are dropped.
+    change_key: str | None = None
+
+
+# None of the upstream list endpoints expose a change key yet, so all kinds refresh from a
+# full snapshot. The business date (created_at, calculated_at, period) cannot serve as one:
+# an edited amount keeps its date and would never be sent again.
+REPORT_KINDS = {
+    "sales": ReportKind("Sales Report", settings.POLICY_SERVICE_URL, "/policies", "policy_id", "created_at", "sum_insured"),
+    "claims": ReportKind("Claims Report", settings.CLAIM_SERVICE_URL, "/claims", "id", "calculated_at", "claim_amount"),
+    "commissions": ReportKind("Commission Report", settings.COMMISSION_SERVICE_URL, "/commissions", "id", "period", "net_commission"),
+}
+
+_client: httpx.AsyncClient | None = None
+_refresh_locks: dict[str, asyncio.Lock] = {}
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=timeout, headers=service_headers())
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 class ReportService:
-    def __init__(self):
-        self.client = AsyncClient()
-    
-    async def _fetch(self, url: str):
-        resp = await self.client.get(url)
+    """
+    Keeps daily aggregates per report kind up to date from the upstream services.
+    Each refresh compares the fetched rows with each row's previous contribution and
+    applies only the difference (asking for rows past the watermark when the kind has a
+    change key), and bumps the kind's data version when anything moved, so rendered
+    outputs can be cached against it.
+    """
+
+    def __init__(self, session_factory=SessionLocal, client: httpx.AsyncClient | None = None):
+        self.session_factory = session_factory
+        self.client = client
+
+    async def _fetch(self, url: str, params: dict | None = None):
+        resp = await (self.client or get_client()).get(url, params=params)
         resp.raise_for_status()
         return resp.json()
-    
-    async def _aggregate(self, data: list[dict], key_date: str, key_value: str):
-        # group by date
-        agg = {}
-        for item in data:
-            d = datetime.fromisoformat(item[key_date]).date()
-            agg[d] = agg.get(d, 0) + float(item[key_value])
-        rows = [{"date": d, "total": total} for d, total in sorted(agg.items())]
-        grand = sum(r["total"] for r in rows)
-        return rows, grand
-        
-    async def get_report(self, kind: str):
-        if kind == "sales":
-            data = await self._fetch(f"{settings.POLICY_SERVICE_URL}{settings.API_V1_STR}/policies")
-            rows, grand = await self._aggregate(data, "created_at", "sum_insured")
-            title = "Sales Report"
-        elif kind == "claims":
-            data = await self._fetch(f"{settings.CLAIM_SERVICE_URL}{settings.API_V1_STR}/claims")
-            rows, grand = await self._aggregate(data, "calculated_at", "claim_amount")
-            title = "Claims Report"
-        elif kind == "commissions":
-            data = await self._fetch(f"{settings.COMMISSION_SERVICE_URL}{settings.API_V1_STR}/commissions")
-            rows, grand = await self._aggregate(data, "period", "net_commission")
-            title = "Commission Report"
-        else:
+
+    def _state(self, db, kind: str, lock: bool = False) -> ReportState:
+        query = db.query(ReportState).filter(ReportState.kind == kind)
+        if lock:
+            query = query.with_for_update()
+        state = query.one_or_none()
+        if state is None:
+            state = ReportState(kind=kind, data_version=0)
+            db.add(state)
+        return state
+
+    def _read_state(self, kind: str) -> tuple[str | None, datetime | None, int]:
+        db = self.session_factory()
+        try:
+            state = self._state(db, kind)
+            return state.watermark, state.refreshed_at, state.data_version or 0
+        finally:
+            db.close()
+
+    def _apply(self, kind: str, spec: ReportKind, items: list[dict]) -> int:
+        """Fold fetched rows into the aggregates in one transaction. Returns the data version."""
+        incoming = {}
+        watermark = None
+        for item in items:
+            incoming[str(item[spec.id_key])] = (
+                datetime.fromisoformat(str(item[spec.date_key])).date(),
+                Decimal(str(item[spec.value_key])).quantize(CENT),
+            )
+            if spec.change_key:
+                changed = str(item[spec.change_key])
+                watermark = max(watermark or changed, changed)
+        full_snapshot = spec.change_key is None
+
+        db = self.session_factory()
+        try:
+            # Serializes concurrent refreshes of the same kind across workers
+            state = self._state(db, kind, lock=True)
+            existing = {}
+            if full_snapshot:
+                for row in db.query(ReportSourceRow).filter(ReportSourceRow.kind == kind):
+                    existing[row.source_id] = row
+            else:
+                source_ids = list(incoming)
+                for start in range(0, len(source_ids), LOOKUP_CHUNK_SIZE):
+                    chunk = source_ids[start:start + LOOKUP_CHUNK_SIZE]
+                    for row in db.query(ReportSourceRow).filter(
+                        ReportSourceRow.kind == kind, ReportSourceRow.source_id.in_(chunk)
+                    ):
+                        existing[row.source_id] = row
+
+            deltas = defaultdict(lambda: [Decimal(0), 0])
+            for source_id, (day, value) in incoming.items():
+                previous = existing.get(source_id)
+                if previous is None:
+                    db.add(ReportSourceRow(kind=kind, source_id=source_id, day=day, value=value))
+                elif (previous.day, previous.value) == (day, value):
+                    continue
+                else:
+                    deltas[previous.day][0] -= previous.value
+                    deltas[previous.day][1] -= 1
+                    previous.day, previous.value = day, value
+                deltas[day][0] += value
+                deltas[day][1] += 1
+            if full_snapshot:
+                # A full list that no longer has a row means it was deleted upstream
+                for source_id in existing.keys() - incoming.keys():
+                    previous = existing[source_id]
+                    deltas[previous.day][0] -= previous.value
+                    deltas[previous.day][1] -= 1
+                    db.delete(previous)
+
+            deltas = {day: delta for day, delta in deltas.items() if delta != [0, 0]}
+            if deltas:
+                aggregates = {
+                    row.day: row for row in db.query(ReportDailyAggregate).filter(
+                        ReportDailyAggregate.kind == kind, ReportDailyAggregate.day.in_(list(deltas))
+                    )
+                }
+                for day, (total, count) in deltas.items():
+                    aggregate = aggregates.get(day)
+                    if aggregate is None:
+                        aggregate = ReportDailyAggregate(kind=kind, day=day, total=0, row_count=0)
+                        db.add(aggregate)
+                    aggregate.total += total
+                    aggregate.row_count += count
+                    if aggregate.row_count <= 0:
+                        if day in aggregates:
+                            db.delete(aggregate)
+                        else:
+                            db.expunge(aggregate)
+                state.data_version = (state.data_version or 0) + 1
+
+            if watermark is not None and (state.watermark is None or watermark > state.watermark):
+                state.watermark = watermark
+            state.refreshed_at = datetime.utcnow()
+            db.commit()
+            if deltas:
+                logger.info(f"Report {kind}: {len(incoming)} rows fetched, {len(deltas)} days changed, version {state.data_version}")
+            return state.data_version
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _load(self, kind: str, spec: ReportKind) -> dict:
+        db = self.session_factory()
+        try:
+            state = self._state(db, kind)
+            aggregates = (
+                db.query(ReportDailyAggregate)
+                .filter(ReportDailyAggregate.kind == kind)
+                .order_by(ReportDailyAggregate.day)
+                .all()
+            )
+            rows = [{"date": row.day, "total": row.total} for row in aggregates]
+            return {
+                "title": spec.title,
+                "generated_at": state.refreshed_at or datetime.utcnow(),
+                "rows": rows,
+                "grand_total": sum((row["total"] for row in rows), Decimal(0)),
+                "data_version": state.data_version or 0,
+            }
+        finally:
+            db.close()
+
+    def iter_rows(self, kind: str, page_size: int | None = None):
+        """Yield the kind's daily rows in date order, reading one page per query with a short-lived session."""
+        page_size = page_size or settings.REPORT_STREAM_PAGE_SIZE
+        after = None
+        while True:
+            db = self.session_factory()
+            try:
+                query = db.query(ReportDailyAggregate.day, ReportDailyAggregate.total).filter(
+                    ReportDailyAggregate.kind == kind
+                )
+                if after is not None:
+                    query = query.filter(ReportDailyAggregate.day > after)
+                page = query.order_by(ReportDailyAggregate.day).limit(page_size).all()
+            finally:
+                db.close()
+            for day, total in page:
+                yield {"date": day, "total": total}
+            if len(page) < page_size:
+                return
+            after = page[-1].day
+
+    def stream_report(self, kind: str) -> dict:
+        """Like load_report, but `rows` is a lazy iterator and there is no precomputed grand total."""
+        return {"title": REPORT_KINDS[kind].title, "rows": self.iter_rows(kind)}
+
+    async def refresh(self, kind: str) -> int:
+        """Bring the kind's aggregates up to date. Returns its current data version."""
+        spec = REPORT_KINDS.get(kind)
+        if spec is None:
             raise ValueError("Unknown report kind")
-        return {"title": title, "generated_at": datetime.utcnow(), "rows": rows, "grand_total": grand}
+        lock = _refresh_locks.setdefault(kind, asyncio.Lock())
+        async with lock:
+            watermark, refreshed_at, version = await asyncio.to_thread(self._read_state, kind)
+            if refreshed_at is not None and (datetime.utcnow() - refreshed_at).total_seconds() < settings.REPORT_REFRESH_SECONDS:
+                return version
+            params = {"since": watermark} if spec.change_key and watermark else None
+            data = await self._fetch(f"{spec.base_url}{settings.API_V1_STR}{spec.path}", params)
+            return await asyncio.to_thread(self._apply, kind, spec, data)
+
+    async def load_report(self, kind: str) -> dict:
+        """The stored aggregates as a report, without refreshing them."""
+        return await asyncio.to_thread(self._load, kind, REPORT_KINDS[kind])
+
+    async def get_report(self, kind: str):
+        await self.refresh(kind)
+        return await self.load_report(kind)
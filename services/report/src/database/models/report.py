@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Numeric, func
+
+from src.database.db import Base
+
+
+class ReportState(Base):
+    """Per report kind: how far the upstream feed has been consumed and the current data version."""
+    __tablename__ = "report_state"
+
+    kind = Column(String(32), primary_key=True)
+    # Highest change key seen upstream; sent back as `since` on the next refresh
+    watermark = Column(String(64), nullable=True)
+    # Bumped whenever the aggregates change; rendered outputs are cached against it
+    data_version = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, nullable=True)
+
+
+class ReportDailyAggregate(Base):
+    __tablename__ = "report_daily_aggregate"
+
+    kind = Column(String(32), primary_key=True)
+    day = Column(Date, primary_key=True)
+    total = Column(Numeric(18, 2), nullable=False, default=0)
+    row_count = Column(Integer, nullable=False, default=0)
+
+
+class ReportSourceRow(Base):
+    """Last contribution of each upstream row, so a changed row moves its old value out of the aggregate."""
+    __tablename__ = "report_source_row"
+
+    kind = Column(String(32), primary_key=True)
+    source_id = Column(String(64), primary_key=True)
+    day = Column(Date, nullable=False)
+    value = Column(Numeric(18, 2), nullable=False)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
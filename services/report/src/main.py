@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.core.config import settings
+from src.database.crud.report_crud import close_client
 from src.routes.report import router as report_router
 
 app = FastAPI(title="Report Generation API")
@@ -15,6 +16,10 @@ app.include_router(
     tags=["reports"]
 )
 
+@app.on_event("shutdown")
+async def shutdown_report_client():
+    await close_client()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("src.main:app", host="0.0.0.0", port=8001, reload=True)
@@ -1,27 +1,41 @@
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from src.database.crud.report_crud import ReportService
+from src.utils.render_cache import render_cache
 from src.utils.report_generator import generate_pdf, generate_csv
-import asyncio
 from io import BytesIO
 
 router = APIRouter()
 
+
+@router.get("/cache/stats", summary="Rendered report cache statistics")
+def get_render_cache_stats():
+    return render_cache.stats()
+
+
 @router.get("/{kind}", summary="Generate a report")
 async def get_report(
     kind: str,
-    format: str = Query("pdf", regex="^(pdf|csv)$")
+    format: str = Query("pdf", regex="^(pdf|csv)$"),
+    gzip: bool = Query(False, description="Gzip-compress a CSV export (served as .csv.gz)."),
 ):
     service = ReportService()
     try:
-        report = await service.get_report(kind)
+        version = await service.refresh(kind)
     except ValueError:
         raise HTTPException(404, "Report kind not found")
-    if format == "pdf":
-        content = generate_pdf(report)
-        return StreamingResponse(BytesIO(content), media_type="application/pdf",
-                                 headers={"Content-Disposition": f"attachment; filename={kind}.pdf"})
-    else:
-        content = generate_csv(report)
-        return StreamingResponse(BytesIO(content), media_type="text/csv",
-                                 headers={"Content-Disposition": f"attachment; filename={kind}.csv"})
+    if format == "csv":
+        # Streamed straight from the aggregates page by page, so it is not worth caching
+        filename = f"{kind}.csv.gz" if gzip else f"{kind}.csv"
+        return StreamingResponse(generate_csv(service.stream_report(kind), compress=gzip),
+                                 media_type="application/gzip" if gzip else "text/csv",
+                                 headers={"Content-Disposition": f"attachment; filename={filename}"})
+    content = render_cache.get((kind, format, version))
+    if content is None:
+        report = await service.load_report(kind)
+        # PDF layout is CPU-bound; keep it off the event loop
+        content = await run_in_threadpool(generate_pdf, report)
+        render_cache.put((kind, format, report["data_version"]), content)
+    return StreamingResponse(BytesIO(content), media_type="application/pdf",
+                             headers={"Content-Disposition": f"attachment; filename={kind}.pdf"})
@@ -6,6 +6,11 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 import csv
+import zlib
+from decimal import Decimal
+
+# Encoded CSV is flushed to the client in chunks of about this size
+CSV_CHUNK_SIZE = 64 * 1024
 
 def generate_pdf(report: dict) -> bytes:
     buffer = BytesIO()
@@ -26,13 +31,36 @@ def generate_pdf(report: dict) -> bytes:
     doc.build(elems)
     return buffer.getvalue()
 
-def generate_csv(report: dict) -> bytes:
+def generate_csv(report: dict, compress: bool = False):
+    """
+    Yield the report as encoded CSV chunks, gzip-compressed if `compress`.
+    `rows` may be any iterable (e.g. a paged DB cursor); the grand total is
+    summed on the way through so nothing beyond one chunk is held in memory.
+    """
+    # wbits=31 selects the gzip container
+    compressor = zlib.compressobj(wbits=31) if compress else None
     output = StringIO()
     writer = csv.writer(output)
+
+    def drain():
+        data = output.getvalue().encode()
+        output.seek(0)
+        output.truncate()
+        return compressor.compress(data) if compressor else data
+
     writer.writerow([report["title"]])
     writer.writerow(["Date", "Total"])
+    grand = Decimal(0)
     for row in report["rows"]:
         writer.writerow([row["date"].strftime("%Y-%m-%d"), f"{row['total']:.2f}"])
+        grand += Decimal(str(row["total"]))
+        if output.tell() >= CSV_CHUNK_SIZE:
+            chunk = drain()
+            if chunk:
+                yield chunk
     writer.writerow([])
-    writer.writerow(["Grand Total", f"{report['grand_total']:.2f}"])
-    return output.getvalue().encode()
+    writer.writerow(["Grand Total", f"{grand:.2f}"])
+    chunk = drain()
+    if compressor:
+        chunk += compressor.flush()
+    yield chunk
@@ -0,0 +1,47 @@
+import os
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Settings are read at import time
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ["POLICY_SERVICE_URL"] = "http://policy_service:8000"
+os.environ["CLAIM_SERVICE_URL"] = "http://claim_service:8000"
+os.environ["COMMISSION_SERVICE_URL"] = "http://commission_service:8000"
+os.environ["REPORT_REFRESH_SECONDS"] = "0"
+
+from src.database.db import Base  # noqa: E402
+import src.database.models.report  # noqa: E402,F401
+
+
+class StubUpstream:
+    """Serves whatever rows the test sets, and records the query params of each request."""
+
+    def __init__(self):
+        self.rows = []
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(dict(request.url.params))
+        return httpx.Response(200, json=self.rows)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def upstream():
+    return StubUpstream()
+
+
+@pytest.fixture
+def client(upstream):
+    return httpx.AsyncClient(transport=httpx.MockTransport(upstream.handler))
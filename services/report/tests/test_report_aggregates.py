@@ -0,0 +1,113 @@
+import asyncio
+import gzip
+from datetime import date
+from decimal import Decimal
+
+from src.database.crud import report_crud
+from src.database.crud.report_crud import ReportService
+from src.database.models.report import ReportDailyAggregate, ReportSourceRow
+from src.utils.report_generator import generate_csv
+
+
+def claim(claim_id, day, amount, **extra):
+    return {"id": claim_id, "calculated_at": f"{day}T10:00:00", "claim_amount": amount, **extra}
+
+
+def refresh(service, kind="claims"):
+    return asyncio.run(service.refresh(kind))
+
+
+def aggregates(session_factory, kind="claims"):
+    db = session_factory()
+    try:
+        return {
+            row.day: (row.total, row.row_count)
+            for row in db.query(ReportDailyAggregate).filter(ReportDailyAggregate.kind == kind)
+        }
+    finally:
+        db.close()
+
+
+def test_first_refresh_builds_daily_totals(session_factory, client, upstream):
+    upstream.rows = [claim(1, "2025-01-01", 100), claim(2, "2025-01-01", 0.5), claim(3, "2025-01-02", 20)]
+    assert refresh(ReportService(session_factory, client)) == 1
+    assert aggregates(session_factory) == {
+        date(2025, 1, 1): (Decimal("100.50"), 2),
+        date(2025, 1, 2): (Decimal("20.00"), 1),
+    }
+    # No change key for claims: the business date is never sent back as `since`
+    assert upstream.requests == [{}]
+
+
+def test_resending_unchanged_rows_keeps_the_version(session_factory, client, upstream):
+    service = ReportService(session_factory, client)
+    upstream.rows = [claim(1, "2025-01-01", 100), claim(2, "2025-01-02", 20)]
+    assert refresh(service) == 1
+    assert refresh(service) == 1
+    assert aggregates(session_factory) == {
+        date(2025, 1, 1): (Decimal("100.00"), 1),
+        date(2025, 1, 2): (Decimal("20.00"), 1),
+    }
+
+
+def test_changed_row_moves_between_days(session_factory, client, upstream):
+    service = ReportService(session_factory, client)
+    upstream.rows = [claim(1, "2025-01-01", 100), claim(2, "2025-01-01", 5)]
+    refresh(service)
+
+    # Recalculated amount on a later day; the old day keeps only the other claim
+    upstream.rows = [claim(1, "2025-01-03", 70), claim(2, "2025-01-01", 5)]
+    assert refresh(service) == 2
+    assert aggregates(session_factory) == {
+        date(2025, 1, 1): (Decimal("5.00"), 1),
+        date(2025, 1, 3): (Decimal("70.00"), 1),
+    }
+
+
+def test_day_is_dropped_when_its_last_row_leaves(session_factory, client, upstream):
+    service = ReportService(session_factory, client)
+    upstream.rows = [claim(1, "2025-01-01", 100), claim(2, "2025-01-02", 20), claim(3, "2025-01-03", 1)]
+    refresh(service)
+
+    # Claim 1 moves away and claim 2 is deleted upstream
+    upstream.rows = [claim(1, "2025-01-03", 100), claim(3, "2025-01-03", 1)]
+    assert refresh(service) == 2
+    assert aggregates(session_factory) == {date(2025, 1, 3): (Decimal("101.00"), 2)}
+    db = session_factory()
+    assert sorted(row.source_id for row in db.query(ReportSourceRow)) == ["1", "3"]
+    db.close()
+
+
+def test_change_key_limits_the_fetch_to_rows_past_the_watermark(session_factory, client, upstream, monkeypatch):
+    spec = report_crud.REPORT_KINDS["claims"]._replace(change_key="updated_at")
+    monkeypatch.setitem(report_crud.REPORT_KINDS, "claims", spec)
+    service = ReportService(session_factory, client)
+
+    upstream.rows = [
+        claim(1, "2025-01-01", 100, updated_at="2025-02-01T00:00:00"),
+        claim(2, "2025-01-02", 20, updated_at="2025-02-03T00:00:00"),
+    ]
+    refresh(service)
+    # Only the edited claim comes back; claim 2 is not treated as deleted
+    upstream.rows = [claim(1, "2025-01-01", 40, updated_at="2025-02-05T00:00:00")]
+    assert refresh(service) == 2
+
+    assert upstream.requests == [{}, {"since": "2025-02-03T00:00:00"}]
+    assert aggregates(session_factory) == {
+        date(2025, 1, 1): (Decimal("40.00"), 1),
+        date(2025, 1, 2): (Decimal("20.00"), 1),
+    }
+
+
+def test_csv_export_streams_stored_rows(session_factory, client, upstream):
+    service = ReportService(session_factory, client)
+    upstream.rows = [claim(n, f"2025-01-{n:02d}", 1.25) for n in range(1, 11)]
+    refresh(service)
+
+    assert len(list(service.iter_rows("claims", page_size=3))) == 10
+    plain = b"".join(generate_csv(service.stream_report("claims")))
+    compressed = b"".join(generate_csv(service.stream_report("claims"), compress=True))
+    assert gzip.decompress(compressed) == plain
+    lines = plain.decode().splitlines()
+    assert lines[:3] == ["Claims Report", "Date,Total", "2025-01-01,1.25"]
+    assert lines[-1] == "Grand Total,12.50"
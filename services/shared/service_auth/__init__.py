@@ -0,0 +1,24 @@
+from service_auth.config import AuthSettings, auth_settings
+from service_auth.dependencies import (
+    SERVICE_PRINCIPAL,
+    get_principal,
+    require_auth,
+    require_roles,
+    service_headers,
+    token_verifier,
+)
+from service_auth.verifier import InvalidToken, JWTVerifier, Principal
+
+__all__ = [
+    "AuthSettings",
+    "auth_settings",
+    "get_principal",
+    "require_auth",
+    "require_roles",
+    "service_headers",
+    "SERVICE_PRINCIPAL",
+    "token_verifier",
+    "InvalidToken",
+    "JWTVerifier",
+    "Principal",
+]
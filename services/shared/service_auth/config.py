@@ -0,0 +1,37 @@
+import os
+from dataclasses import dataclass, field
+
+
+def _paths(value: str) -> frozenset:
+    return frozenset(path.strip() for path in value.split(",") if path.strip())
+
+
+@dataclass(frozen=True)
+class AuthSettings:
+    enforce: bool = False
+    # No built-in default: without a configured key every token is rejected
+    secret_key: str | None = None
+    public_key_file: str | None = None
+    algorithm: str = "HS256"
+    cache_size: int = 10000
+    public_paths: frozenset = field(default_factory=lambda: _paths("/health,/docs,/openapi.json,/redoc"))
+    # Shared credential the services send on internal calls (see service_headers)
+    service_token: str | None = None
+
+    @classmethod
+    def from_env(cls) -> "AuthSettings":
+        settings = cls(
+            enforce=os.getenv("AUTH_ENFORCE", "false").lower() == "true",
+            secret_key=os.getenv("JWT_SECRET_KEY") or None,
+            public_key_file=os.getenv("JWT_PUBLIC_KEY_FILE") or None,
+            algorithm=os.getenv("JWT_ALGORITHM", "HS256"),
+            cache_size=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000)),
+            public_paths=_paths(os.getenv("AUTH_PUBLIC_PATHS", "/health,/docs,/openapi.json,/redoc")),
+            service_token=os.getenv("SERVICE_AUTH_TOKEN") or None,
+        )
+        if settings.enforce and not (settings.secret_key or settings.public_key_file):
+            raise RuntimeError("AUTH_ENFORCE is on but neither JWT_SECRET_KEY nor JWT_PUBLIC_KEY_FILE is set")
+        return settings
+
+
+auth_settings = AuthSettings.from_env()
@@ -0,0 +1,67 @@
+import hmac
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from service_auth.config import auth_settings
+from service_auth.verifier import InvalidToken, JWTVerifier, Principal
+
+token_verifier = JWTVerifier.from_settings(auth_settings)
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# Who a request carrying SERVICE_AUTH_TOKEN is; user_id 0 is never a real user
+SERVICE_PRINCIPAL = Principal(user_id=0, username="service", role="service")
+
+
+def service_headers() -> dict[str, str]:
+    """Headers for a call to another service: SERVICE_AUTH_TOKEN as a bearer token, when set."""
+    if not auth_settings.service_token:
+        return {}
+    return {"Authorization": f"Bearer {auth_settings.service_token}"}
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def get_principal(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+) -> Principal | None:
+    """The verified caller, or None when no token was sent. Invalid tokens are rejected when enforcing."""
+    if credentials is None:
+        return None
+    service_token = auth_settings.service_token
+    if service_token and hmac.compare_digest(credentials.credentials.encode(), service_token.encode()):
+        return SERVICE_PRINCIPAL
+    try:
+        return token_verifier.verify(credentials.credentials)
+    except InvalidToken as e:
+        if auth_settings.enforce:
+            raise _unauthorized(str(e))
+        return None
+
+
+def require_auth(request: Request, principal: Principal | None = Depends(get_principal)) -> Principal | None:
+    """
+    Mount on an app or router. With AUTH_ENFORCE on, every request outside
+    AUTH_PUBLIC_PATHS needs a valid bearer token; otherwise it only parses one if sent.
+    """
+    if principal is None and auth_settings.enforce and request.url.path not in auth_settings.public_paths:
+        raise _unauthorized("Not authenticated")
+    return principal
+
+
+def require_roles(*roles: str):
+    def roles_checker(principal: Principal | None = Depends(require_auth)) -> Principal | None:
+        if auth_settings.enforce and (principal is None or principal.role not in roles):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Access denied. Required roles: {', '.join(roles)}",
+            )
+        return principal
+    return roles_checker
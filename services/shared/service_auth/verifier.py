@@ -0,0 +1,113 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable
+
+from jose import ExpiredSignatureError, JWTError, jwt
+
+from service_auth.config import AuthSettings
+
+
+class InvalidToken(Exception):
+    """The token is malformed, badly signed, expired or missing required claims."""
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The caller as described by a verified token."""
+    user_id: int
+    username: str | None = None
+    role: str | None = None
+    company_id: int | None = None
+    claims: dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+
+class JWTVerifier:
+    """
+    Verifies tokens locally. The key is resolved once by `key_loader` and cached
+    (call reload_key() after rotating it); decoded principals are memoized per
+    token in a bounded LRU until the token's own expiry.
+    """
+
+    def __init__(
+        self,
+        key_loader: Callable[[], str | None],
+        algorithms: list[str],
+        cache_size: int = 10000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._key_loader = key_loader
+        self._key: str | None = None
+        self.algorithms = algorithms
+        self.cache_size = cache_size
+        self._clock = clock
+        self._cache: OrderedDict[str, tuple[Principal, float]] = OrderedDict()
+        self._lock = Lock()
+
+    @classmethod
+    def from_settings(cls, settings: AuthSettings) -> "JWTVerifier":
+        def load_key() -> str | None:
+            if settings.public_key_file:
+                with open(settings.public_key_file) as f:
+                    return f.read()
+            return settings.secret_key
+
+        return cls(load_key, [settings.algorithm], settings.cache_size)
+
+    @property
+    def key(self) -> str | None:
+        if self._key is None:
+            self._key = self._key_loader()
+        return self._key
+
+    def reload_key(self) -> None:
+        """Pick up a rotated key; tokens verified with the old one are forgotten."""
+        with self._lock:
+            self._key = None
+            self._cache.clear()
+
+    def verify(self, token: str) -> Principal:
+        now = self._clock()
+        with self._lock:
+            entry = self._cache.get(token)
+            if entry is not None:
+                principal, expires_at = entry
+                if expires_at > now:
+                    self._cache.move_to_end(token)
+                    return principal
+                del self._cache[token]
+                raise InvalidToken("Token has expired")
+
+        key = self.key
+        if not key:
+            raise InvalidToken("No token verification key is configured")
+        try:
+            claims = jwt.decode(token, key, algorithms=self.algorithms)
+        except ExpiredSignatureError as e:
+            raise InvalidToken("Token has expired") from e
+        except JWTError as e:
+            raise InvalidToken("Could not validate credentials") from e
+
+        try:
+            principal = Principal(
+                user_id=int(claims["sub"]),
+                username=claims.get("username"),
+                role=claims.get("role"),
+                company_id=claims.get("company_id"),
+                claims=claims,
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise InvalidToken("Token has no valid subject") from e
+
+        # Tokens without an expiry are not memoized, so they are re-checked every time
+        if "exp" in claims:
+            with self._lock:
+                self._cache[token] = (principal, float(claims["exp"]))
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return principal
+
+    def cache_info(self) -> dict:
+        with self._lock:
+            return {"size": len(self._cache), "max_size": self.cache_size}
@@ -0,0 +1,139 @@
+import time
+from dataclasses import replace
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from service_auth import dependencies
+from service_auth.config import AuthSettings
+from service_auth import verifier as verifier_module
+from service_auth.verifier import InvalidToken, JWTVerifier
+
+SECRET = "test-secret"
+
+
+def make_token(exp_in=60, **claims):
+    claims = {"sub": "7", "username": "agent7", "role": "agent", "company_id": 3, **claims}
+    if exp_in is not None:
+        claims["exp"] = int(time.time()) + exp_in
+    return jwt.encode(claims, SECRET, algorithm="HS256")
+
+
+def test_verify_memoizes_decoded_claims(monkeypatch):
+    loads = []
+    verifier = JWTVerifier(lambda: loads.append(1) or SECRET, ["HS256"])
+    token = make_token()
+
+    principal = verifier.verify(token)
+    assert (principal.user_id, principal.role, principal.company_id) == (7, "agent", 3)
+
+    monkeypatch.setattr(verifier_module.jwt, "decode", lambda *a, **kw: pytest.fail("decoded twice"))
+    assert verifier.verify(token) is principal
+    assert loads == [1]
+
+
+def test_verify_rejects_bad_tokens():
+    verifier = JWTVerifier(lambda: SECRET, ["HS256"])
+    with pytest.raises(InvalidToken):
+        verifier.verify(jwt.encode({"sub": "7"}, "other-secret", algorithm="HS256"))
+    with pytest.raises(InvalidToken, match="expired"):
+        verifier.verify(make_token(exp_in=-10))
+    with pytest.raises(InvalidToken, match="subject"):
+        verifier.verify(jwt.encode({"username": "x"}, SECRET, algorithm="HS256"))
+
+
+def test_memoized_token_expires():
+    now = [time.time()]
+    verifier = JWTVerifier(lambda: SECRET, ["HS256"], clock=lambda: now[0])
+    token = make_token(exp_in=30)
+    verifier.verify(token)
+
+    now[0] += 31
+    with pytest.raises(InvalidToken, match="expired"):
+        verifier.verify(token)
+    assert verifier.cache_info()["size"] == 0
+
+
+def test_cache_is_bounded():
+    verifier = JWTVerifier(lambda: SECRET, ["HS256"], cache_size=2)
+    for n in range(5):
+        verifier.verify(make_token(sub=str(n)))
+    assert verifier.cache_info() == {"size": 2, "max_size": 2}
+
+
+def test_verify_rejects_everything_without_a_key():
+    verifier = JWTVerifier(lambda: None, ["HS256"])
+    with pytest.raises(InvalidToken, match="No token verification key"):
+        verifier.verify(jwt.encode({"sub": "7"}, "supersecret", algorithm="HS256"))
+
+
+def test_enforcing_without_a_key_refuses_to_start(monkeypatch):
+    monkeypatch.setenv("AUTH_ENFORCE", "true")
+    monkeypatch.delenv("JWT_SECRET_KEY", raising=False)
+    monkeypatch.delenv("JWT_PUBLIC_KEY_FILE", raising=False)
+    with pytest.raises(RuntimeError, match="JWT_SECRET_KEY"):
+        AuthSettings.from_env()
+
+    monkeypatch.setenv("JWT_SECRET_KEY", SECRET)
+    assert AuthSettings.from_env().secret_key == SECRET
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def configure(enforce, service_token=None):
+        settings = replace(dependencies.auth_settings, enforce=enforce, service_token=service_token)
+        monkeypatch.setattr(dependencies, "auth_settings", settings)
+        monkeypatch.setattr(dependencies, "token_verifier", JWTVerifier(lambda: SECRET, ["HS256"]))
+
+        app = FastAPI(dependencies=[Depends(dependencies.require_auth)])
+
+        @app.get("/health")
+        def health():
+            return {"status": "ok"}
+
+        @app.get("/whoami")
+        def whoami(principal=Depends(dependencies.get_principal)):
+            return {"user_id": principal.user_id if principal else None}
+
+        @app.get("/admin", dependencies=[Depends(dependencies.require_roles("admin"))])
+        def admin():
+            return {"ok": True}
+
+        return TestClient(app)
+    return configure
+
+
+def test_enforced_auth(client):
+    c = client(enforce=True)
+    auth = {"Authorization": f"Bearer {make_token()}"}
+    assert c.get("/health").status_code == 200
+    assert c.get("/whoami").status_code == 401
+    assert c.get("/whoami", headers={"Authorization": "Bearer garbage"}).status_code == 401
+    assert c.get("/whoami", headers=auth).json() == {"user_id": 7}
+    assert c.get("/admin", headers=auth).status_code == 403
+    admin = {"Authorization": f"Bearer {make_token(role='admin')}"}
+    assert c.get("/admin", headers=admin).status_code == 200
+
+
+def test_not_enforced_only_parses_tokens(client):
+    c = client(enforce=False)
+    assert c.get("/whoami").json() == {"user_id": None}
+    assert c.get("/whoami", headers={"Authorization": "Bearer garbage"}).json() == {"user_id": None}
+    assert c.get("/whoami", headers={"Authorization": f"Bearer {make_token()}"}).json() == {"user_id": 7}
+    assert c.get("/admin").status_code == 200
+
+
+def test_service_token_authenticates_internal_calls(client):
+    c = client(enforce=True, service_token="internal-secret")
+    assert dependencies.service_headers() == {"Authorization": "Bearer internal-secret"}
+    assert c.get("/whoami", headers=dependencies.service_headers()).json() == {"user_id": 0}
+    assert c.get("/whoami", headers={"Authorization": "Bearer internal-secreT"}).status_code == 401
+    # A service is not an admin
+    assert c.get("/admin", headers=dependencies.service_headers()).status_code == 403
+
+
+def test_service_headers_are_empty_without_a_token(client):
+    client(enforce=False)
+    assert dependencies.service_headers() == {}
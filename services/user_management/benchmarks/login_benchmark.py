@@ -0,0 +1,73 @@
+"""
+Login latency under concurrent load, against a running user_management instance.
+
+    python benchmarks/login_benchmark.py --url http://localhost:8000 \\
+        --username admin --password secret --requests 500 --concurrency 50
+
+Prints throughput, latency percentiles and the status code mix. Use a real
+account for successful logins; failed ones are rate limited per username
+after LOGIN_MAX_FAILURES, which shows up as 429s.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(url: str, username: str, password: str, total: int, concurrency: int):
+    latencies = []
+    statuses = Counter()
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker(client: httpx.AsyncClient):
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                response = await client.post("/api/user/login", json={"username": username, "password": password})
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    print(f"{total} logins, concurrency {concurrency}: {elapsed:.2f}s, {total / elapsed:.1f} logins/s")
+    print(
+        "latency ms: "
+        f"mean {statistics.mean(latencies) * 1000:.1f}  "
+        f"p50 {percentile(latencies, 50) * 1000:.1f}  "
+        f"p95 {percentile(latencies, 95) * 1000:.1f}  "
+        f"p99 {percentile(latencies, 99) * 1000:.1f}  "
+        f"max {max(latencies) * 1000:.1f}"
+    )
+    print("status:", dict(statuses))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.username, args.password, args.requests, args.concurrency))
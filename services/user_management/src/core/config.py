@@ -4,5 +4,19 @@ class Settings(pydantic_settings.BaseSettings):
     """Application settings."""
 
     NOTIFICATION_SERVICE_URL: str
+    COMPANY_SERVICE_URL: str = "http://company_service:8000"
 
-settings = Settings()
\ No newline at end of file
+    # Company lookups: pooled async client plus a short-lived cache
+    COMPANY_CACHE_TTL_SECONDS: float = 60.0
+    COMPANY_CACHE_MAX_SIZE: int = 1000
+    COMPANY_CLIENT_MAX_CONNECTIONS: int = 20
+
+    # Account emails are written to an outbox with the user and delivered in the background
+    NOTIFICATION_OUTBOX_ENABLED: bool = True
+    NOTIFICATION_OUTBOX_BATCH_SIZE: int = 100
+    NOTIFICATION_OUTBOX_POLL_SECONDS: float = 2.0
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS: int = 8
+    NOTIFICATION_OUTBOX_BASE_BACKOFF_SECONDS: float = 5.0
+    NOTIFICATION_OUTBOX_MAX_BACKOFF_SECONDS: float = 600.0
+
+settings = Settings()
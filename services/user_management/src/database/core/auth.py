@@ -3,36 +3,28 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from src.database.models.user import User
-from src.database.core.security import verify_password, create_access_token
-from src.database.db import get_db
+from src.database.core.security import create_access_token
+from src.database.core.revocation import revocation_table
+from src.database.db import get_db, SessionLocal
 from src.database.core.config import settings
+from src.schemas.auth import TokenUser
+
+# Claims a token must carry to be trusted without loading the user
+STATELESS_CLAIMS = ("sub", "username", "role", "company_id", "ver")
 
 # Replaces OAuth2PasswordBearer with a clean token-only bearer scheme
 token_scheme = HTTPBearer(auto_error=True)
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
-    if not user or not verify_password(password, user.password):
-        return None
-    return user
-
-def login_user(db: Session, username: str, password: str):
-    user = authenticate_user(db, username, password)
-    if not user:
-        return None
-    token = create_access_token({
+def issue_token(user: User, db: Session | None = None) -> str:
+    return create_access_token({
         "sub": str(user.user_id),
         "username": user.username,
         "role": user.role,
-        "company_id": user.company_id
+        "company_id": user.company_id,
+        "ver": revocation_table.current_version(user.user_id, db)
     })
-    return token
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(token_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    token = credentials.credentials
+def decode_token(token: str) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -46,11 +38,56 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.user_id == int(user_id)).first()
+    # Tokens issued before the "ver" claim existed count as version 0
+    if revocation_table.is_revoked(int(user_id), payload.get("ver", 0)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+def load_user(user_id: int, db: Session | None = None) -> User:
+    if db is None:
+        db = SessionLocal()
+        try:
+            return load_user(user_id, db)
+        finally:
+            db.close()
+    user = db.query(User).filter(User.user_id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(token_scheme),
+) -> User | TokenUser:
+    """
+    The caller, for authorization. With AUTH_STATELESS the verified claims are trusted
+    and no query runs; older tokens without the full claim set fall back to the database.
+    """
+    payload = decode_token(credentials.credentials)
+    if settings.AUTH_STATELESS and all(claim in payload for claim in STATELESS_CLAIMS):
+        return TokenUser(
+            user_id=int(payload["sub"]),
+            username=payload["username"],
+            role=payload["role"],
+            company_id=payload["company_id"],
+        )
+    return load_user(int(payload["sub"]))
+
+def get_current_db_user(
+    credentials: HTTPAuthorizationCredentials = Depends(token_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """The caller's full, current user row, for endpoints that need more than the claims."""
+    payload = decode_token(credentials.credentials)
+    return load_user(int(payload["sub"]), db)
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     # if current_user.must_change_password:
     #     raise HTTPException(
@@ -5,8 +5,18 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "supersecret"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRY_MINUTES: int = 60
+    # Trust role and company_id from signed tokens instead of loading the user per request
+    AUTH_STATELESS: bool = True
+    AUTH_REVOCATION_REFRESH_SECONDS: float = 30.0
     ADMIN_USERNAME: str
     ADMIN_PASSWORD: str
+    # Worker processes for bulk password hashing; 0 means one per CPU
+    PASSWORD_HASH_WORKERS: int = 0
+    # Login load shedding: password checks allowed to wait for a hash worker
+    LOGIN_MAX_PENDING: int = 200
+    # Failed logins per username within the window before further attempts are refused
+    LOGIN_MAX_FAILURES: int = 5
+    LOGIN_FAILURE_WINDOW_SECONDS: float = 300.0
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,60 @@
+import time
+from collections import deque
+from threading import Lock
+from src.database.core.config import settings
+
+
+class LoginAttemptLimiter:
+    """
+    Per-username sliding window of failed logins, kept in memory. Once a username has
+    `max_failures` failures inside `window_seconds`, further attempts are refused without
+    running bcrypt until the oldest failure ages out. A successful login clears the window.
+    """
+
+    def __init__(self, max_failures: int, window_seconds: float, max_tracked: int = 100_000, clock=time.monotonic):
+        self.max_failures = max_failures
+        self.window_seconds = window_seconds
+        self.max_tracked = max_tracked
+        self._clock = clock
+        self._failures: dict[str, deque] = {}
+        self._lock = Lock()
+
+    def _prune(self, failures: deque, now: float) -> None:
+        while failures and failures[0] <= now - self.window_seconds:
+            failures.popleft()
+
+    def retry_after(self, username: str) -> float | None:
+        """Seconds until the username may try again, or None if it is not locked out."""
+        now = self._clock()
+        with self._lock:
+            failures = self._failures.get(username)
+            if not failures:
+                return None
+            self._prune(failures, now)
+            if len(failures) < self.max_failures:
+                return None
+            return failures[0] + self.window_seconds - now
+
+    def record_failure(self, username: str) -> None:
+        now = self._clock()
+        with self._lock:
+            if username not in self._failures and len(self._failures) >= self.max_tracked:
+                self._evict_idle(now)
+            failures = self._failures.setdefault(username, deque(maxlen=self.max_failures))
+            self._prune(failures, now)
+            failures.append(now)
+
+    def reset(self, username: str) -> None:
+        with self._lock:
+            self._failures.pop(username, None)
+
+    def _evict_idle(self, now: float) -> None:
+        for username in [u for u, f in self._failures.items() if not f or f[-1] <= now - self.window_seconds]:
+            del self._failures[username]
+        # Still full (e.g. a spray of usernames): drop the oldest-tracked half
+        if len(self._failures) >= self.max_tracked:
+            for username in list(self._failures)[: len(self._failures) // 2]:
+                del self._failures[username]
+
+
+login_limiter = LoginAttemptLimiter(settings.LOGIN_MAX_FAILURES, settings.LOGIN_FAILURE_WINDOW_SECONDS)
@@ -0,0 +1,28 @@
+import os
+from passlib.context import CryptContext
+
+# Kept free of DB and app imports: hash worker processes import only this module,
+# so the bcrypt cost is read from the environment directly.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+# Hashes made with any other cost are flagged for a rehash at the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_desired_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_desired_rounds=BCRYPT_ROUNDS,
+)
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Returns (valid, new_hash); new_hash is set when the stored hash used another cost."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def hash_chunk(passwords: list[str]) -> list[str]:
+    return [hash_password(password) for password in passwords]
@@ -0,0 +1,94 @@
+import time
+from datetime import datetime
+from threading import Lock
+from sqlalchemy.orm import Session
+from src.database.db import SessionLocal
+from src.database.models.token_revocation import TokenRevocation
+from src.database.core.config import settings
+
+
+class RevocationTable:
+    """
+    In-memory copy of token_revocations, reloaded every `refresh_seconds`, so checking
+    a token against it costs a dict lookup instead of a query. Revocations made in this
+    process apply at once; other processes pick them up on their next reload.
+    """
+
+    def __init__(self, refresh_seconds: float, session_factory=SessionLocal, clock=time.monotonic):
+        self.refresh_seconds = refresh_seconds
+        self.session_factory = session_factory
+        self._clock = clock
+        self._versions: dict[int, int] = {}
+        self._loaded_at: float | None = None
+        self._lock = Lock()
+        self._reload_lock = Lock()
+
+    def _reload(self) -> None:
+        db = self.session_factory()
+        try:
+            versions = dict(db.query(TokenRevocation.user_id, TokenRevocation.version).all())
+        finally:
+            db.close()
+        with self._lock:
+            self._versions = versions
+            self._loaded_at = self._clock()
+
+    def _ensure_fresh(self) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and self._clock() - loaded_at < self.refresh_seconds:
+            return
+        # One reload at a time; while it runs, others keep using the previous table
+        if not self._reload_lock.acquire(blocking=loaded_at is None):
+            return
+        try:
+            if self._loaded_at is loaded_at:
+                self._reload()
+        finally:
+            self._reload_lock.release()
+
+    def version(self, user_id: int) -> int:
+        """Current token version of a user; 0 if their tokens were never revoked."""
+        self._ensure_fresh()
+        return self._versions.get(user_id, 0)
+
+    def current_version(self, user_id: int, db: Session | None = None) -> int:
+        """
+        The user's token version read from the database, for issuing tokens: the in-memory
+        copy may not have seen a revocation made by another process yet, and a token issued
+        with that stale version would count as revoked once it reloads.
+        """
+        if db is None:
+            db = self.session_factory()
+            try:
+                return self.current_version(user_id, db)
+            finally:
+                db.close()
+        version = db.query(TokenRevocation.version).filter(TokenRevocation.user_id == user_id).scalar() or 0
+        with self._lock:
+            if version > self._versions.get(user_id, 0):
+                self._versions[user_id] = version
+        return version
+
+    def is_revoked(self, user_id: int, token_version: int) -> bool:
+        return token_version < self.version(user_id)
+
+    def revoke(self, db: Session, user_id: int) -> int:
+        """Revoke every token issued to the user so far; commits. Returns the new version."""
+        row = db.query(TokenRevocation).filter(TokenRevocation.user_id == user_id).with_for_update().first()
+        if row is None:
+            row = TokenRevocation(user_id=user_id, version=1, revoked_at=datetime.utcnow())
+            db.add(row)
+        else:
+            row.version += 1
+            row.revoked_at = datetime.utcnow()
+        db.commit()
+        with self._lock:
+            self._versions[user_id] = row.version
+        return row.version
+
+    def invalidate(self) -> None:
+        """Force a reload on the next check."""
+        self._loaded_at = None
+
+
+revocation_table = RevocationTable(settings.AUTH_REVOCATION_REFRESH_SECONDS)
@@ -5,9 +5,13 @@ from sqlalchemy.orm import Session
 from src.database.db import get_db
 from src.database.models.user import User
 from src.database.core.config import settings
+from src.database.core.passwords import pwd_context, hash_password, hash_chunk, verify_password, verify_and_update
 from jose import jwt
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
+import os
 
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=30)) -> str:
     to_encode = data.copy()
@@ -16,13 +20,64 @@ def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt is CPU-bound by design; bulk hashing is spread over worker processes so it uses every core
+HASH_WORKERS = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+_hash_pool: ProcessPoolExecutor | None = None
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+def get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        # spawn, not fork: the server process has threads and open DB connections
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _hash_pool
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+def shutdown_hash_pool() -> None:
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash many passwords on the process pool, one chunk per worker; returns hashes in order."""
+    if not passwords:
+        return []
+    pool = get_hash_pool()
+    size = -(-len(passwords) // HASH_WORKERS)
+    chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    loop = asyncio.get_running_loop()
+    hashed = await asyncio.gather(*(loop.run_in_executor(pool, hash_chunk, chunk) for chunk in chunks))
+    return [h for chunk in hashed for h in chunk]
+
+class HashPoolBusy(Exception):
+    """Too many password checks are already waiting for a hash worker."""
+
+_pending_verifications = 0
+_dummy_hash: str | None = None
+
+async def verify_password_offloaded(plain_password: str, hashed_password: str | None) -> tuple[bool, str | None]:
+    """
+    Check a password on the hash pool without tying up a request thread. Returns
+    (valid, new_hash) like verify_and_update. With no stored hash (unknown user) a
+    dummy hash is checked, so the response time does not reveal whether the user exists.
+    Raises HashPoolBusy instead of queueing more than LOGIN_MAX_PENDING checks.
+    """
+    global _pending_verifications, _dummy_hash
+    if _pending_verifications >= settings.LOGIN_MAX_PENDING:
+        raise HashPoolBusy()
+    _pending_verifications += 1
+    try:
+        loop = asyncio.get_running_loop()
+        if hashed_password is None:
+            if _dummy_hash is None:
+                _dummy_hash = (await loop.run_in_executor(get_hash_pool(), hash_chunk, [os.urandom(16).hex()]))[0]
+            await loop.run_in_executor(get_hash_pool(), verify_and_update, plain_password, _dummy_hash)
+            return False, None
+        return await loop.run_in_executor(get_hash_pool(), verify_and_update, plain_password, hashed_password)
+    finally:
+        _pending_verifications -= 1
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/user/login")
 
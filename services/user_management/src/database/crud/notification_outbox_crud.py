@@ -0,0 +1,75 @@
+# src/database/crud/notification_outbox_crud.py
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from src.database.models.notification_outbox import NotificationOutbox
+
+
+class NotificationOutboxService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, payload: dict):
+        """Add an outbox row to the current transaction; the caller commits."""
+        now = datetime.utcnow()
+        self.db.add(NotificationOutbox(payload=payload, status="pending", attempts=0, next_attempt_at=now, created_at=now))
+
+    def enqueue_many(self, payloads):
+        """Add outbox rows to the current transaction in one statement; the caller commits."""
+        now = datetime.utcnow()
+        rows = [
+            {"payload": payload, "status": "pending", "attempts": 0, "next_attempt_at": now, "created_at": now}
+            for payload in payloads
+        ]
+        if rows:
+            self.db.execute(insert(NotificationOutbox), rows)
+
+    def claim_due(self, batch_size: int, lease_seconds: float):
+        """
+        Lease up to `batch_size` due rows by pushing their next_attempt_at forward,
+        so other dispatchers skip them until the lease expires.
+        Returns (outbox_id, payload) pairs.
+        """
+        now = datetime.utcnow()
+        rows = (
+            self.db.query(NotificationOutbox)
+            .filter(NotificationOutbox.status == "pending", NotificationOutbox.next_attempt_at <= now)
+            .order_by(NotificationOutbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        lease_until = now + timedelta(seconds=lease_seconds)
+        for row in rows:
+            row.next_attempt_at = lease_until
+        self.db.commit()
+        return [(row.id, row.payload) for row in rows]
+
+    def mark_sent(self, outbox_ids):
+        if not outbox_ids:
+            return
+        self.db.query(NotificationOutbox).filter(NotificationOutbox.id.in_(outbox_ids)).update(
+            {"status": "sent", "sent_at": datetime.utcnow(), "last_error": None, "payload": None},
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def mark_failed_attempts(self, failures, max_attempts: int, base_backoff: float, max_backoff: float):
+        """
+        Record failed deliveries as (outbox_id, error, retryable) tuples. Retryable rows are
+        rescheduled with exponential backoff until `max_attempts`, then dead-lettered as 'failed'.
+        """
+        if not failures:
+            return
+        by_id = {outbox_id: (error, retryable) for outbox_id, error, retryable in failures}
+        now = datetime.utcnow()
+        for row in self.db.query(NotificationOutbox).filter(NotificationOutbox.id.in_(by_id)).all():
+            error, retryable = by_id[row.id]
+            row.attempts += 1
+            row.last_error = error
+            if not retryable or row.attempts >= max_attempts:
+                row.status = "failed"
+            else:
+                delay = min(base_backoff * (2 ** (row.attempts - 1)), max_backoff)
+                row.next_attempt_at = now + timedelta(seconds=delay)
+        self.db.commit()
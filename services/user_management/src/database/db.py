@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 import os
 
 # Database URL (Get these from environment variables or .env file)
@@ -10,11 +11,16 @@ DB_HOST = os.getenv("USER_DB_HOST", "user_db")  # Docker service name
 DB_PORT = os.getenv("USER_DB_PORT", 5432)
 DB_NAME = os.getenv("USER_DB_NAME", "user_db")
 
-# SQLAlchemy connection URL
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# SQLAlchemy connection URL (USER_DATABASE_URL overrides it, e.g. sqlite:// in tests)
+DATABASE_URL = os.getenv("USER_DATABASE_URL") or f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+engine_kwargs = {}
+if DATABASE_URL.startswith("sqlite"):
+    # Request threads share the database; an in-memory one must also share the connection
+    engine_kwargs = {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
 
 # Create the engine (the "core" of SQLAlchemy) to connect to the DB
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_kwargs)
 
 # Create a session local class to interact with the DB
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime
+from src.database.db import Base
+
+
+class TokenRevocation(Base):
+    """
+    Per-user token version. Tokens carry the version current at login; bumping it
+    revokes every token issued before. Only users who were ever revoked have a row.
+    """
+    __tablename__ = "token_revocations"
+
+    user_id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=1)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -3,6 +3,10 @@ from fastapi.responses import JSONResponse
 from src.database.db import engine, Base, get_db
 from src.routes.user import user_router
 from src.database.seeder import seed_admin_user 
+from src.core.config import settings
+from src.services.company_service import close_client
+from src.database.core.security import shutdown_hash_pool
+from src.services.notification_dispatcher import notification_dispatcher
 from sqlalchemy.orm import Session
 from fastapi.middleware.cors import CORSMiddleware
 import logging
@@ -29,6 +33,17 @@ def startup_event():
     db: Session = next(get_db())
     seed_admin_user(db)
 
+@app.on_event("startup")
+async def start_notification_dispatcher():
+    if settings.NOTIFICATION_OUTBOX_ENABLED:
+        notification_dispatcher.start()
+
+@app.on_event("shutdown")
+async def stop_background_clients():
+    await notification_dispatcher.stop()
+    await close_client()
+    shutdown_hash_pool()
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled error: {exc}", exc_info=True)
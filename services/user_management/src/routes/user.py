@@ -1,19 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from src.database.db import get_db
 from src.database.models.user import User
 from src.schemas import user as user_schema, auth as auth_schema
-from src.database.core.security import hash_password, verify_password
+from src.database.core.security import hash_password, hash_passwords, verify_password_offloaded, HashPoolBusy
+from src.database.core.login_limiter import login_limiter
+from sqlalchemy import insert
 from src.database.core.auth import (
-    login_user,
+    issue_token,
     get_current_user,
-    get_current_active_user,
+    get_current_db_user,
     require_role
 )
+from src.database.core.revocation import revocation_table
 import secrets
 import string
-from src.database.core.config import settings
-from src.services.email_service import send_email_notification, send_another_email_notification
+from src.services.email_service import queue_email_notification, queue_email_notifications
 from src.services.company_service import get_company
 from typing import List
 
@@ -21,30 +24,23 @@ router = APIRouter(prefix="/api/user", tags=["user"])
 def generate_username():
     return "user_" + secrets.token_hex(4)
 
+def generate_usernames(count: int) -> list[str]:
+    """`count` distinct usernames; one repeat would fail the whole bulk insert."""
+    usernames = set()
+    while len(usernames) < count:
+        usernames.add(generate_username())
+    return list(usernames)
+
 def generate_password(length=10):
     chars = string.ascii_letters + string.digits
     return ''.join(secrets.choice(chars) for _ in range(length))
 
-@router.post("/login", response_model=auth_schema.TokenResponse)
-def login(credentials: auth_schema.LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == credentials.username).first()
-    if not user or not verify_password(credentials.password, user.password):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = login_user(db, user.username, credentials.password)
-    return {"access_token": token}
-
-@router.post("/", response_model=dict)
-def create_user(
-    user: user_schema.UserCreate,
-    db: Session = Depends(get_db),
-):
-    if not user.company_id:
-        raise HTTPException(status_code=400, detail="company_id is required for non-admin users.")
-    
-    company = get_company(user.company_id)
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found.")
-
+def create_pending_user(db: Session, user: user_schema.UserCreate, email_to: str, email_type: str):
+    """
+    Create the user with generated credentials and queue the welcome email in the same
+    transaction, so the email is sent if and only if the user exists.
+    Blocking (bcrypt, DB); call it from a worker thread.
+    """
     generated_username = generate_username()
     generated_password = generate_password()
     hashed_pw = hash_password(generated_password)
@@ -59,16 +55,107 @@ def create_user(
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-
-    send_email_notification(
-        to=company['email'],
+    queue_email_notification(
+        db,
+        to=email_to,
         subject="Welcome to Agriteck MicroIncorance Platform",
-        type="account_approval",
+        type=email_type,
         username=generated_username,
         password=generated_password
     )
+    db.commit()
+    db.refresh(db_user)
+    return db_user, generated_username, generated_password
+
+def create_pending_agents(db: Session, company_id: int, agents: list):
+    """
+    Insert agents given as (email, username, password, password_hash) in one multi-row
+    statement and queue all their welcome emails, in a single transaction.
+    Returns (user_id, email, username, password) per agent, in order.
+    """
+    rows = [
+        {
+            "username": username,
+            "password": hashed_pw,
+            "role": "agent",
+            "company_id": company_id,
+            "status": "pending",
+            "must_change_password": True,
+        }
+        for _, username, _, hashed_pw in agents
+    ]
+    user_ids = db.execute(
+        insert(User).returning(User.user_id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+    queue_email_notifications(db, [
+        {
+            "to": email,
+            "subject": "Welcome to Agriteck MicroIncorance Platform",
+            "type": "agent_account",
+            "username": username,
+            "password": password,
+        }
+        for email, username, password, _ in agents
+    ])
+    db.commit()
+    return [(user_id, email, username, password) for user_id, (email, username, password, _) in zip(user_ids, agents)]
+
+def find_login_user(db: Session, username: str):
+    """
+    Load the user and end the transaction, so no pooled connection is held
+    while the password check waits for a hash worker.
+    """
+    user = db.query(User).filter(User.username == username).first()
+    if user is not None:
+        db.expunge(user)
+    db.rollback()
+    return user
+
+def save_rehashed_password(db: Session, user_id: int, new_hash: str):
+    db.query(User).filter(User.user_id == user_id).update({"password": new_hash}, synchronize_session=False)
+    db.commit()
+
+@router.post("/login", response_model=auth_schema.TokenResponse)
+async def login(credentials: auth_schema.LoginRequest, db: Session = Depends(get_db)):
+    retry_after = login_limiter.retry_after(credentials.username)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many failed login attempts. Try again later.",
+            headers={"Retry-After": str(max(1, int(retry_after)))},
+        )
+
+    user = await run_in_threadpool(find_login_user, db, credentials.username)
+    try:
+        valid, new_hash = await verify_password_offloaded(credentials.password, user.password if user else None)
+    except HashPoolBusy:
+        raise HTTPException(status_code=503, detail="Too many logins in progress. Try again shortly.", headers={"Retry-After": "1"})
+
+    if not user or not valid:
+        login_limiter.record_failure(credentials.username)
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    login_limiter.reset(credentials.username)
+
+    if new_hash:
+        # Stored with an older bcrypt cost; upgrade it while we have the plain password
+        await run_in_threadpool(save_rehashed_password, db, user.user_id, new_hash)
+    return {"access_token": await run_in_threadpool(issue_token, user, db)}
+
+@router.post("/", response_model=dict)
+async def create_user(
+    user: user_schema.UserCreate,
+    db: Session = Depends(get_db),
+):
+    if not user.company_id:
+        raise HTTPException(status_code=400, detail="company_id is required for non-admin users.")
+    
+    company = await get_company(user.company_id)
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found.")
+
+    db_user, generated_username, generated_password = await run_in_threadpool(
+        create_pending_user, db, user, company['email'], "account_approval"
+    )
 
     return {
         "username": generated_username,
@@ -78,40 +165,19 @@ def create_user(
     }
 
 @router.post("/agent", response_model=dict)
-def create_user(
+async def create_user(
     user: user_schema.UserCreate,
     db: Session = Depends(get_db),
 ):
     if not user.company_id:
         raise HTTPException(status_code=400, detail="company_id is required for non-admin users.")
     
-    company = get_company(user.company_id)
+    company = await get_company(user.company_id)
     if not company:
         raise HTTPException(status_code=404, detail="Company not found.")
 
-    generated_username = generate_username()
-    generated_password = generate_password()
-    hashed_pw = hash_password(generated_password)
-
-    db_user = User(
-        username=generated_username,
-        password=hashed_pw,
-        role=user.role,
-        company_id=user.company_id,
-        status="pending",
-        must_change_password=True
-    )
-
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-
-    send_another_email_notification(
-        to=user.email,
-        subject="Welcome to Agriteck MicroIncorance Platform",
-        type="agent_account",
-        username=generated_username,
-        password=generated_password
+    db_user, generated_username, generated_password = await run_in_threadpool(
+        create_pending_user, db, user, user.email, "agent_account"
     )
 
     return {
@@ -121,8 +187,41 @@ def create_user(
         "role": user.role
     }
 
+@router.post("/agents/bulk", response_model=user_schema.AgentBulkCreateResponse)
+async def create_agents_bulk(
+    payload: user_schema.AgentBulkCreate,
+    db: Session = Depends(get_db),
+):
+    """Provision many agents of one company at once; credentials are returned and emailed to each agent."""
+    emails = [email.strip() for email in payload.emails]
+    if any(not email for email in emails):
+        raise HTTPException(status_code=400, detail="Agent emails cannot be empty.")
+    if len(set(map(str.lower, emails))) != len(emails):
+        raise HTTPException(status_code=400, detail="Duplicate agent emails in request.")
+
+    company = await get_company(payload.company_id)
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found.")
+
+    usernames = generate_usernames(len(emails))
+    passwords = [generate_password() for _ in emails]
+    hashed = await hash_passwords(passwords)
+
+    created = await run_in_threadpool(
+        create_pending_agents, db, payload.company_id, list(zip(emails, usernames, passwords, hashed))
+    )
+
+    return {
+        "company_id": payload.company_id,
+        "created": len(created),
+        "agents": [
+            {"user_id": user_id, "email": email, "username": username, "password": password}
+            for user_id, email, username, password in created
+        ],
+    }
+
 @router.get("/me", response_model=user_schema.UserOut)
-def get_user_info(current_user: User = Depends(get_current_active_user)):
+def get_user_info(current_user: User = Depends(get_current_db_user)):
     print(f"Returning current user: ID {current_user.user_id}, username: {current_user.username}")
     return current_user
 
@@ -148,12 +247,15 @@ def update_user_account(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    credentials_changed = False
     if updates.username:
+        credentials_changed = credentials_changed or updates.username != user.username
         user.username = updates.username
 
     if updates.password:
         user.password = hash_password(updates.password)
         user.must_change_password = False
+        credentials_changed = True
 
     if hasattr(updates, 'status') and updates.status is not None:
         raise HTTPException(status_code=403, detail="You cannot update status from this endpoint.")
@@ -165,6 +267,11 @@ def update_user_account(
         print(f"Commit error: {e}")
         raise HTTPException(status_code=500, detail="Database commit failed.")
 
+    # Outstanding tokens carry the old username and outlive a password change; make the user
+    # log in again. Any future role or company change here must do the same.
+    if credentials_changed:
+        revocation_table.revoke(db, user.user_id)
+
     return user
 
 @router.put("/update-status/{user_id}", response_model=user_schema.UserOut)
@@ -191,8 +298,23 @@ def update_user_status(
         print(f"Status update error: {e}")
         raise HTTPException(status_code=500, detail="Failed to update user status.")
 
+    # Outstanding tokens were issued for the old status; make the user log in again
+    revocation_table.revoke(db, user.user_id)
+
     return user
 
+@router.post("/revoke-tokens/{user_id}", response_model=dict)
+def revoke_user_tokens(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin")),
+):
+    """Invalidate every token issued to the user so far, e.g. after a compromise."""
+    user = db.query(User).filter(User.user_id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"user_id": user_id, "token_version": revocation_table.revoke(db, user_id)}
+
 
 @router.get("/agents", response_model=List[user_schema.UserOut])
 def get_agent_users(
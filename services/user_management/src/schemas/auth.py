@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class LoginRequest(BaseModel):
     username: str
@@ -7,4 +8,11 @@ class LoginRequest(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
-    
+
+class TokenUser(BaseModel):
+    """The authenticated user as described by a verified token's claims."""
+    user_id: int
+    username: str
+    role: Optional[str] = None
+    company_id: Optional[int] = None
+    status: Optional[str] = None
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List
 
 class UserCreate(BaseModel):
     role: str
@@ -24,3 +24,18 @@ class UserUpdate(BaseModel):
 
 class StatusUpdate(BaseModel):
     status: str
+
+class AgentBulkCreate(BaseModel):
+    company_id: int
+    emails: List[str] = Field(..., min_length=1, max_length=1000)
+
+class AgentCredentials(BaseModel):
+    user_id: int
+    email: str
+    username: str
+    password: str
+
+class AgentBulkCreateResponse(BaseModel):
+    company_id: int
+    created: int
+    agents: List[AgentCredentials]
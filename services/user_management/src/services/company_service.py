@@ -1,15 +1,25 @@
-import requests
-import os
+import time
+from collections import OrderedDict
+from threading import Lock
 from typing import Optional, Dict, Any
 import logging
 
+import httpx
+
+from src.core.config import settings
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Determine the base URL for the company service
-# It's recommended to use environment variables for configuration
-COMPANY_SERVICE_BASE_URL = os.getenv("COMPANY_SERVICE_URL", "http://company_service:8000")
+COMPANY_SERVICE_BASE_URL = settings.COMPANY_SERVICE_URL.rstrip("/")
+
+# Timeout configuration for HTTP calls
+timeout = httpx.Timeout(connect=2.0, read=5.0, write=5.0, pool=2.0)
+limits = httpx.Limits(
+    max_connections=settings.COMPANY_CLIENT_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.COMPANY_CLIENT_MAX_CONNECTIONS,
+)
 
 class CompanyServiceError(Exception):
     """Custom exception for company service errors."""
@@ -19,9 +29,68 @@ class CompanyNotFound(CompanyServiceError):
     """Exception raised when a company is not found (404)."""
     pass
 
-def get_company(company_id: str) -> Optional[Dict[str, Any]]:
+
+class CompanyCache:
+    """
+    Small LRU cache of company records with a time-to-live, so bursts of user
+    creation for the same company do not each call the company service.
     """
-    Retrieves company details from the company microservice.
+
+    def __init__(self, max_size: int, ttl_seconds: float, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, company_id) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(company_id)
+            if entry is None:
+                return None
+            company, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[company_id]
+                return None
+            self._entries.move_to_end(company_id)
+            return company
+
+    def put(self, company_id, company: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[company_id] = (company, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(company_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+company_cache = CompanyCache(settings.COMPANY_CACHE_MAX_SIZE, settings.COMPANY_CACHE_TTL_SECONDS)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Shared keep-alive client, created on first use inside the running event loop."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(base_url=COMPANY_SERVICE_BASE_URL, timeout=timeout, limits=limits)
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_company(company_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Retrieves company details from the company microservice, served from a
+    short-lived cache when the company was looked up recently.
 
     Args:
         company_id: The unique identifier for the company.
@@ -32,44 +101,40 @@ def get_company(company_id: str) -> Optional[Dict[str, Any]]:
 
     Raises:
         CompanyServiceError: For connection issues or unexpected errors from the service.
-        requests.exceptions.HTTPError: For HTTP errors other than 404.
     """
     if not company_id:
         raise ValueError("company_id cannot be empty")
 
-    request_url = f"{COMPANY_SERVICE_BASE_URL}/companies/{company_id}"
-    logger.info(f"Requesting company data from: {request_url}")
+    company = company_cache.get(company_id)
+    if company is not None:
+        return company
+
+    request_path = f"/companies/{company_id}"
+    logger.info(f"Requesting company data from: {COMPANY_SERVICE_BASE_URL}{request_path}")
 
     try:
-        response = requests.get(request_url, timeout=10) # Set a reasonable timeout
-
-        if response.status_code == 200:
-            logger.info(f"Successfully retrieved company data for ID: {company_id}")
-            try:
-                return response.json()
-            except ValueError as json_error:
-                logger.error(f"Failed to decode JSON response for company {company_id}: {json_error}")
-                raise CompanyServiceError(f"Invalid JSON response from company service for company {company_id}") from json_error
-
-        elif response.status_code == 404:
-            logger.warning(f"Company not found for ID: {company_id}")
-            return None # Return None for 404 as requested
-
-        else:
-            # For other non-success status codes (e.g., 4xx client errors, 5xx server errors)
-            logger.error(f"Company service returned error {response.status_code} for company {company_id}: {response.text}")
-            response.raise_for_status() # Raise an HTTPError for other bad responses
-
-    except requests.exceptions.Timeout:
-        logger.error(f"Request timed out while fetching company {company_id} from {request_url}")
+        response = await get_client().get(request_path)
+    except httpx.TimeoutException:
+        logger.error(f"Request timed out while fetching company {company_id}")
         raise CompanyServiceError(f"Timeout connecting to company service for company {company_id}")
-    except requests.exceptions.ConnectionError as conn_err:
-        logger.error(f"Connection error while fetching company {company_id} from {request_url}: {conn_err}")
+    except httpx.RequestError as req_err:
+        logger.error(f"Request error while fetching company {company_id}: {req_err}")
         raise CompanyServiceError(f"Could not connect to company service for company {company_id}")
-    except requests.exceptions.RequestException as req_err:
-        # Catch any other request-related errors
-        logger.error(f"An unexpected request error occurred for company {company_id}: {req_err}")
-        raise CompanyServiceError(f"An unexpected error occurred while fetching company {company_id}")
 
-    # This line should ideally not be reached if error handling is exhaustive
-    return None
\ No newline at end of file
+    if response.status_code == 404:
+        # Not cached: the company may be created moments from now
+        logger.warning(f"Company not found for ID: {company_id}")
+        return None
+    if response.status_code != 200:
+        logger.error(f"Company service returned error {response.status_code} for company {company_id}: {response.text}")
+        raise CompanyServiceError(f"Company service returned {response.status_code} for company {company_id}")
+
+    try:
+        company = response.json()
+    except ValueError as json_error:
+        logger.error(f"Failed to decode JSON response for company {company_id}: {json_error}")
+        raise CompanyServiceError(f"Invalid JSON response from company service for company {company_id}") from json_error
+
+    logger.info(f"Successfully retrieved company data for ID: {company_id}")
+    company_cache.put(company_id, company)
+    return company
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+
+import httpx
+
+from src.core.config import settings
+from src.database.db import SessionLocal
+from src.database.crud.notification_outbox_crud import NotificationOutboxService
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_BATCH_URL = settings.NOTIFICATION_SERVICE_URL.rstrip("/") + "/api/v1/notify/email/batch"
+
+# Timeout configuration for HTTP calls
+timeout = httpx.Timeout(connect=5.0, read=30.0, write=5.0, pool=None)
+
+
+class NotificationOutboxDispatcher:
+    """
+    Drains the notification outbox in the background: leases a batch of due rows, hands
+    them to the notification service in one batch call, and records the outcome per row.
+    Failures are retried with exponential backoff.
+    """
+
+    def __init__(self, session_factory=SessionLocal, client: httpx.AsyncClient | None = None):
+        self.session_factory = session_factory
+        self.client = client
+        self.batch_size = settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+        self.poll_interval = settings.NOTIFICATION_OUTBOX_POLL_SECONDS
+        self.max_attempts = settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS
+        self._task: asyncio.Task | None = None
+        self._owns_client = client is None
+
+    def _run_db(self, method, *args):
+        db = self.session_factory()
+        try:
+            return getattr(NotificationOutboxService(db), method)(*args)
+        finally:
+            db.close()
+
+    async def _notify(self, claimed):
+        """Returns (outbox_id, error, retryable) per claimed row; error is None on success."""
+        # The key makes a redelivery after a lost response a no-op on the notification side
+        notifications = [
+            {**payload, "idempotency_key": f"user-management-{outbox_id}"} for outbox_id, payload in claimed
+        ]
+        try:
+            response = await self.client.post(NOTIFY_BATCH_URL, json={"notifications": notifications})
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            # Client errors will not fix themselves, except timeouts and throttling
+            retryable = status >= 500 or status in (408, 429)
+            error = f"Notification service error {status}: {e.response.text[:500]}"
+            return [(outbox_id, error, retryable) for outbox_id, _ in claimed]
+        except httpx.RequestError as e:
+            return [(outbox_id, f"Notification service request failed: {e}", True) for outbox_id, _ in claimed]
+
+        items = {item["index"]: item for item in response.json()["results"]}
+        results = []
+        for index, (outbox_id, _) in enumerate(claimed):
+            item = items.get(index)
+            if item is None:
+                # Not in the response: retry through the normal backoff rather than lease it forever
+                results.append((outbox_id, "Notification service response did not include this notification", True))
+            elif item["status"] in ("queued", "duplicate"):
+                results.append((outbox_id, None, True))
+            else:
+                # Invalid or unrenderable notifications will fail the same way next time
+                results.append((outbox_id, f"Notification {item['status']}: {item.get('detail')}", False))
+        return results
+
+    async def dispatch_once(self) -> int:
+        """Deliver one batch of due rows. Returns the number of rows attempted."""
+        lease_seconds = timeout.read + timeout.connect + 30
+        claimed = await asyncio.to_thread(self._run_db, "claim_due", self.batch_size, lease_seconds)
+        if not claimed:
+            return 0
+
+        results = await self._notify(claimed)
+        sent = [outbox_id for outbox_id, error, _ in results if error is None]
+        failures = [result for result in results if result[1] is not None]
+
+        await asyncio.to_thread(self._run_db, "mark_sent", sent)
+        await asyncio.to_thread(
+            self._run_db, "mark_failed_attempts", failures, self.max_attempts,
+            settings.NOTIFICATION_OUTBOX_BASE_BACKOFF_SECONDS, settings.NOTIFICATION_OUTBOX_MAX_BACKOFF_SECONDS,
+        )
+        if failures:
+            logger.warning(f"Notification outbox: {len(sent)} sent, {len(failures)} failed (first error: {failures[0][1]})")
+        else:
+            logger.info(f"Notification outbox: {len(sent)} sent")
+        return len(claimed)
+
+    async def run(self):
+        while True:
+            try:
+                processed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification outbox dispatch failed")
+                processed = 0
+            # A full batch means there is probably more waiting
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=timeout)
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+notification_dispatcher = NotificationOutboxDispatcher()
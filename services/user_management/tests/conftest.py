@@ -0,0 +1,70 @@
+import os
+
+# Settings and the engine are built at import time
+os.environ["USER_DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+os.environ.setdefault("ADMIN_PASSWORD", "admin-password")
+os.environ.setdefault("NOTIFICATION_SERVICE_URL", "http://notification_service:8000")
+os.environ.setdefault("COMPANY_SERVICE_URL", "http://company_service:8000")
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["PASSWORD_HASH_WORKERS"] = "2"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.main import app  # noqa: E402
+from src.database.db import Base, SessionLocal, engine  # noqa: E402
+from src.database.core.login_limiter import login_limiter  # noqa: E402
+from src.database.core.passwords import hash_password  # noqa: E402
+from src.database.core.revocation import revocation_table  # noqa: E402
+from src.database.core.security import shutdown_hash_pool  # noqa: E402
+from src.database.models.user import User  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def hash_pool():
+    yield
+    shutdown_hash_pool()
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    yield
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    revocation_table._versions = {}
+    revocation_table.invalidate()
+    login_limiter._failures.clear()
+
+
+@pytest.fixture
+def session_factory():
+    return SessionLocal
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client():
+    # No context manager: startup hooks (admin seeding, outbox dispatcher) stay out of the tests
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_user(db):
+    def make(username, password="Secret123", role="agent", company_id=1, status="active"):
+        user = User(
+            username=username, password=hash_password(password), role=role,
+            company_id=company_id, status=status, must_change_password=False,
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    return make
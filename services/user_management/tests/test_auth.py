@@ -0,0 +1,111 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+from src.database.core.auth import decode_token, get_current_user, issue_token
+from src.database.core.config import settings
+from src.database.core.revocation import RevocationTable
+from src.database.core.security import create_access_token
+from src.schemas.auth import TokenUser
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_revocation_table_bumps_versions(session_factory, db):
+    table = RevocationTable(refresh_seconds=30, session_factory=session_factory)
+    assert table.version(7) == 0
+    assert table.revoke(db, 7) == 1
+    assert table.revoke(db, 7) == 2
+    assert table.is_revoked(7, 1) and not table.is_revoked(7, 2)
+    assert not table.is_revoked(8, 0)
+
+
+def test_revocation_table_picks_up_other_processes_on_reload(session_factory, db):
+    now = [0.0]
+    local = RevocationTable(refresh_seconds=30, session_factory=session_factory, clock=lambda: now[0])
+    other = RevocationTable(refresh_seconds=30, session_factory=session_factory)
+    assert local.version(7) == 0
+
+    other.revoke(db, 7)
+    # Still within the refresh interval: the cached table is used
+    now[0] = 10
+    assert local.version(7) == 0
+    now[0] = 31
+    assert local.version(7) == 1
+
+
+def test_current_version_reads_past_a_stale_table(session_factory, db):
+    local = RevocationTable(refresh_seconds=30, session_factory=session_factory, clock=lambda: 0.0)
+    other = RevocationTable(refresh_seconds=30, session_factory=session_factory)
+    assert local.version(7) == 0
+
+    other.revoke(db, 7)
+    # A token issued now must carry the new version even though the table has not reloaded
+    assert local.current_version(7, db) == 1
+    assert local.version(7) == 1
+    assert local.current_version(8) == 0
+
+
+def test_decode_token_rejects_bad_tokens():
+    forged = jwt.encode({"sub": "1", "ver": 0}, "not-the-secret", algorithm=settings.JWT_ALGORITHM)
+    no_subject = create_access_token({"username": "x"})
+    for token in (forged, no_subject, "garbage"):
+        with pytest.raises(HTTPException) as e:
+            decode_token(token)
+        assert e.value.status_code == 401
+
+
+def test_stateless_tokens_are_trusted_without_loading_the_user(monkeypatch):
+    monkeypatch.setattr("src.database.core.auth.load_user", lambda *a: pytest.fail("must not hit the database"))
+    token = create_access_token({"sub": "42", "username": "agent42", "role": "agent", "company_id": 3, "ver": 0})
+    user = get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+    assert user == TokenUser(user_id=42, username="agent42", role="agent", company_id=3)
+
+
+def test_tokens_without_full_claims_fall_back_to_the_database(make_user):
+    user = make_user("legacy")
+    token = create_access_token({"sub": str(user.user_id)})
+    current = get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+    assert current.username == "legacy"
+
+    missing = create_access_token({"sub": "999"})
+    with pytest.raises(HTTPException) as e:
+        get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=missing))
+    assert e.value.status_code == 401
+
+
+def test_revoked_tokens_are_refused_and_new_ones_accepted(client, make_user):
+    admin = make_user("root", role="admin")
+    agent = make_user("agent1")
+    old_token = issue_token(agent)
+    assert client.get("/api/user/me", headers=bearer(old_token)).status_code == 200
+
+    resp = client.post(f"/api/user/revoke-tokens/{agent.user_id}", headers=bearer(issue_token(admin)))
+    assert resp.status_code == 200
+    assert resp.json() == {"user_id": agent.user_id, "token_version": 1}
+
+    refused = client.get("/api/user/me", headers=bearer(old_token))
+    assert refused.status_code == 401 and refused.json()["detail"] == "Token has been revoked"
+    fresh = client.get("/api/user/me", headers=bearer(issue_token(agent)))
+    assert fresh.status_code == 200 and fresh.json()["username"] == "agent1"
+
+
+def test_revoking_an_unknown_user_is_404(client, make_user):
+    admin = make_user("root", role="admin")
+    assert client.post("/api/user/revoke-tokens/999", headers=bearer(issue_token(admin))).status_code == 404
+
+
+@pytest.mark.parametrize("updates", [{"password": "n3w-secret"}, {"username": "agent1-renamed"}])
+def test_updating_credentials_revokes_old_tokens(client, make_user, updates):
+    agent = make_user("agent1")
+    old_token = issue_token(agent)
+
+    resp = client.put(f"/api/user/update/{agent.user_id}", json=updates, headers=bearer(old_token))
+    assert resp.status_code == 200, resp.text
+
+    refused = client.get("/api/user/me", headers=bearer(old_token))
+    assert refused.status_code == 401 and refused.json()["detail"] == "Token has been revoked"
+    assert client.get("/api/user/me", headers=bearer(issue_token(agent))).status_code == 200
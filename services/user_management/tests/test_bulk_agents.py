@@ -0,0 +1,51 @@
+import pytest
+
+from src.database.core import security
+from src.database.core.passwords import verify_password
+from src.database.models.notification_outbox import NotificationOutbox
+from src.database.models.user import User
+from src.routes import user as user_routes
+
+
+@pytest.fixture
+def company(monkeypatch):
+    async def fake_company(company_id):
+        return {"id": company_id, "email": "ic@example.com"}
+
+    monkeypatch.setattr("src.routes.user.get_company", fake_company)
+
+
+def test_bulk_agents_are_hashed_on_the_pool_and_emailed(client, db, company, monkeypatch):
+    # Worker processes have their own copy of the module; hashing in this process would fail
+    monkeypatch.setattr("src.database.core.passwords.hash_password", lambda p: pytest.fail("hashed in-process"))
+    emails = [f"agent{n}@example.com" for n in range(5)]
+
+    resp = client.post("/api/user/agents/bulk", json={"company_id": 9, "emails": emails})
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["created"] == 5 and security._hash_pool is not None
+
+    agents = {agent["user_id"]: agent for agent in body["agents"]}
+    users = db.query(User).filter(User.user_id.in_(agents)).all()
+    assert len(users) == 5
+    for user in users:
+        agent = agents[user.user_id]
+        assert user.username == agent["username"] and user.company_id == 9 and user.role == "agent"
+        assert verify_password(agent["password"], user.password)
+
+    outbox = db.query(NotificationOutbox).all()
+    assert sorted(row.payload["to"] for row in outbox) == emails
+    assert {row.payload["username"] for row in outbox} == {agent["username"] for agent in body["agents"]}
+    assert {row.payload["type"] for row in outbox} == {"agent_account"}
+
+
+def test_bulk_agents_reject_duplicate_emails(client, db, company):
+    resp = client.post("/api/user/agents/bulk", json={"company_id": 9, "emails": ["a@example.com", "A@example.com"]})
+    assert resp.status_code == 400
+    assert db.query(User).count() == 0 and db.query(NotificationOutbox).count() == 0
+
+
+def test_generated_usernames_are_distinct_within_a_request(monkeypatch):
+    names = iter(["user_a", "user_a", "user_b", "user_a", "user_c"])
+    monkeypatch.setattr(user_routes, "generate_username", lambda: next(names))
+    assert sorted(user_routes.generate_usernames(3)) == ["user_a", "user_b", "user_c"]
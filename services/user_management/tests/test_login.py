@@ -0,0 +1,126 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.database.core import security
+from src.database.core.config import settings
+from src.database.core.login_limiter import LoginAttemptLimiter
+from src.database.core.passwords import verify_and_update, verify_password
+from src.database.models.user import User
+from passlib.context import CryptContext
+
+
+class RecordingPool(ThreadPoolExecutor):
+    """Runs hash work in threads and records which functions were submitted."""
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.calls = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.calls.append(fn.__name__)
+        return super().submit(fn, *args, **kwargs)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    recording = RecordingPool()
+    monkeypatch.setattr(security, "get_hash_pool", lambda: recording)
+    monkeypatch.setattr(security, "_dummy_hash", None)
+    yield recording
+    recording.shutdown()
+
+
+def login(client, username, password):
+    return client.post("/api/user/login", json={"username": username, "password": password})
+
+
+def test_limiter_locks_out_within_the_window_and_recovers():
+    now = [0.0]
+    limiter = LoginAttemptLimiter(max_failures=3, window_seconds=60, clock=lambda: now[0])
+    for t in (0, 10, 20):
+        now[0] = t
+        assert limiter.retry_after("alice") is None
+        limiter.record_failure("alice")
+
+    now[0] = 30
+    assert limiter.retry_after("alice") == pytest.approx(30)
+    assert limiter.retry_after("bob") is None
+    # The first failure ages out of the window
+    now[0] = 60.5
+    assert limiter.retry_after("alice") is None
+
+
+def test_limiter_reset_clears_failures():
+    limiter = LoginAttemptLimiter(max_failures=2, window_seconds=60)
+    limiter.record_failure("alice")
+    limiter.record_failure("alice")
+    assert limiter.retry_after("alice") is not None
+    limiter.reset("alice")
+    assert limiter.retry_after("alice") is None
+
+
+def test_limiter_bounds_tracked_usernames():
+    now = [0.0]
+    limiter = LoginAttemptLimiter(max_failures=3, window_seconds=60, max_tracked=4, clock=lambda: now[0])
+    for n in range(10):
+        limiter.record_failure(f"user{n}")
+    assert len(limiter._failures) <= 4
+
+
+def test_unknown_users_still_pay_for_a_hash_check(pool):
+    valid, new_hash = asyncio.run(security.verify_password_offloaded("whatever", None))
+    assert (valid, new_hash) == (False, None)
+    # One dummy hash made once, then the same verify a real user gets
+    assert pool.calls == ["hash_chunk", "verify_and_update"]
+
+    asyncio.run(security.verify_password_offloaded("whatever", None))
+    assert pool.calls[2:] == ["verify_and_update"]
+
+
+def test_verification_is_refused_when_too_many_are_pending(pool, monkeypatch):
+    monkeypatch.setattr(security, "_pending_verifications", settings.LOGIN_MAX_PENDING)
+    with pytest.raises(security.HashPoolBusy):
+        asyncio.run(security.verify_password_offloaded("pw", None))
+    assert pool.calls == []
+
+
+def test_verify_and_update_flags_hashes_with_another_cost():
+    other_cost = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=5).hash("pw")
+    valid, new_hash = verify_and_update("pw", other_cost)
+    assert valid and new_hash is not None and "$04$" in new_hash
+    assert verify_and_update("pw", new_hash) == (True, None)
+    assert verify_and_update("wrong", other_cost) == (False, None)
+
+
+def test_login_rehashes_and_issues_a_token(client, db, make_user, pool):
+    user = make_user("agent1", password="Secret123")
+    user.password = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=5).hash("Secret123")
+    db.commit()
+
+    resp = login(client, "agent1", "Secret123")
+    assert resp.status_code == 200 and resp.json()["access_token"]
+    db.expire_all()
+    stored = db.query(User).filter(User.username == "agent1").one().password
+    assert "$04$" in stored and verify_password("Secret123", stored)
+
+
+def test_login_locks_out_after_repeated_failures(client, make_user, pool):
+    make_user("agent1", password="Secret123")
+    for _ in range(settings.LOGIN_MAX_FAILURES):
+        assert login(client, "agent1", "wrong").status_code == 401
+
+    locked = login(client, "agent1", "Secret123")
+    assert locked.status_code == 429 and int(locked.headers["Retry-After"]) >= 1
+    # Refused before any hash work
+    calls = len(pool.calls)
+    login(client, "agent1", "Secret123")
+    assert len(pool.calls) == calls
+
+
+def test_login_sheds_load_when_the_hash_pool_is_busy(client, make_user, pool, monkeypatch):
+    make_user("agent1", password="Secret123")
+    monkeypatch.setattr(security, "_pending_verifications", settings.LOGIN_MAX_PENDING)
+    resp = login(client, "agent1", "Secret123")
+    assert resp.status_code == 503 and resp.headers["Retry-After"] == "1"
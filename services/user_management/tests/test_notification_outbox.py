@@ -0,0 +1,171 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from src.database.crud.notification_outbox_crud import NotificationOutboxService
+from src.database.models.notification_outbox import NotificationOutbox
+from src.database.models.user import User
+from src.services import company_service
+from src.services.company_service import CompanyCache
+from src.services.email_service import queue_email_notification
+from src.services.notification_dispatcher import NotificationOutboxDispatcher
+
+WELCOME = {"to": "agent@example.com", "subject": "Welcome", "username": "user_1", "password": "pw"}
+
+
+def dispatcher_with(session_factory, handler):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return NotificationOutboxDispatcher(session_factory=session_factory, client=client)
+
+
+def queue(db, count=1):
+    for n in range(count):
+        queue_email_notification(db, **{**WELCOME, "to": f"agent{n}@example.com"})
+    db.commit()
+    return [row.id for row in db.query(NotificationOutbox).order_by(NotificationOutbox.id)]
+
+
+def accept_all(request):
+    notifications = json.loads(request.content)["notifications"]
+    return httpx.Response(200, json={"results": [
+        {"index": i, "status": "queued", "id": i + 1} for i in range(len(notifications))
+    ]})
+
+
+def test_enqueue_joins_the_callers_transaction(db):
+    db.add(User(username="rolled_back", password="x", role="agent"))
+    queue_email_notification(db, **WELCOME)
+    db.rollback()
+    assert db.query(NotificationOutbox).count() == 0
+
+    db.add(User(username="committed", password="x", role="agent"))
+    queue_email_notification(db, **WELCOME)
+    db.commit()
+    row = db.query(NotificationOutbox).one()
+    assert row.status == "pending" and row.payload["username"] == "user_1"
+
+
+def test_agent_creation_queues_the_welcome_email(client, db, monkeypatch):
+    async def fake_company(company_id):
+        return {"id": company_id, "email": "ic@example.com"}
+
+    monkeypatch.setattr("src.routes.user.get_company", fake_company)
+    monkeypatch.setattr("httpx.post", lambda *a, **kw: pytest.fail("request must not call the notification service"))
+    resp = client.post("/api/user/agent", json={"role": "agent", "company_id": 3, "email": "new@example.com"})
+    assert resp.status_code == 200, resp.text
+
+    row = db.query(NotificationOutbox).one()
+    assert row.payload["to"] == "new@example.com" and row.payload["type"] == "agent_account"
+    assert row.payload["username"] == resp.json()["username"]
+
+
+def test_claimed_rows_are_leased(db, session_factory):
+    queue(db, 2)
+    first = NotificationOutboxService(session_factory()).claim_due(10, lease_seconds=60)
+    assert len(first) == 2
+    assert NotificationOutboxService(session_factory()).claim_due(10, lease_seconds=60) == []
+
+
+def test_dispatcher_delivers_and_clears_payloads(db, session_factory):
+    ids = queue(db, 3)
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content)["notifications"])
+        return accept_all(request)
+
+    assert asyncio.run(dispatcher_with(session_factory, handler).dispatch_once()) == 3
+    assert [n["idempotency_key"] for n in requests[0]] == [f"user-management-{i}" for i in ids]
+    db.expire_all()
+    assert {(row.status, row.payload) for row in db.query(NotificationOutbox)} == {("sent", None)}
+    assert asyncio.run(dispatcher_with(session_factory, handler).dispatch_once()) == 0
+
+
+def test_dispatcher_backs_off_then_dead_letters(db, session_factory):
+    queue(db)
+    dispatcher = dispatcher_with(session_factory, lambda request: httpx.Response(503, text="down"))
+    dispatcher.max_attempts = 2
+
+    before = datetime.utcnow()
+    asyncio.run(dispatcher.dispatch_once())
+    db.expire_all()
+    row = db.query(NotificationOutbox).one()
+    assert row.status == "pending" and row.attempts == 1 and "503" in row.last_error
+    assert row.next_attempt_at > before + timedelta(seconds=1)
+
+    # Make it due again; the second failure reaches max_attempts
+    row.next_attempt_at = datetime.utcnow()
+    db.commit()
+    asyncio.run(dispatcher.dispatch_once())
+    db.expire_all()
+    row = db.query(NotificationOutbox).one()
+    assert row.status == "failed" and row.attempts == 2
+
+
+def test_rejected_notifications_are_not_retried(db, session_factory):
+    ok_id, bad_id, lost_id = queue(db, 3)
+
+    def handler(request):
+        return httpx.Response(200, json={"results": [
+            {"index": 0, "status": "duplicate", "id": 7},
+            {"index": 1, "status": "invalid", "detail": "bad address"},
+        ]})
+
+    asyncio.run(dispatcher_with(session_factory, handler).dispatch_once())
+    db.expire_all()
+    rows = {row.id: row for row in db.query(NotificationOutbox)}
+    assert rows[ok_id].status == "sent"
+    assert rows[bad_id].status == "failed" and "bad address" in rows[bad_id].last_error
+    # Left out of the response: retried with backoff
+    assert rows[lost_id].status == "pending" and rows[lost_id].attempts == 1
+
+
+def test_company_cache_expires_and_evicts():
+    now = [0.0]
+    cache = CompanyCache(max_size=2, ttl_seconds=60, clock=lambda: now[0])
+    cache.put(1, {"id": 1})
+    cache.put(2, {"id": 2})
+    assert cache.get(1) == {"id": 1}
+    # 1 was used more recently, so 2 is evicted
+    cache.put(3, {"id": 3})
+    assert cache.get(2) is None and cache.get(1) == {"id": 1}
+
+    now[0] = 61
+    assert cache.get(1) is None and cache.get(3) is None
+
+    cache.put(4, {"id": 4})
+    cache.clear()
+    assert cache.get(4) is None
+
+
+@pytest.fixture
+def company_api(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path.endswith("/404"):
+            return httpx.Response(404, json={"detail": "not found"})
+        return httpx.Response(200, json={"id": 5, "email": "ic@example.com"})
+
+    monkeypatch.setattr(company_service, "company_cache", CompanyCache(max_size=10, ttl_seconds=60))
+    monkeypatch.setattr(company_service, "_client", httpx.AsyncClient(
+        base_url="http://company_service:8000", transport=httpx.MockTransport(handler),
+    ))
+    return calls
+
+
+def test_get_company_is_cached_but_misses_are_not(company_api):
+    async def lookups():
+        return [
+            await company_service.get_company(5), await company_service.get_company(5),
+            await company_service.get_company(404), await company_service.get_company(404),
+        ]
+
+    first, second, missing, missing_again = asyncio.run(lookups())
+    assert first == second == {"id": 5, "email": "ic@example.com"}
+    assert missing is None and missing_again is None
+    assert company_api == ["/companies/5", "/companies/404", "/companies/404"]